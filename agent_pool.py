@@ -0,0 +1,190 @@
+"""Agent Pool - 하위 에이전트 인스턴스 재사용 풀"""
+import asyncio
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from strands import Agent
+from strands.telemetry.metrics import EventLoopMetrics
+
+
+class AgentPool:
+    """
+    미리 생성한 Agent 인스턴스를 재사용하는 풀
+    호출마다 Agent/모델 클라이언트를 새로 만들지 않고, 사용 후 대화 상태만 초기화하여 반환합니다.
+    strands Agent는 동시에 두 요청을 처리할 수 없으므로 한 번에 한 호출자만 인스턴스를 사용합니다.
+    한도에 도달하면 동기 호출자는 Condition으로, 비동기 호출자는 자신의 이벤트 루프 future로
+    반환/폐기 알림을 기다리며, 깨어날 때마다 다시 확보를 시도합니다.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Agent], max_size: int = None):
+        self.name = name
+        self.factory = factory
+        self.max_size = max_size or int(os.getenv("SUB_AGENT_POOL_SIZE", "4"))
+        self._idle: List[Agent] = []
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        # 비동기 대기자 (이벤트 루프, future) - 도착 순서
+        self._async_waiters: deque = deque()
+        self._created = 0
+        self._in_use = 0
+        self._waits = 0
+
+    def prewarm(self, count: int = 1):
+        """지정한 수만큼 인스턴스를 미리 생성"""
+        for _ in range(min(count, self.max_size)):
+            with self._lock:
+                if self._created >= self.max_size:
+                    return
+                self._created += 1
+            try:
+                agent = self.factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                self._notify()
+                raise
+            with self._lock:
+                self._idle.append(agent)
+            self._notify()
+
+    def _reserve(self) -> Tuple[Optional[Agent], bool]:
+        """
+        잠금 안에서 유휴 인스턴스 또는 생성 권한 확보
+
+        Returns:
+            (유휴 인스턴스, 새로 생성해야 하는지) - 둘 다 없으면 한도에 도달한 상태
+        """
+        if self._idle:
+            self._in_use += 1
+            return self._idle.pop(), False
+        if self._created < self.max_size:
+            self._created += 1
+            self._in_use += 1
+            return None, True
+        return None, False
+
+    def _create(self) -> Agent:
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+                self._in_use -= 1
+            self._notify()
+            raise
+
+    def _notify(self):
+        """대기자 하나씩 깨움 (동기 대기자와 비동기 대기자 모두, 깨어난 쪽이 다시 확보를 시도)"""
+        with self._lock:
+            self._available.notify()
+            while self._async_waiters:
+                loop, future = self._async_waiters.popleft()
+                if future.cancelled():
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self._wake, future)
+                    return
+                except RuntimeError:
+                    # 대기자의 이벤트 루프가 이미 닫힘
+                    continue
+
+    def _wake(self, future: asyncio.Future):
+        if future.cancelled():
+            # 깨우기 전에 대기자가 취소됨 - 다음 대기자에게 넘김
+            self._notify()
+        elif not future.done():
+            future.set_result(True)
+
+    def _take(self) -> Agent:
+        with self._lock:
+            agent, create = self._reserve()
+            if agent is None and not create:
+                # 모든 인스턴스가 사용 중이면 반환/폐기될 때까지 대기
+                self._waits += 1
+                while agent is None and not create:
+                    self._available.wait()
+                    agent, create = self._reserve()
+        return self._create() if create else agent
+
+    async def _take_async(self) -> Agent:
+        loop = asyncio.get_running_loop()
+        first = True
+        while True:
+            with self._lock:
+                agent, create = self._reserve()
+                if agent is not None or create:
+                    break
+                if first:
+                    self._waits += 1
+                waiter = (loop, loop.create_future())
+                # 다시 기다리는 대기자는 순서를 잃지 않도록 맨 앞에
+                if first:
+                    self._async_waiters.append(waiter)
+                else:
+                    self._async_waiters.appendleft(waiter)
+            first = False
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    woken = waiter not in self._async_waiters and waiter[1].done() and not waiter[1].cancelled()
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                if woken:
+                    # 받은 알림을 다음 대기자에게 넘김
+                    self._notify()
+                raise
+        return self._create() if create else agent
+
+    def _release(self, agent: Agent):
+        try:
+            self.reset(agent)
+        except Exception:
+            # 초기화에 실패한 인스턴스는 폐기하고 다음에 새로 생성
+            with self._lock:
+                self._in_use -= 1
+                self._created -= 1
+        else:
+            with self._lock:
+                self._in_use -= 1
+                self._idle.append(agent)
+        self._notify()
+
+    @staticmethod
+    def reset(agent: Agent):
+        """대화 기록과 누적 메트릭 초기화"""
+        agent.messages.clear()
+        agent.event_loop_metrics = EventLoopMetrics()
+        if hasattr(agent.conversation_manager, "removed_message_count"):
+            agent.conversation_manager.removed_message_count = 0
+
+    @contextmanager
+    def acquire(self):
+        """풀에서 Agent를 빌려 사용하고 자동으로 반환"""
+        agent = self._take()
+        try:
+            yield agent
+        finally:
+            self._release(agent)
+
+    @asynccontextmanager
+    async def acquire_async(self):
+        """acquire()의 비동기 버전 - 대기 중에도 이벤트 루프를 막지 않음"""
+        agent = await self._take_async()
+        try:
+            yield agent
+        finally:
+            self._release(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waits": self._waits
+            }
@@ -0,0 +1,230 @@
+"""Batch Runner - JSONL 쿼리를 한 프로세스에서 제한된 동시성으로 일괄 처리"""
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, Iterator, Optional, Set, TextIO, Tuple
+from orchestrator_agent import OrchestratorAgent
+from model_config import get_shared_model
+
+
+def parse_line(line: str, line_number: int) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    입력 JSONL 한 줄 해석
+
+    지원 형식: {"id": "q1", "query": "..."} / {"input": "..."} / "..." (JSON 문자열)
+    id가 없으면 줄 번호를 사용합니다.
+
+    Returns:
+        (id, 쿼리, 오류 메시지)
+    """
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return str(line_number), None, f"잘못된 JSON입니다: {str(e)}"
+
+    if isinstance(record, str):
+        record = {"query": record}
+    if not isinstance(record, dict):
+        return str(line_number), None, "JSON 객체 또는 문자열이어야 합니다."
+
+    record_id = str(record.get("id", line_number))
+    query = str(record.get("query") or record.get("input") or "").strip()
+    if not query:
+        return record_id, None, "query 필드가 필요합니다."
+    return record_id, query, None
+
+
+def read_completed_ids(output_path: str) -> Set[str]:
+    """이전 실행 결과 파일에서 성공적으로 끝난 id 목록 (이어서 처리할 때 건너뜀)"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단되며 잘린 마지막 줄
+                continue
+            if isinstance(record, dict) and record.get("success"):
+                completed.add(str(record.get("id")))
+    return completed
+
+
+class BatchRunner:
+    """
+    JSONL 배치 처리기
+    각 쿼리는 독립된 오케스트레이터(대화 기록 없음)에서 처리되며, 모델과 하위 에이전트 풀은 공유됩니다.
+    """
+
+    def __init__(
+        self,
+        model_id: str = None,
+        concurrency: int = None,
+        ordered: bool = True,
+        progress_every: int = None
+    ):
+        self.model = get_shared_model(model_id)
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.ordered = ordered
+        self.progress_every = progress_every or int(os.getenv("BATCH_PROGRESS_EVERY", "10"))
+
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    async def _process(self, record_id: str, query: str) -> Dict[str, Any]:
+        try:
+            orchestrator = OrchestratorAgent(self.model, user_id=f"batch_{record_id}")
+            result = await orchestrator.process_user_input_async(query)
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": f"처리 중 오류가 발생했습니다: {str(e)}",
+                "user_input": query
+            }
+        return {"id": record_id, **result}
+
+    async def run_async(self, lines: Iterator[str], output: TextIO, skip_ids: Set[str] = None) -> Dict[str, Any]:
+        """
+        입력 줄을 처리하여 결과를 output에 JSONL로 기록
+
+        Args:
+            lines: 입력 JSONL 줄
+            output: 결과를 쓸 텍스트 스트림
+            skip_ids: 이미 처리된 id (이어서 처리)
+
+        Returns:
+            처리 요약
+        """
+        skip_ids = skip_ids or set()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending: Dict[int, Dict[str, Any]] = {}
+        next_index = 0
+        tasks = set()
+        started = time.perf_counter()
+
+        def write(record: Dict[str, Any]):
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+
+        def emit(index: int, record: Optional[Dict[str, Any]]):
+            # 입력 순서 모드에서는 앞선 결과가 모두 나올 때까지 보관
+            nonlocal next_index
+            if not self.ordered:
+                if record is not None:
+                    write(record)
+                return
+            pending[index] = record
+            while next_index in pending:
+                ready = pending.pop(next_index)
+                if ready is not None:
+                    write(ready)
+                next_index += 1
+
+        def finish(record: Dict[str, Any]):
+            self.processed += 1
+            if not record.get("success"):
+                self.failed += 1
+            if self.processed % self.progress_every == 0:
+                print(f"📦 {self.processed}건 처리 (실패 {self.failed}건)", file=sys.stderr)
+
+        async def handle(index: int, record_id: str, query: str):
+            try:
+                record = await self._process(record_id, query)
+            finally:
+                semaphore.release()
+            finish(record)
+            emit(index, record)
+
+        index = 0
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+
+            record_id, query, error = parse_line(line, line_number)
+            if record_id in skip_ids:
+                self.skipped += 1
+                emit(index, None)
+            elif error:
+                record = {"id": record_id, "success": False, "error": error, "line": line_number}
+                finish(record)
+                emit(index, record)
+            else:
+                # 동시 실행 수만큼만 입력을 읽어 메모리 사용을 제한
+                await semaphore.acquire()
+                task = asyncio.create_task(handle(index, record_id, query))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            index += 1
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed": round(time.perf_counter() - started, 3)
+        }
+
+
+def run_batch(
+    input_path: str = "-",
+    output_path: str = None,
+    model_id: str = None,
+    concurrency: int = None,
+    ordered: bool = True,
+    resume: bool = False
+) -> Dict[str, Any]:
+    """
+    JSONL 배치 실행
+
+    Args:
+        input_path: 입력 JSONL 파일 경로 ("-"이면 stdin)
+        output_path: 결과 JSONL 파일 경로 (없거나 "-"이면 stdout)
+        model_id: 사용할 모델 ID
+        concurrency: 동시에 처리할 최대 쿼리 수
+        ordered: True면 입력 순서대로, False면 완료되는 대로 기록
+        resume: 결과 파일에 이미 성공한 id는 건너뛰고 이어서 기록
+
+    Returns:
+        처리 요약
+    """
+    to_stdout = output_path in (None, "-")
+    if resume and to_stdout:
+        raise ValueError("이어서 처리하려면 결과 파일 경로(--output)가 필요합니다.")
+
+    skip_ids = read_completed_ids(output_path) if resume else set()
+    if skip_ids:
+        print(f"⏭️ 이미 처리된 {len(skip_ids)}건을 건너뜁니다.", file=sys.stderr)
+
+    runner = BatchRunner(model_id, concurrency, ordered)
+    input_file = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    output_file = sys.stdout if to_stdout else open(output_path, "a" if resume else "w", encoding="utf-8")
+    if resume and output_file.tell() > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # 중단되며 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 추가
+                output_file.write("\n")
+
+    try:
+        # 에이전트 진행 로그가 결과 JSONL과 섞이지 않도록 stderr로 보냄
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = asyncio.run(runner.run_async(iter(input_file), output_file, skip_ids))
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    print(
+        f"✅ 배치 완료: {summary['processed']}건 처리, 실패 {summary['failed']}건, "
+        f"건너뜀 {summary['skipped']}건 ({summary['elapsed']}초)",
+        file=sys.stderr
+    )
+    return summary
@@ -0,0 +1,730 @@
+#!/usr/bin/env python3
+"""
+Benchmark - 스텁 모델과 로컬 HTTP 대체 서버로 오프라인 성능 측정
+
+Bedrock과 외부 API 없이 WorkshopTester의 쿼리 구성을 동시성 단계별로 실행하여
+단계별 지연 시간(p50/p95/p99), 처리량, 메모리 사용량을 보고합니다.
+기준 결과(--baseline)와 비교하여 성능 저하 시 0이 아닌 종료 코드를 반환하므로 CI에서 사용할 수 있습니다.
+
+사용 예:
+    python benchmark.py --concurrency 1,4,8 --requests 36 --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+from strands.models import Model
+from history_manager import estimate_tokens
+
+# 스크립트 응답 - 텍스트 또는 (도구 이름, 입력) 도구 호출
+ScriptOutput = Union[str, Tuple[str, Dict[str, Any]]]
+
+STAGES = ("cache_lookup", "clarity", "planning", "routing", "dispatch", "fanout", "clarification", "final", "total")
+
+
+# ---------------------------------------------------------------------------
+# 스텁 모델
+# ---------------------------------------------------------------------------
+
+WEATHER_KEYWORDS = ("날씨", "weather")
+CONVERSATION_KEYWORDS = ("안녕", "기분", "고마", "감사", "hello", "thanks")
+KOREAN_SUFFIXES = ("에", "의", "은", "는", "이", "가")
+
+
+def _request_text(messages: List[Dict[str, Any]]) -> str:
+    """마지막 사용자 텍스트 메시지 (도구 결과 메시지 제외)"""
+    for message in reversed(messages):
+        if message["role"] != "user":
+            continue
+        texts = [content["text"] for content in message.get("content", []) if "text" in content]
+        if texts:
+            return "\n".join(texts)
+    return ""
+
+
+def _quoted_query(text: str) -> str:
+    """프롬프트에 인용된 사용자 요청/하위 에이전트 입력"""
+    match = re.search(r'사용자 (?:검색 )?요청: "(.*?)"', text, re.DOTALL) or re.search(r'"(.*?)"', text, re.DOTALL)
+    return (match.group(1) if match else text).strip()
+
+
+def _location(query: str) -> str:
+    """날씨 요청에서 지역명 추출 ("뉴욕 날씨 어때?" → "뉴욕")"""
+    word = query.split()[0] if query.split() else query
+    for suffix in KOREAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix) + 1:
+            return word[:-len(suffix)]
+    return word
+
+
+def classify_request(query: str) -> List[Tuple[str, str]]:
+    """
+    스텁 라우팅 - 요청에 필요한 (하위 에이전트, 입력) 목록
+
+    매우 짧은 단일 키워드(예: "커피")는 빈 목록(명확화 필요)으로 판단합니다.
+    """
+    lowered = query.lower()
+    if len(query.split()) == 1 and len(query.strip("?!. ")) <= 3:
+        return []
+    if any(keyword in lowered for keyword in WEATHER_KEYWORDS):
+        location = _location(query)
+        steps = [("weather_agent", location)]
+        if "대해" in query:
+            steps.insert(0, ("search_agent", location))
+        return steps
+    if any(keyword in lowered for keyword in CONVERSATION_KEYWORDS):
+        return [("conversation_agent", query)]
+    return [("search_agent", query)]
+
+
+def _tool_uses_since_request(messages: List[Dict[str, Any]]) -> List[str]:
+    """마지막 사용자 요청 이후 호출한 도구 이름"""
+    names = []
+    for message in reversed(messages):
+        if message["role"] == "user" and not any("toolResult" in content for content in message.get("content", [])):
+            break
+        names.extend(content["toolUse"]["name"] for content in message.get("content", []) if "toolUse" in content)
+    return names
+
+
+def default_stub_script(messages: List[Dict[str, Any]], tool_names: List[str], system_prompt: str) -> ScriptOutput:
+    """
+    이 저장소의 에이전트 프롬프트를 흉내 내는 기본 스크립트
+
+    - 라우터: RoutePlan 구조화 출력, 명확성 판단: PROCEED/NEED_MORE, 계획: 실행 계획 텍스트
+    - 오케스트레이터: 계획된 하위 에이전트를 차례로 호출한 뒤 최종 답변
+    - 검색/날씨 에이전트: 도구(통합 검색 또는 단일 검색 도구)를 한 번 호출한 뒤 요약 답변
+    """
+    query = _quoted_query(_request_text(messages))
+    steps = classify_request(query)
+    called = _tool_uses_since_request(messages)
+
+    if "RoutePlan" in tool_names:
+        return ("RoutePlan", {
+            "clarity": "PROCEED" if steps else "NEED_MORE",
+            "steps": [{"agent": agent, "argument": argument, "reason": "stub"} for agent, argument in steps],
+            "expected_result": "stub"
+        })
+    if "명확성만" in system_prompt:
+        return "PROCEED" if steps else "NEED_MORE"
+    if "실행 계획만" in system_prompt:
+        lines = [f"{index}. {agent} - {argument}" for index, (agent, argument) in enumerate(steps, 1)]
+        return "**📋 실행 계획:**\n" + "\n".join(lines) + "\n\n**🎯 예상 결과:**\nstub"
+
+    if "search_agent" in tool_names:
+        for agent, argument in steps:
+            if agent not in called:
+                return (agent, {{
+                    "search_agent": "query", "weather_agent": "location_query", "conversation_agent": "message"
+                }[agent]: argument})
+        return "<thinking>모든 하위 에이전트 결과를 종합합니다.</thinking>"
+    if "get_weather_forecast" in tool_names and not called:
+        return ("get_weather_forecast", {"location": query})
+    if "combined_search" in tool_names and not called:
+        return ("combined_search", {"query": query})
+    if "wikipedia_search" in tool_names and not called:
+        technical = query.isascii() or "이란" in query
+        return ("duckduckgo_search" if technical else "wikipedia_search", {"query": query})
+    return ""
+
+
+class StubModel(Model):
+    """
+    strands Model 인터페이스를 구현한 오프라인 스텁 모델
+
+    응답은 script(messages, tool_names, system_prompt)가 정하며, 지연 시간은
+    첫 토큰까지 latency초 + 출력 토큰당 token_latency초로 흉내 냅니다.
+    빈 텍스트 응답은 response_tokens 길이의 답변으로 채웁니다.
+    """
+
+    def __init__(
+        self,
+        model_id: str = "stub",
+        latency: float = 0.05,
+        token_latency: float = 0.001,
+        response_tokens: int = 60,
+        script: Callable[..., ScriptOutput] = None,
+        **config
+    ):
+        self.config = {"model_id": model_id, **config}
+        self.latency = latency
+        self.token_latency = token_latency
+        self.response_tokens = response_tokens
+        self.script = script or default_stub_script
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    def _filler(self, text: str) -> str:
+        # 지정한 출력 토큰 수(UTF-8 4바이트당 1토큰)가 되도록 답변 채우기
+        sentence = "벤치마크용 스텁 응답입니다. "
+        repeat = max(1, math.ceil((self.response_tokens * 4 - len(text.encode("utf-8"))) / len(sentence.encode("utf-8"))))
+        return text + sentence * repeat
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: List[Dict[str, Any]] = None,
+        system_prompt: str = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+        output = self.script(messages, [spec["name"] for spec in tool_specs or []], system_prompt or "")
+        input_tokens = estimate_tokens(messages) + len((system_prompt or "").encode("utf-8")) // 4
+
+        await asyncio.sleep(self.latency)
+        yield {"messageStart": {"role": "assistant"}}
+
+        if isinstance(output, tuple):
+            name, tool_input = output
+            arguments = json.dumps(tool_input, ensure_ascii=False)
+            output_tokens = len(arguments.encode("utf-8")) // 4 + 1
+            await asyncio.sleep(self.token_latency * output_tokens)
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": uuid.uuid4().hex, "name": name}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": arguments}}}}
+            yield {"contentBlockStop": {}}
+            stop_reason = "tool_use"
+        else:
+            text = output if output and not output.startswith("<thinking>") else self._filler(output)
+            output_tokens = len(text.encode("utf-8")) // 4 + 1
+            yield {"contentBlockStart": {"start": {}}}
+            chunk_size = 16
+            for index in range(0, len(text), chunk_size):
+                chunk = text[index:index + chunk_size]
+                await asyncio.sleep(self.token_latency * (len(chunk.encode("utf-8")) // 4 + 1))
+                yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+            yield {"contentBlockStop": {}}
+            stop_reason = "end_turn"
+
+        yield {"messageStop": {"stopReason": stop_reason}}
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                          "totalTokens": input_tokens + output_tokens},
+                "metrics": {"latencyMs": int((self.latency + self.token_latency * output_tokens) * 1000)}
+            }
+        }
+
+    async def structured_output(
+        self, output_model, prompt: List[Dict[str, Any]], system_prompt: str = None, **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        output = self.script(prompt, [output_model.__name__], system_prompt or "")
+        if not isinstance(output, tuple):
+            raise ValueError(f"스크립트가 {output_model.__name__} 구조화 출력을 반환하지 않았습니다.")
+        await asyncio.sleep(self.latency)
+        yield {"output": output_model(**output[1])}
+
+
+# ---------------------------------------------------------------------------
+# 로컬 HTTP 대체 서버 (Nominatim / weather.gov / DuckDuckGo / Wikipedia)
+# ---------------------------------------------------------------------------
+
+# 미국 외 지역 좌표 (NWS가 404를 반환하는 경우 재현)
+STUB_LOCATIONS = {
+    "파리": (48.8566, 2.3522),
+    "paris": (48.8566, 2.3522),
+    "서울": (37.5665, 126.978),
+    "seoul": (37.5665, 126.978)
+}
+
+
+def _stub_coordinates(name: str) -> Tuple[float, float]:
+    """지역명 → 좌표 (알 수 없는 지역은 이름 해시로 정한 미국 내 좌표)"""
+    if name.lower() in STUB_LOCATIONS:
+        return STUB_LOCATIONS[name.lower()]
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=4).digest()
+    return 30.0 + digest[0] / 255 * 15, -120.0 + digest[1] / 255 * 45
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """
+    외부 API의 응답 형식을 흉내 내는 핸들러
+
+    GET /nominatim/search, /nws/points/{lat},{lon}, /nws/gridpoints/{grid}/forecast,
+    /duckduckgo/, /wikipedia/w/api.php
+    """
+
+    server_version = "StubAPI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any, headers: Dict[str, str] = None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if url.path == "/nominatim/search":
+            latitude, longitude = _stub_coordinates(params.get("q", ""))
+            self._send(200, [{"lat": str(latitude), "lon": str(longitude), "display_name": params.get("q", "")}])
+        elif url.path.startswith("/nws/points/"):
+            self._nws_points(url.path.rsplit("/", 1)[-1])
+        elif url.path.startswith("/nws/gridpoints/"):
+            self._nws_forecast()
+        elif url.path.rstrip("/") == "/duckduckgo":
+            query = params.get("q", "")
+            self._send(200, {
+                "Abstract": f"{query}에 대한 스텁 요약입니다.",
+                "AbstractSource": "Stub",
+                "AbstractURL": "https://example.org/abstract",
+                "RelatedTopics": [{"Text": f"{query} 관련 주제 {i}", "FirstURL": "https://example.org"} for i in range(5)]
+            })
+        elif url.path == "/wikipedia/w/api.php":
+            self._wikipedia(params)
+        else:
+            self._send(404, {"error": f"unknown path {url.path}"})
+
+    def _nws_points(self, points_key: str):
+        latitude, longitude = (float(value) for value in points_key.split(","))
+        if not (20 <= latitude <= 50 and -125 <= longitude <= -65):
+            self._send(404, {"title": "Data Unavailable For Requested Point"})
+            return
+        grid = f"STB/{int(latitude * 10) % 100},{int(-longitude * 10) % 100}"
+        self._send(200, {"properties": {
+            "gridId": "STB",
+            "gridX": grid.split("/")[1].split(",")[0],
+            "gridY": grid.split(",")[1],
+            "forecast": f"{self.server.base_url}/nws/gridpoints/{grid}/forecast",
+            "relativeLocation": {"properties": {"city": "Stubville", "state": "CA"}}
+        }})
+
+    def _nws_forecast(self):
+        periods = [
+            {
+                "name": f"Period {index}",
+                "temperature": 60 + index,
+                "temperatureUnit": "F",
+                "windSpeed": "5 mph",
+                "windDirection": "NW",
+                "shortForecast": "Sunny",
+                "probabilityOfPrecipitation": {"value": 10}
+            }
+            for index in range(14)
+        ]
+        self._send(
+            200,
+            {"properties": {"updateTime": formatdate(usegmt=True), "periods": periods}},
+            {"Expires": formatdate(time.time() + 1800, usegmt=True)}
+        )
+
+    def _wikipedia(self, params: Dict[str, str]):
+        # generator=search + prop=extracts|info|pageprops 단일 요청 (formatversion=2)
+        query = params.get("gsrsearch", "")
+        limit = int(params.get("gsrlimit", "3"))
+        pages = []
+        for index in range(limit):
+            title = f"{query} {index}" if index else query
+            page_id = int.from_bytes(hashlib.blake2b(title.encode("utf-8"), digest_size=3).digest(), "big")
+            pages.append({
+                "pageid": page_id,
+                "ns": 0,
+                "title": title,
+                "index": index + 1,
+                "extract": f"{title}에 대한 스텁 위키백과 요약입니다. " * 3,
+                "fullurl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+            })
+        self._send(200, {"batchcomplete": True, "query": {"pages": pages}})
+
+
+class StubAPIServer:
+    """로컬 HTTP 대체 서버 (별도 스레드에서 실행)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.02):
+        self.httpd = ThreadingHTTPServer((host, port), StubAPIHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.requests = 0
+        self.httpd.lock = threading.Lock()
+        self.httpd.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-api", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return self.httpd.base_url
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    def endpoint_env(self) -> Dict[str, str]:
+        """mcp_tools가 이 서버를 사용하도록 하는 환경변수"""
+        return {
+            "NOMINATIM_URL": f"{self.base_url}/nominatim/search",
+            "NWS_API_URL": f"{self.base_url}/nws",
+            "DUCKDUCKGO_API_URL": f"{self.base_url}/duckduckgo/",
+            "WIKIPEDIA_API_URL": f"{self.base_url}/wikipedia/w/api.php"
+        }
+
+    def start(self) -> "StubAPIServer":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ---------------------------------------------------------------------------
+# 측정과 보고
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], q: float) -> float:
+    """선형 보간 백분위수 (q: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4)
+    }
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss 단위는 Linux에서 KB, macOS에서 바이트
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class BenchmarkRunner:
+    """동시성 단계별로 쿼리 구성을 반복 실행하여 지연 시간/처리량/메모리 측정"""
+
+    def __init__(self, queries: List[str], model: StubModel, mode: str = None, trace_memory: bool = False):
+        self.queries = queries
+        self.model = model
+        self.mode = mode
+        self.trace_memory = trace_memory
+
+    async def _run_one(self, index: int) -> Dict[str, Any]:
+        from orchestrator_agent import OrchestratorAgent
+
+        query = self.queries[index % len(self.queries)]
+        orchestrator = OrchestratorAgent(self.model, user_id=f"bench_{index}", mode=self.mode)
+        started = time.perf_counter()
+        try:
+            result = await orchestrator.process_user_input_async(query)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        latency = time.perf_counter() - started
+        return {"query": query, "latency": latency, "success": bool(result.get("success")),
+                "timings": result.get("timings", {}), "speculation": result.get("speculation")}
+
+    async def run_level(self, concurrency: int, requests: int) -> Dict[str, Any]:
+        """
+        한 동시성 단계 실행
+
+        Args:
+            concurrency: 동시에 처리할 요청 수
+            requests: 전체 요청 수
+
+        Returns:
+            단계 결과 (지연 시간 분포, 처리량, 메모리)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        model_calls = self.model.calls
+
+        async def limited(index: int):
+            async with semaphore:
+                return await self._run_one(index)
+
+        if self.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        records = await asyncio.gather(*(limited(index) for index in range(requests)))
+        elapsed = time.perf_counter() - started
+        memory = {"peak_rss_mb": _peak_rss_mb()}
+        if self.trace_memory:
+            memory["python_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+            tracemalloc.stop()
+
+        stages = {}
+        for stage in STAGES:
+            values = [record["timings"][stage] for record in records if stage in record["timings"]]
+            if values:
+                stages[stage] = summarize(values)
+
+        level = {
+            "concurrency": concurrency,
+            "requests": requests,
+            "failed": sum(1 for record in records if not record["success"]),
+            "elapsed": round(elapsed, 3),
+            "throughput": round(requests / elapsed, 2) if elapsed else 0.0,
+            "latency": summarize([record["latency"] for record in records]),
+            "stages": stages,
+            "model_calls": self.model.calls - model_calls,
+            "memory": memory
+        }
+        speculations = [record["speculation"] for record in records if record["speculation"]]
+        if speculations:
+            level["speculation"] = {
+                "discarded": sum(1 for item in speculations if item["outcome"] == "discarded"),
+                "wasted_seconds": round(sum(item["wasted_seconds"] for item in speculations), 3),
+                "wasted_model_calls": sum(item["wasted_model_calls"] for item in speculations)
+            }
+        return level
+
+
+def compare_with_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """기준 결과 대비 p95 지연 증가/처리량 감소가 허용 범위를 넘은 항목"""
+    regressions = []
+    baseline_levels = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in report["levels"]:
+        previous = baseline_levels.get(level["concurrency"])
+        if previous is None:
+            continue
+        p95, previous_p95 = level["latency"]["p95"], previous["latency"]["p95"]
+        if previous_p95 and p95 > previous_p95 * (1 + tolerance):
+            regressions.append(f"동시성 {level['concurrency']}: p95 {previous_p95}s → {p95}s")
+        throughput, previous_throughput = level["throughput"], previous["throughput"]
+        if previous_throughput and throughput < previous_throughput * (1 - tolerance):
+            regressions.append(
+                f"동시성 {level['concurrency']}: 처리량 {previous_throughput} → {throughput} req/s"
+            )
+    return regressions
+
+
+def print_report(report: Dict[str, Any], file=sys.stderr):
+    print("=" * 72, file=file)
+    print(f"📊 오프라인 벤치마크 (모드: {report['config']['mode']}, 쿼리 {len(report['config']['queries'])}종)", file=file)
+    print("=" * 72, file=file)
+    print(f"{'동시성':>6} {'요청':>5} {'실패':>4} {'처리량':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'RSS(MB)':>9}", file=file)
+    for level in report["levels"]:
+        latency = level["latency"]
+        print(
+            f"{level['concurrency']:>6} {level['requests']:>5} {level['failed']:>4} "
+            f"{level['throughput']:>8.2f}/s {latency['p50']:>7.3f}s {latency['p95']:>7.3f}s "
+            f"{latency['p99']:>7.3f}s {level['memory']['peak_rss_mb']:>9}",
+            file=file
+        )
+        for stage, values in level["stages"].items():
+            print(
+                f"{'':>6} └ {stage:<14} p50 {values['p50']:.3f}s  p95 {values['p95']:.3f}s  p99 {values['p99']:.3f}s",
+                file=file
+            )
+        if "speculation" in level:
+            speculation = level["speculation"]
+            print(
+                f"{'':>6} └ 추측 실행 취소 {speculation['discarded']}회, 낭비 {speculation['wasted_seconds']:.3f}s, "
+                f"모델 호출 {speculation['wasted_model_calls']}회",
+                file=file
+            )
+    print("=" * 72, file=file)
+
+
+# 벤치마크 동안 적용하는 설정 (이미 지정한 값은 유지)
+BENCHMARK_ENV_DEFAULTS = {
+    "TOOL_CACHE_DB": "",
+    "SEMANTIC_CACHE_ENABLED": "false",
+    "SEMANTIC_CACHE_PATH": "",
+    # 로컬 대체 서버에는 실제 외부 API의 호출 제한을 적용하지 않음 (제한이 아니라 코드 성능을 측정)
+    "UPSTREAM_RATE_LIMIT_ENABLED": "false"
+}
+
+
+@contextlib.contextmanager
+def benchmark_environment(server: StubAPIServer):
+    """
+    블록 실행 동안 외부 API 주소를 대체 서버로 바꾸고 캐시/호출 제한 설정 적용 (종료 시 원래대로 복원)
+
+    mcp_tools의 주소 상수는 모듈을 불러올 때 한 번 읽히므로, 환경변수와 함께 모듈 상수도 직접 바꿉니다.
+    """
+    import mcp_tools
+
+    endpoints = server.endpoint_env()
+    overrides = dict(endpoints)
+    for key, value in BENCHMARK_ENV_DEFAULTS.items():
+        overrides[key] = os.environ.get(key, value)
+    saved_env = {key: os.environ.get(key) for key in overrides}
+    saved_urls = {key: getattr(mcp_tools, key) for key in endpoints}
+
+    os.environ.update(overrides)
+    for key, value in endpoints.items():
+        setattr(mcp_tools, key, value)
+    try:
+        yield
+    finally:
+        for key, value in saved_urls.items():
+            setattr(mcp_tools, key, value)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def run_benchmark(
+    concurrency_levels: List[int],
+    requests: int = None,
+    mode: str = None,
+    model_latency: float = 0.05,
+    token_latency: float = 0.001,
+    response_tokens: int = 60,
+    http_latency: float = 0.02,
+    warmup: bool = True,
+    trace_memory: bool = False
+) -> Dict[str, Any]:
+    """
+    오프라인 벤치마크 실행
+
+    Args:
+        concurrency_levels: 측정할 동시성 단계 목록
+        requests: 단계별 요청 수 (기본값은 쿼리 수 × 4)
+        mode: 오케스트레이터 모드 (기본값은 ORCHESTRATOR_MODE)
+        model_latency: 스텁 모델의 첫 토큰 지연(초)
+        token_latency: 스텁 모델의 출력 토큰당 지연(초)
+        response_tokens: 스텁 모델 답변 길이(토큰)
+        http_latency: 로컬 HTTP 대체 서버 응답 지연(초)
+        warmup: 측정 전 쿼리 구성을 한 번씩 실행 (에이전트 풀/도구 캐시 준비)
+        trace_memory: tracemalloc으로 Python 힙 최대 사용량 측정 (지연 시간이 늘어남)
+
+    Returns:
+        벤치마크 결과
+    """
+    import model_config
+    from workshop_test import WORKSHOP_QUERIES
+
+    model = StubModel(latency=model_latency, token_latency=token_latency, response_tokens=response_tokens)
+    mode = mode or os.getenv("ORCHESTRATOR_MODE", "classic")
+    requests = requests or len(WORKSHOP_QUERIES) * 4
+    runner = BenchmarkRunner(list(WORKSHOP_QUERIES), model, mode, trace_memory)
+
+    report = {
+        "config": {
+            "mode": mode,
+            "queries": list(WORKSHOP_QUERIES),
+            "requests_per_level": requests,
+            "model_latency": model_latency,
+            "token_latency": token_latency,
+            "response_tokens": response_tokens,
+            "http_latency": http_latency
+        },
+        "levels": []
+    }
+    server = StubAPIServer(latency=http_latency).start()
+    model_config.set_model_factory(lambda model_id, **params: model)
+    try:
+        # 에이전트 진행 로그는 버림 (보고서는 stderr, JSON 결과는 stdout/파일)
+        with benchmark_environment(server), open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(devnull):
+            if warmup:
+                asyncio.run(runner.run_level(1, len(WORKSHOP_QUERIES)))
+            for concurrency in concurrency_levels:
+                print(f"⏱️ 동시성 {concurrency} 측정 중...", file=sys.stderr)
+                report["levels"].append(asyncio.run(runner.run_level(concurrency, requests)))
+    finally:
+        model_config.set_model_factory(None)
+        server.close()
+
+    from rate_limit import get_rate_limit_stats
+
+    report["http_requests"] = server.requests
+    # UPSTREAM_RATE_LIMIT_ENABLED=true로 실행한 경우의 호출 제한 대기 현황
+    report["rate_limits"] = get_rate_limit_stats()
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Agents as Tools 오프라인 벤치마크")
+    parser.add_argument("--concurrency", default=os.getenv("BENCHMARK_CONCURRENCY", "1,2,4,8"),
+                        help="측정할 동시성 단계 (쉼표로 구분)")
+    parser.add_argument("--requests", type=int, default=None, help="단계별 요청 수 (기본값: 쿼리 수 × 4)")
+    parser.add_argument("--mode", default=None, help="오케스트레이터 모드 (classic/router/fanout)")
+    parser.add_argument("--model-latency", type=float,
+                        default=float(os.getenv("BENCHMARK_MODEL_LATENCY", "0.05")), help="스텁 모델 첫 토큰 지연(초)")
+    parser.add_argument("--token-latency", type=float,
+                        default=float(os.getenv("BENCHMARK_TOKEN_LATENCY", "0.001")), help="출력 토큰당 지연(초)")
+    parser.add_argument("--response-tokens", type=int,
+                        default=int(os.getenv("BENCHMARK_RESPONSE_TOKENS", "60")), help="스텁 답변 길이(토큰)")
+    parser.add_argument("--http-latency", type=float,
+                        default=float(os.getenv("BENCHMARK_HTTP_LATENCY", "0.02")), help="로컬 HTTP 서버 지연(초)")
+    parser.add_argument("--no-warmup", action="store_true", help="워밍업 실행 생략")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc으로 Python 힙 최대 사용량 측정")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 stdout)")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("BENCHMARK_TOLERANCE", "0.2")),
+                        help="기준 대비 허용하는 성능 저하 비율")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        [int(value) for value in args.concurrency.split(",") if value.strip()],
+        requests=args.requests,
+        mode=args.mode,
+        model_latency=args.model_latency,
+        token_latency=args.token_latency,
+        response_tokens=args.response_tokens,
+        http_latency=args.http_latency,
+        warmup=not args.no_warmup,
+        trace_memory=args.trace_memory
+    )
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    failed = sum(level["failed"] for level in report["levels"])
+    if failed:
+        print(f"❌ 실패한 요청 {failed}건", file=sys.stderr)
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ 성능 저하 감지 (허용 {args.tolerance:.0%}):", file=sys.stderr)
+            for item in regressions:
+                print(f"  - {item}", file=sys.stderr)
+            return 1
+        print("✅ 기준 대비 성능 저하 없음", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
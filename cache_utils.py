@@ -0,0 +1,216 @@
+"""Cache Utils - TTL/LRU 메모리 캐시와 SQLite 디스크 저장소"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from tracing import record_cache
+
+
+# 기본 디스크 캐시 경로 (TOOL_CACHE_DB="" 이면 디스크 저장 비활성화)
+DEFAULT_CACHE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tool_cache.sqlite3")
+
+_MISSING = object()
+
+
+def normalize_key(text: str) -> str:
+    """캐시 키 정규화 (유니코드 NFKC, 소문자, 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFKC", str(text)).lower().split())
+
+
+def get_cache_db_path() -> Optional[str]:
+    """디스크 캐시 경로 반환 (비활성화 시 None)"""
+    path = os.getenv("TOOL_CACHE_DB", DEFAULT_CACHE_DB)
+    return path or None
+
+
+class SQLiteStore:
+    """여러 캐시가 namespace로 나누어 공유하는 SQLite 키-값 저장소"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                return _MISSING, 0.0
+            if row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+                self._conn.commit()
+                return _MISSING, 0.0
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key)
+            )
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float, max_entries: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now)
+            )
+            # 만료 항목 정리 후, 크기 초과분은 가장 오래 사용되지 않은 항목부터 삭제
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?", (namespace, now)
+            )
+            self._conn.execute(
+                """DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (namespace, namespace, max_entries)
+            )
+            self._conn.commit()
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.commit()
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+
+_stores: Dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path: str) -> SQLiteStore:
+    """경로별로 하나의 SQLiteStore를 공유"""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SQLiteStore(path)
+        return _stores[path]
+
+
+class TTLCache:
+    """
+    TTL과 크기 제한(LRU)을 가진 스레드 안전 캐시
+    path가 주어지면 SQLite에 함께 저장하여 프로세스 재시작 후에도 재사용합니다.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1024, ttl: float = 3600, path: str = None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = get_sqlite_store(path) if path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """캐시 조회 (없거나 만료되면 default)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    record_cache(self.namespace, True)
+                    return value
+                del self._entries[key]
+
+        if self._store is not None:
+            try:
+                value, expires_at = self._store.get(self.namespace, key)
+            except sqlite3.Error:
+                value = _MISSING
+            if value is not _MISSING:
+                with self._lock:
+                    self._put_memory(key, value, expires_at)
+                    self.hits += 1
+                    self.disk_hits += 1
+                record_cache(self.namespace, True)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        record_cache(self.namespace, False)
+        return default
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        """캐시 저장 (ttl 미지정 시 기본 TTL 사용)"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+
+        if self._store is not None:
+            try:
+                self._store.set(self.namespace, key, value, expires_at, self.max_entries)
+            except (sqlite3.Error, TypeError, ValueError):
+                # 디스크 저장 실패는 메모리 캐시 동작에 영향을 주지 않음
+                pass
+
+    def _put_memory(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._store is not None:
+            self._store.delete(self.namespace, key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._store is not None:
+            self._store.clear(self.namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
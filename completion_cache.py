@@ -0,0 +1,195 @@
+"""Completion Cache - 같은 모델 요청의 응답을 재사용하는 단계별 완전 일치 캐시"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+from strands.models import Model
+from cache_utils import TTLCache, get_cache_db_path
+from model_config import PIPELINE_STAGES
+from rate_limit import rate_limited
+
+# 캐시 키에 포함하는 샘플링 파라미터
+SAMPLING_KEYS = ("temperature", "top_p", "max_tokens", "stop_sequences", "additional_request_fields")
+
+# 응답이 정상적으로 끝난 경우만 저장
+CACHEABLE_STOP_REASONS = ("end_turn", "tool_use")
+
+
+
+def enabled_stages() -> List[str]:
+    """완성 캐시를 사용할 단계 (COMPLETION_CACHE_STAGES, 쉼표로 구분, 기본값은 사용 안 함)"""
+    stages = os.getenv("COMPLETION_CACHE_STAGES", "")
+    return [stage.strip() for stage in stages.split(",") if stage.strip() in PIPELINE_STAGES]
+
+
+def _normalize_tool_use_ids(value: Any, ids: Dict[str, str]) -> Any:
+    """도구 호출 ID를 등장 순서 번호로 교체 (호출마다 새로 발급되는 ID가 키를 바꾸지 않도록)"""
+    if isinstance(value, dict):
+        return {
+            key: (ids.setdefault(item, f"tool-{len(ids)}") if key == "toolUseId" else _normalize_tool_use_ids(item, ids))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_normalize_tool_use_ids(item, ids) for item in value]
+    return value
+
+
+def completion_key(
+    config: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    tool_specs: Optional[List[Dict[str, Any]]],
+    system_prompt: Optional[str],
+    **request: Any
+) -> str:
+    """모델 ID, 시스템 프롬프트, 메시지, 도구 스펙, 샘플링 파라미터의 해시"""
+    payload = {
+        "model_id": config.get("model_id"),
+        "sampling": {key: config.get(key) for key in SAMPLING_KEYS if config.get(key) is not None},
+        "system_prompt": system_prompt,
+        "messages": _normalize_tool_use_ids(messages, {}),
+        "tool_specs": tool_specs or [],
+        **{key: value for key, value in request.items() if value is not None}
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _replay_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """저장된 이벤트를 재생용으로 변환 (도구 호출 ID는 새로 발급, 토큰 사용량은 0)"""
+    tool_use = event.get("contentBlockStart", {}).get("start", {}).get("toolUse")
+    if tool_use is not None:
+        return {"contentBlockStart": {"start": {"toolUse": {**tool_use, "toolUseId": uuid.uuid4().hex}}}}
+    if "metadata" in event:
+        return {
+            "metadata": {
+                **event["metadata"],
+                "usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+                "metrics": {"latencyMs": 0}
+            }
+        }
+    return event
+
+
+class CachingModel(Model):
+    """
+    모델 래퍼 - 완전히 같은 요청이면 모델을 호출하지 않고 저장된 스트림 이벤트를 재생
+    설정, 토큰 수 계산 등 그 외 속성은 감싼 모델에 그대로 위임합니다.
+    """
+
+    def __init__(self, model: Model, stage: str, cache: TTLCache):
+        self.model = model
+        self.stage = stage
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        # 래퍼에 없는 속성(config 등)은 감싼 모델에서 조회
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    @property
+    def stateful(self) -> bool:
+        return self.model.stateful
+
+    @property
+    def context_window_limit(self) -> Optional[int]:
+        return self.model.context_window_limit
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    async def count_tokens(self, messages: List[Dict[str, Any]], *args: Any, **kwargs: Any) -> int:
+        return await self.model.count_tokens(messages, *args, **kwargs)
+
+    def _key(self, messages, tool_specs, system_prompt, kwargs: Dict[str, Any]) -> str:
+        config = self.get_config()
+        return completion_key(
+            config if isinstance(config, dict) else vars(config),
+            messages,
+            tool_specs,
+            system_prompt,
+            tool_choice=kwargs.get("tool_choice"),
+            system_prompt_content=kwargs.get("system_prompt_content")
+        )
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: List[Dict[str, Any]] = None,
+        system_prompt: str = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        key = self._key(messages, tool_specs, system_prompt, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            for event in cached:
+                yield _replay_event(event)
+            return
+
+        events = []
+        stop_reason = None
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append(event)
+            if "messageStop" in event:
+                stop_reason = event["messageStop"].get("stopReason")
+            yield event
+
+        if stop_reason in CACHEABLE_STOP_REASONS:
+            self.cache.set(key, events)
+
+    async def structured_output(
+        self, output_model, prompt: List[Dict[str, Any]], system_prompt: str = None, **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # 구조화 출력 객체는 JSON으로 저장할 수 없으므로 캐시하지 않음
+        async for event in self.model.structured_output(output_model, prompt, system_prompt, **kwargs):
+            yield event
+
+
+_completion_cache: Optional[TTLCache] = None
+_wrapped_models: Dict[tuple, CachingModel] = {}
+_lock = threading.Lock()
+
+
+def get_completion_cache() -> TTLCache:
+    """단계 공용 완성 캐시 (메모리 LRU + COMPLETION_CACHE_PERSIST=true이면 디스크 저장)"""
+    global _completion_cache
+    with _lock:
+        if _completion_cache is None:
+            persist = os.getenv("COMPLETION_CACHE_PERSIST", "false").lower() == "true"
+            _completion_cache = TTLCache(
+                "completion",
+                max_entries=int(os.getenv("COMPLETION_CACHE_MAX_ENTRIES", "1000")),
+                ttl=float(os.getenv("COMPLETION_CACHE_TTL", "3600")),
+                path=get_cache_db_path() if persist else None
+            )
+        return _completion_cache
+
+
+def stage_model(model: Model, stage: str) -> Model:
+    """
+    단계별 모델 - Bedrock 모델은 단계별 호출 제한 래퍼로 감싸고, 해당 단계에 완성 캐시가 켜져 있으면 그 위에 캐시 래퍼
+    (캐시 적중은 호출 제한을 거치지 않음)
+
+    Args:
+        model: 단계에서 사용할 모델
+        stage: 단계 이름 (PIPELINE_STAGES 중 하나)
+
+    Returns:
+        캐시 래퍼, 호출 제한 래퍼 또는 원래 모델
+    """
+    model = rate_limited(model, stage)
+    if stage not in enabled_stages() or isinstance(model, CachingModel):
+        return model
+    cache = get_completion_cache()
+    key = (id(model), stage)
+    with _lock:
+        wrapped = _wrapped_models.get(key)
+        if wrapped is None or wrapped.model is not model:
+            wrapped = CachingModel(model, stage, cache)
+            _wrapped_models[key] = wrapped
+        return wrapped
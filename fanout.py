@@ -0,0 +1,75 @@
+"""Fan-out Executor - 독립적인 하위 에이전트 호출을 동시에 실행"""
+import asyncio
+import os
+import time
+from typing import List, Dict, Any
+from router import RouteStep
+from sub_agents import SUB_AGENTS_ASYNC
+
+
+class FanOutExecutor:
+    """
+    실행 계획을 의존성 그래프로 보고, 선행 단계가 끝난 단계부터 이벤트 루프 태스크로 동시에 실행
+    독립적인 단계만 있는 요청은 전체 지연이 가장 느린 단계 수준으로 줄어듭니다.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv("FANOUT_MAX_WORKERS", "4"))
+
+    @staticmethod
+    def _dependencies(steps: List[RouteStep]) -> Dict[int, set]:
+        """단계 번호(1부터) → 선행 단계 번호 집합 (범위를 벗어나거나 자기 자신/뒤 단계를 가리키면 무시)"""
+        return {
+            index: {dep for dep in step.depends_on if 1 <= dep < index}
+            for index, step in enumerate(steps, 1)
+        }
+
+    @staticmethod
+    def _step_argument(step: RouteStep, context: List[Dict[str, Any]]) -> str:
+        if not context:
+            return step.argument
+        # 선행 단계 결과를 입력에 덧붙여 전달
+        references = "\n\n".join(f"[{item['agent']}] {item['output']}" for item in context)
+        return f"{step.argument}\n\n참고할 이전 단계 결과:\n{references}"
+
+    @staticmethod
+    def _step_result(index: int, step: RouteStep, output: Any, elapsed: float = None) -> Dict[str, Any]:
+        return {
+            "step": index,
+            "agent": step.agent,
+            "argument": step.argument,
+            "output": str(output),
+            "elapsed": round(elapsed, 3) if elapsed is not None else None
+        }
+
+    async def run_async(self, steps: List[RouteStep]) -> List[Dict[str, Any]]:
+        """
+        계획의 모든 단계를 동시에 실행 (동시 실행 수는 max_workers로 제한)
+
+        Args:
+            steps: 라우터가 만든 실행 단계 목록
+
+        Returns:
+            단계 순서대로 정렬된 실행 결과 목록
+        """
+        dependencies = self._dependencies(steps)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        tasks: Dict[int, asyncio.Task] = {}
+
+        async def _run(index: int, step: RouteStep) -> Dict[str, Any]:
+            context = [await tasks[dep] for dep in sorted(dependencies[index])]
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    output = await SUB_AGENTS_ASYNC[step.agent](self._step_argument(step, context))
+                except Exception as e:
+                    output = f"실행 중 오류가 발생했습니다: {str(e)}"
+                    return self._step_result(index, step, output)
+                return self._step_result(index, step, output, time.perf_counter() - start)
+
+        # 선행 단계는 항상 앞 번호이므로 순서대로 태스크를 만들면 의존 태스크가 먼저 존재함
+        for index, step in enumerate(steps, 1):
+            tasks[index] = asyncio.create_task(_run(index, step))
+
+        return list(await asyncio.gather(*(tasks[index] for index in sorted(tasks))))
+
@@ -0,0 +1,143 @@
+"""History Manager - 토큰 예산 기반 대화 기록 관리"""
+import json
+import os
+from collections import deque
+from typing import Any, Dict, List
+
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.hooks import BeforeModelCallEvent
+
+COMPACTED_MARKER = "[이전 도구 결과 요약]"
+
+
+def _content_text(content: Dict[str, Any]) -> str:
+    """메시지 content 블록의 텍스트 표현 (토큰 추정용)"""
+    if "text" in content:
+        return content["text"]
+    if "toolUse" in content:
+        tool_use = content["toolUse"]
+        return tool_use.get("name", "") + json.dumps(tool_use.get("input", {}), ensure_ascii=False)
+    if "toolResult" in content:
+        return "".join(
+            item["text"] if "text" in item else json.dumps(item.get("json", ""), ensure_ascii=False, default=str)
+            for item in content["toolResult"].get("content", [])
+        )
+    return ""
+
+
+def estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """메시지 하나의 토큰 수 추정 (UTF-8 4바이트당 1토큰 + 메시지 오버헤드)"""
+    size = sum(len(_content_text(content).encode("utf-8")) for content in message.get("content", []))
+    return size // 4 + 4
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """대화 기록 전체의 토큰 수 추정"""
+    return sum(estimate_message_tokens(message) for message in messages)
+
+
+class TokenBudgetConversationManager(SlidingWindowConversationManager):
+    """
+    토큰 예산 기반 대화 기록 관리자
+    최근 턴은 그대로 유지하고, 오래된 턴의 도구 결과는 앞부분만 남겨 요약하며,
+    그래도 예산을 넘으면 가장 오래된 턴부터 제거합니다.
+    모델 호출마다 전송되는 대화 기록 토큰 수를 기록합니다.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = None,
+        keep_recent_turns: int = None,
+        tool_result_chars: int = None,
+        window_size: int = 40
+    ):
+        super().__init__(window_size=window_size)
+        self.token_budget = token_budget or int(os.getenv("ORCHESTRATOR_HISTORY_TOKEN_BUDGET", "4000"))
+        self.keep_recent_turns = (
+            keep_recent_turns if keep_recent_turns is not None
+            else int(os.getenv("ORCHESTRATOR_HISTORY_RECENT_TURNS", "2"))
+        )
+        self.tool_result_chars = tool_result_chars or int(os.getenv("ORCHESTRATOR_HISTORY_TOOL_RESULT_CHARS", "300"))
+
+        self.model_calls = 0
+        self.recent_call_tokens: deque = deque(maxlen=100)
+        self.compacted_results = 0
+        self.dropped_turns = 0
+
+    def register_hooks(self, registry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(BeforeModelCallEvent, self._record_history_tokens)
+
+    def _record_history_tokens(self, event: BeforeModelCallEvent) -> None:
+        self.model_calls += 1
+        self.recent_call_tokens.append(estimate_tokens(event.agent.messages))
+
+    def calls_since(self, model_calls: int) -> List[int]:
+        """model_calls 시점 이후 모델 호출별 대화 기록 토큰 수"""
+        count = min(self.model_calls - model_calls, len(self.recent_call_tokens))
+        return list(self.recent_call_tokens)[-count:] if count > 0 else []
+
+    @staticmethod
+    def _turn_starts(messages: List[Dict[str, Any]]) -> List[int]:
+        """사용자 입력으로 시작하는 턴의 시작 인덱스 (도구 결과 메시지는 제외)"""
+        return [
+            index for index, message in enumerate(messages)
+            if message["role"] == "user"
+            and not any("toolResult" in content for content in message.get("content", []))
+        ]
+
+    def _compact_tool_results(self, messages: List[Dict[str, Any]], end: int):
+        """end 이전 메시지의 도구 결과를 앞부분만 남긴 요약으로 교체"""
+        for message in messages[:end]:
+            for content in message.get("content", []):
+                if "toolResult" not in content:
+                    continue
+                text = _content_text(content)
+                if text.startswith(COMPACTED_MARKER) or len(text) <= self.tool_result_chars:
+                    continue
+                content["toolResult"] = {
+                    **content["toolResult"],
+                    "content": [{
+                        "text": f"{COMPACTED_MARKER} {text[:self.tool_result_chars]} ... ({len(text)}자 중 일부)"
+                    }]
+                }
+                self.compacted_results += 1
+
+    def apply_management(self, agent, **kwargs: Any) -> None:
+        """요청 처리가 끝날 때마다 대화 기록을 토큰 예산 안으로 정리"""
+        messages = agent.messages
+        turn_starts = self._turn_starts(messages)
+        if len(turn_starts) <= self.keep_recent_turns:
+            return
+
+        # 1. 최근 턴을 제외한 도구 결과 요약
+        recent_start = turn_starts[-self.keep_recent_turns] if self.keep_recent_turns else len(messages)
+        self._compact_tool_results(messages, recent_start)
+
+        # 2. 예산을 넘으면 가장 오래된 턴부터 제거 (최근 턴은 유지)
+        token_counts = [estimate_message_tokens(message) for message in messages]
+        total = sum(token_counts)
+        removed = 0
+        turns = turn_starts[1:len(turn_starts) - self.keep_recent_turns + 1]
+        for next_turn_start in turns:
+            if total <= self.token_budget:
+                break
+            total -= sum(token_counts[removed:next_turn_start])
+            removed = next_turn_start
+            self.dropped_turns += 1
+
+        if removed:
+            del messages[:removed]
+            self.removed_message_count += removed
+
+    def stats(self) -> Dict[str, Any]:
+        """대화 기록 관리 현황"""
+        return {
+            "token_budget": self.token_budget,
+            "keep_recent_turns": self.keep_recent_turns,
+            "model_calls": self.model_calls,
+            "last_history_tokens": self.recent_call_tokens[-1] if self.recent_call_tokens else 0,
+            "compacted_tool_results": self.compacted_results,
+            "dropped_turns": self.dropped_turns,
+            "removed_message_count": self.removed_message_count
+        }
@@ -1,17 +1,18 @@
 """Agents as Tools 패턴을 사용한 다중 에이전트 시스템"""
+import argparse
 import os
-import sys
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 from orchestrator_agent import OrchestratorAgent
-from model_config import get_configured_model
+from model_config import get_shared_model
 
 class MultiAgentApplication:
     """Agents as Tools- multi Agent"""
 
-    def __init__(self, model_id: str = None, user_id: str = "workshop_user"):
-        self.model = get_configured_model(model_id)
+    def __init__(self, model_id: str = None, user_id: str = "workshop_user", streaming: bool = None):
+        self.model = get_shared_model(model_id)
         self.user_id = user_id
-        self.orchestrator_agent = OrchestratorAgent(self.model, user_id)
+        self.orchestrator_agent = OrchestratorAgent(self.model, user_id, streaming=streaming)
+        self.streaming = self.orchestrator_agent.streaming
         # 시스템 정보 출력
         model_name = type(self.model).__name__
         current_model_id = getattr(self.model, 'model_id', 'unknown')
@@ -28,10 +29,10 @@ class MultiAgentApplication:
         print("• Orchestrator Agent - 오케스트레이터 (Sub Agents 관리)")
         print("=" * 60)
 
-    def process_input(self, user_input: str) -> Dict[str, Any]:
-        """사용자 입력을 Orchestrator Agent를 통해 처리"""
+    def process_input(self, user_input: str, deadline: float = None) -> Dict[str, Any]:
+        """사용자 입력을 Orchestrator Agent를 통해 처리 (deadline: 요청 전체 기한(초), 없으면 REQUEST_DEADLINE)"""
         try:
-            result = self.orchestrator_agent.process_user_input(user_input)
+            result = self.orchestrator_agent.process_user_input(user_input, deadline)
             return result
         except Exception as e:
             return {
@@ -40,6 +41,31 @@ class MultiAgentApplication:
                 "user_input": user_input
             }
 
+    async def process_input_async(self, user_input: str, deadline: float = None) -> Dict[str, Any]:
+        """process_input의 비동기 버전 - 하나의 이벤트 루프에서 여러 요청을 동시에 처리"""
+        try:
+            return await self.orchestrator_agent.process_user_input_async(user_input, deadline)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"처리 중 오류가 발생했습니다: {str(e)}",
+                "user_input": user_input
+            }
+
+    def stream_input(self, user_input: str, deadline: float = None) -> Iterator[Dict[str, Any]]:
+        """사용자 입력을 처리하며 최종 답변 토큰을 스트리밍 (마지막 이벤트는 process_input과 같은 결과)"""
+        try:
+            yield from self.orchestrator_agent.stream_user_input(user_input, deadline)
+        except Exception as e:
+            yield {
+                "event": "result",
+                "result": {
+                    "success": False,
+                    "error": f"처리 중 오류가 발생했습니다: {str(e)}",
+                    "user_input": user_input
+                }
+            }
+
     def run_single_query(self, query: str) -> Dict[str, Any]:
         """단일 쿼리 실행"""
         return self.process_input(query)
@@ -64,6 +90,33 @@ class MultiAgentApplication:
         print(response_text)
         print("🎯" + "="*58 + "🎯")
 
+    def run_and_print(self, user_input: str) -> Dict[str, Any]:
+        """요청을 처리하고 최종 응답 출력 (스트리밍 모드에서는 토큰이 도착하는 대로 출력)"""
+        if not self.streaming:
+            result = self.process_input(user_input)
+            self.print_final_response(self.format_response(result))
+            return result
+
+        result = {}
+        started = False
+        for event in self.stream_input(user_input):
+            if event["event"] == "token":
+                if not started:
+                    print("\n" + "🎯" + "="*58 + "🎯")
+                    print("🤖 최종 응답")
+                    started = True
+                print(event["text"], end="", flush=True)
+            elif event["event"] == "result":
+                result = event["result"]
+
+        if started:
+            print()
+            print("🎯" + "="*58 + "🎯")
+        else:
+            # 명확화 질문이나 오류처럼 토큰 없이 끝난 경우
+            self.print_final_response(self.format_response(result))
+        return result
+
     def run_interactive(self):
         """대화형 모드 실행"""
         print("\n🚀 대화형 모드 시작!")
@@ -85,15 +138,11 @@ class MultiAgentApplication:
                     print("⚠️ 메시지를 입력해주세요.")
                     continue
 
-                # 입력 처리
-                result = self.process_input(user_input)
-                
-                # 결과 출력 - 시인성 개선
-                response_text = self.format_response(result)
+                # 입력 처리 및 결과 출력
+                result = self.run_and_print(user_input)
                 
                 # 추가 정보가 필요한 경우 대화 계속
                 if result.get("needs_clarification", False):
-                    self.print_final_response(response_text)
                     print("\n💡 더 구체적으로 알려주시면 정확한 정보를 찾아드릴 수 있습니다.")
                     
                     # 사용자의 추가 입력 대기
@@ -111,12 +160,7 @@ class MultiAgentApplication:
                     combined_input = f"{user_input} - {follow_up}"
                     print(f"\n[System] 결합된 요청으로 재 처리: '{combined_input}'")
                     
-                    result = self.process_input(combined_input)
-                    response_text = self.format_response(result)
-                    self.print_final_response(response_text)
-                else:
-                    # 바로 실행된 경우
-                    self.print_final_response(response_text)
+                    self.run_and_print(combined_input)
                 
                 print("\n" + "-" * 50 + "\n")
 
@@ -127,20 +171,66 @@ class MultiAgentApplication:
                 print(f"\n❌ 오류 발생: {str(e)}")
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Agents as Tools multi agent demo")
+    parser.add_argument("query", nargs="*", help="단일 쿼리 (없으면 대화형 모드)")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="최종 답변을 토큰 단위로 스트리밍 (MODEL_STREAMING=true와 동일)")
+    parser.add_argument("--serve", action="store_true", help="HTTP 서버 모드로 실행")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"), help="서버 호스트 (기본: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8080")), help="서버 포트 (기본: 8080)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="동시에 처리할 최대 요청 수 (기본: 서버 SERVER_CONCURRENCY 또는 8, 배치 BATCH_CONCURRENCY 또는 4)")
+    parser.add_argument("--max-queue", type=int, default=None,
+                        help="대기할 수 있는 최대 요청 수, 초과 시 503 (기본: SERVER_MAX_QUEUE 또는 64)")
+    parser.add_argument("--batch", metavar="PATH",
+                        help="JSONL 파일의 쿼리를 일괄 처리 ('-'이면 stdin)")
+    parser.add_argument("--output", metavar="PATH", help="배치 결과 JSONL 파일 (기본: stdout)")
+    parser.add_argument("--unordered", action="store_true", help="배치 결과를 입력 순서 대신 완료되는 대로 기록")
+    parser.add_argument("--resume", action="store_true", help="결과 파일에 이미 성공한 쿼리는 건너뛰고 이어서 처리")
+    return parser.parse_args(argv)
+
+
 def main():
     """메인 함수"""
+    args = parse_args()
+
+    if args.serve:
+        # HTTP 서버 모드
+        from server import run_server
+        run_server(args.host, args.port, concurrency=args.concurrency, max_queue=args.max_queue)
+        return
+
+    if args.batch:
+        # 배치 모드
+        from batch import run_batch
+        run_batch(args.batch, args.output, concurrency=args.concurrency,
+                  ordered=not args.unordered, resume=args.resume)
+        return
+
     # 사용자 ID 설정
     user_id = os.getenv("USER_ID", "workshop_user")
 
     # 애플리케이션 초기화
-    app = MultiAgentApplication(user_id=user_id)
+    app = MultiAgentApplication(user_id=user_id, streaming=args.stream)
 
     # 실행 모드 결정
-    if len(sys.argv) > 1:
+    if args.query:
         # 단일 쿼리 모드
-        query = " ".join(sys.argv[1:])
-        result = app.run_single_query(query)
-        print(app.format_response(result))
+        query = " ".join(args.query)
+        if app.streaming:
+            streamed = False
+            for event in app.stream_input(query):
+                if event["event"] == "token":
+                    streamed = True
+                    print(event["text"], end="", flush=True)
+                elif event["event"] == "result" and not streamed:
+                    print(app.format_response(event["result"]))
+            if streamed:
+                print()
+        else:
+            result = app.run_single_query(query)
+            print(app.format_response(result))
     else:
         # 대화형 모드
         app.run_interactive()
@@ -1,14 +1,86 @@
 """MCP Tools for the multi-agent system"""
-import httpx
-import wikipedia
 import asyncio
 import json
-from typing import Dict, Any
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Tuple
 from strands import tool
+from tool_runtime import get_tool_runtime, sync_tool
+from cache_utils import TTLCache, normalize_key, get_cache_db_path
+from tracing import current_span, traced
+from resilience import call_upstream, error_details
 
 
-@tool
-def get_position(location: str) -> Dict[str, Any]:
+# 지오코딩 캐시 - 자주 묻는 도시는 Nominatim 호출 없이 응답
+_geocode_cache = TTLCache(
+    "geocode",
+    max_entries=int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "2000")),
+    ttl=float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600))),
+    path=get_cache_db_path()
+)
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_CACHE_NEGATIVE_TTL", "600"))
+
+
+def get_geocode_cache_stats() -> Dict[str, Any]:
+    """지오코딩 캐시 히트/미스 통계"""
+    return _geocode_cache.stats()
+
+
+# Wikipedia 캐시 - 언어별 검색어 → 검색 결과, 선택된 문서(동음이의어 해석 포함), 요약, URL
+WIKIPEDIA_CACHE_TTL = float(os.getenv("WIKIPEDIA_CACHE_TTL", str(7 * 24 * 3600)))
+WIKIPEDIA_NEGATIVE_TTL = float(os.getenv("WIKIPEDIA_CACHE_NEGATIVE_TTL", "600"))
+WIKIPEDIA_CACHE_MAX_ENTRIES = int(os.getenv("WIKIPEDIA_CACHE_MAX_ENTRIES", "2000"))
+
+_wikipedia_cache = TTLCache(
+    "wikipedia", WIKIPEDIA_CACHE_MAX_ENTRIES, WIKIPEDIA_CACHE_TTL, get_cache_db_path()
+)
+WIKIPEDIA_SEARCH_RESULTS = int(os.getenv("WIKIPEDIA_SEARCH_RESULTS", "3"))
+WIKIPEDIA_SUMMARY_SENTENCES = int(os.getenv("WIKIPEDIA_SUMMARY_SENTENCES", "3"))
+
+
+# NWS 캐시 - 좌표→격자 매핑은 고정이므로 길게, 예보는 응답의 Expires까지
+_nws_points_cache = TTLCache(
+    "nws_points",
+    max_entries=int(os.getenv("NWS_POINTS_CACHE_MAX_ENTRIES", "5000")),
+    ttl=float(os.getenv("NWS_POINTS_CACHE_TTL", str(30 * 24 * 3600))),
+    path=get_cache_db_path()
+)
+_nws_forecast_cache = TTLCache(
+    "nws_forecast",
+    max_entries=int(os.getenv("NWS_FORECAST_CACHE_MAX_ENTRIES", "2000")),
+    ttl=float(os.getenv("NWS_FORECAST_CACHE_TTL", "1800")),
+    path=get_cache_db_path()
+)
+NWS_FORECAST_MIN_TTL = float(os.getenv("NWS_FORECAST_CACHE_MIN_TTL", "60"))
+NWS_HEADERS = {"Accept": "application/geo+json"}
+
+# 외부 API 주소 (벤치마크 등에서 로컬 대체 서버로 바꿀 수 있음)
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+NWS_API_URL = os.getenv("NWS_API_URL", "https://api.weather.gov").rstrip("/")
+DUCKDUCKGO_API_URL = os.getenv("DUCKDUCKGO_API_URL", "https://api.duckduckgo.com/")
+# {lang}은 호출별 언어 코드로 치환
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://{lang}.wikipedia.org/w/api.php")
+WIKIPEDIA_HEADERS = {"User-Agent": "strandsagent-agentic-collaborator-demo (MediaWiki API client)"}
+
+
+def get_nws_cache_stats() -> Dict[str, Any]:
+    """NWS 격자/예보 캐시 히트/미스 통계"""
+    return {
+        "points": _nws_points_cache.stats(),
+        "forecast": _nws_forecast_cache.stats()
+    }
+
+
+def get_wikipedia_cache_stats() -> Dict[str, Any]:
+    """Wikipedia 캐시 히트/미스 통계"""
+    return _wikipedia_cache.stats()
+
+
+@tool(name="get_position")
+@traced("tool", "get_position")
+async def get_position_async(location: str) -> Dict[str, Any]:
     """Get latitude and longitude coordinates for a given location name
     
     Args:
@@ -18,70 +90,235 @@ def get_position(location: str) -> Dict[str, Any]:
         Dictionary containing coordinates and location information
     """
     try:
+        # 캐시 확인 (정규화된 지역명 기준)
+        cache_key = normalize_key(location)
+        cached = _geocode_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "location": location, "cached": True}
+
         # Using OpenStreetMap Nominatim API for geocoding
-        import httpx
-        import asyncio
-        
+        runtime = get_tool_runtime()
+
         async def fetch_coordinates():
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://nominatim.openstreetmap.org/search",
-                    params={
-                        "q": location,
-                        "format": "json",
-                        "limit": 1
-                    },
-                    headers={
-                        "User-Agent": "StrandsAgents/1.0",
-                        "Accept": "application/json",
-                        "Accept-Charset": "utf-8"
-                    },
-                    timeout=10.0
-                )
+            client = await runtime.get_client()
+            response = await call_upstream("nominatim", lambda: client.get(
+                NOMINATIM_URL,
+                params={
+                    "q": location,
+                    "format": "json",
+                    "limit": 1
+                }
+            ))
+            
+            if response.status_code == 200:
+                # UTF-8 디코딩 안전 처리
+                try:
+                    data = response.json()
+                except UnicodeDecodeError:
+                    content = response.content.decode('utf-8', errors='ignore')
+                    data = json.loads(content)
                 
-                if response.status_code == 200:
-                    # UTF-8 디코딩 안전 처리
-                    try:
-                        data = response.json()
-                    except UnicodeDecodeError:
-                        content = response.content.decode('utf-8', errors='ignore')
-                        data = json.loads(content)
-                    
-                    if data:
-                        result = data[0]
-                        return {
-                            "success": True,
-                            "location": location,
-                            "latitude": float(result["lat"]),
-                            "longitude": float(result["lon"]),
-                            "display_name": result.get("display_name", location)
-                        }
+                if data:
+                    result = data[0]
+                    return {
+                        "success": True,
+                        "location": location,
+                        "latitude": float(result["lat"]),
+                        "longitude": float(result["lon"]),
+                        "display_name": result.get("display_name", location)
+                    }
                 
                 return {
                     "success": False,
                     "error": f"Location '{location}' not found",
-                    "location": location
+                    "location": location,
+                    "not_found": True
                 }
+            
+            return {
+                "success": False,
+                "error": f"Geocoding request failed with status {response.status_code}",
+                "location": location
+            }
+        
+        # 공유 I/O 루프에서 실행
+        result = await runtime.run_async(fetch_coordinates())
         
-        # Run async function
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        # 성공 결과는 긴 TTL, "찾을 수 없음" 결과는 짧은 TTL로 캐시
+        if result.get("success"):
+            _geocode_cache.set(cache_key, result)
+        elif result.get("not_found"):
+            _geocode_cache.set(cache_key, result, ttl=GEOCODE_NEGATIVE_TTL)
         
-        return loop.run_until_complete(fetch_coordinates())
+        return result
         
     except Exception as e:
         return {
             "success": False,
             "error": f"Error getting position for {location}: {str(e)}",
-            "location": location
+            "location": location,
+            **error_details(e)
         }
 
 
-@tool
-def wikipedia_search(query: str) -> Dict[str, Any]:
+# 동기 도구 - 공유 I/O 루프에서 비동기 구현 실행
+get_position = sync_tool(get_position_async)
+
+
+def _expires_ttl(expires: str) -> float:
+    """Expires 헤더까지 남은 시간(초) - 없거나 해석할 수 없으면 기본 TTL"""
+    if not expires:
+        return _nws_forecast_cache.ttl
+    try:
+        remaining = parsedate_to_datetime(expires).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return _nws_forecast_cache.ttl
+    return max(remaining, NWS_FORECAST_MIN_TTL)
+
+
+def _summarize_period(period: Dict[str, Any]) -> Dict[str, Any]:
+    """예보 기간 하나를 LLM 컨텍스트용으로 축약"""
+    precipitation = (period.get("probabilityOfPrecipitation") or {}).get("value")
+    return {
+        "name": period.get("name", ""),
+        "temperature": f"{period.get('temperature')}°{period.get('temperatureUnit', 'F')}",
+        "wind": f"{period.get('windSpeed', '')} {period.get('windDirection', '')}".strip(),
+        "forecast": period.get("shortForecast", ""),
+        "precipitation": f"{precipitation}%" if precipitation is not None else None
+    }
+
+
+@tool(name="get_weather_forecast")
+@traced("tool", "get_weather_forecast")
+async def get_weather_forecast_async(location: str, periods: int = 4) -> Dict[str, Any]:
+    """Get the National Weather Service forecast for a US location in a single call
+    
+    Resolves the location to coordinates, maps them to the NWS forecast grid and
+    returns a compact forecast summary. Only US locations are supported.
+    
+    Args:
+        location: The name of the location (e.g. "New York", "Seattle, WA")
+        periods: Number of forecast periods to return (12-hour periods, default 4)
+        
+    Returns:
+        Dictionary containing the location and a compact forecast per period
+    """
+    try:
+        position = await get_position_async(location)
+        if not position.get("success"):
+            return position
+
+        latitude = round(position["latitude"], 4)
+        longitude = round(position["longitude"], 4)
+        points_key = f"{latitude},{longitude}"
+        runtime = get_tool_runtime()
+
+        async def fetch_grid():
+            client = await runtime.get_client()
+            response = await call_upstream("nws", lambda: client.get(
+                f"{NWS_API_URL}/points/{points_key}",
+                headers=NWS_HEADERS,
+                follow_redirects=True
+            ))
+            
+            if response.status_code == 200:
+                properties = response.json().get("properties", {})
+                relative_location = (properties.get("relativeLocation") or {}).get("properties", {})
+                return {
+                    "success": True,
+                    "grid": f"{properties.get('gridId')}/{properties.get('gridX')},{properties.get('gridY')}",
+                    "forecast_url": properties.get("forecast"),
+                    "city": relative_location.get("city"),
+                    "state": relative_location.get("state")
+                }
+            
+            if response.status_code == 404:
+                return {
+                    "success": False,
+                    "error": "미국 지역만 지원합니다 (National Weather Service 관할 외 지역)",
+                    "location": location,
+                    "not_supported": True
+                }
+            
+            return {
+                "success": False,
+                "error": f"NWS points request failed with status {response.status_code}",
+                "location": location
+            }
+
+        async def fetch_forecast(forecast_url: str):
+            client = await runtime.get_client()
+            response = await call_upstream("nws", lambda: client.get(forecast_url, headers=NWS_HEADERS))
+            
+            if response.status_code == 200:
+                properties = response.json().get("properties", {})
+                return {
+                    "success": True,
+                    "updated": properties.get("updateTime") or properties.get("generatedAt"),
+                    "periods": [_summarize_period(period) for period in properties.get("periods", [])]
+                }, response.headers.get("Expires")
+            
+            return {
+                "success": False,
+                "error": f"NWS forecast request failed with status {response.status_code}",
+                "location": location
+            }, None
+
+        # 좌표 → 예보 격자 (좌표별로 고정이므로 길게 캐시, 미국 외 지역도 캐시)
+        grid = _nws_points_cache.get(points_key)
+        if grid is None:
+            grid = await runtime.run_async(fetch_grid())
+            if grid.get("success") or grid.get("not_supported"):
+                _nws_points_cache.set(points_key, grid)
+        if not grid.get("success"):
+            return {**grid, "location": location}
+
+        # 격자별 예보 (응답의 Expires까지 캐시)
+        forecast = _nws_forecast_cache.get(grid["grid"])
+        cached = forecast is not None
+        if not cached:
+            forecast, expires = await runtime.run_async(fetch_forecast(grid["forecast_url"]))
+            if not forecast.get("success"):
+                return forecast
+            _nws_forecast_cache.set(grid["grid"], forecast, ttl=_expires_ttl(expires))
+
+        return {
+            "success": True,
+            "location": location,
+            "display_name": position.get("display_name", location),
+            "latitude": latitude,
+            "longitude": longitude,
+            "nws_location": ", ".join(filter(None, [grid.get("city"), grid.get("state")])),
+            "updated": forecast.get("updated"),
+            "periods": forecast["periods"][:max(1, periods)],
+            "cached": cached,
+            "source": "National Weather Service"
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error getting weather forecast for {location}: {str(e)}",
+            "location": location,
+            **error_details(e)
+        }
+
+
+get_weather_forecast = sync_tool(get_weather_forecast_async)
+
+
+def _select_wikipedia_page(pages: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """검색 순위가 가장 높은 일반 문서 (동음이의어 문서는 건너뜀, 모두 동음이의어면 첫 문서)"""
+    ranked = sorted(pages, key=lambda page: page.get("index", 0))
+    for page in ranked:
+        if "disambiguation" not in (page.get("pageprops") or {}):
+            return page, page is not ranked[0]
+    return ranked[0], False
+
+
+@tool(name="wikipedia_search")
+@traced("tool", "wikipedia_search")
+async def wikipedia_search_async(query: str, language: str = "en") -> Dict[str, Any]:
     """Search Wikipedia for comprehensive encyclopedic information
     
     BEST FOR:
@@ -99,75 +336,88 @@ def wikipedia_search(query: str) -> Dict[str, Any]:
     
     Args:
         query: The search query for Wikipedia (use specific, well-known terms)
+        language: Wikipedia language code (default "en")
         
     Returns:
         Dictionary containing comprehensive Wikipedia information with summary and URL
     """
     try:
-        # Set language to English
-        wikipedia.set_lang("en")
-        
-        # Search for the query with UTF-8 safe handling
-        try:
-            search_results = wikipedia.search(query, results=3)
-        except UnicodeDecodeError:
-            # Retry with ASCII-safe query
-            safe_query = query.encode('ascii', errors='ignore').decode('ascii')
-            search_results = wikipedia.search(safe_query, results=3)
-        
-        if not search_results:
-            return {
-                "success": False,
-                "error": f"No Wikipedia results found for '{query}'",
-                "query": query
-            }
-        
-        # Get the first result's summary
-        page_title = search_results[0]
-        try:
-            page = wikipedia.page(page_title)
-            summary = wikipedia.summary(page_title, sentences=3)
-            
-            return {
-                "success": True,
-                "query": query,
-                "title": page.title,
-                "summary": summary,
-                "url": page.url,
-                "search_results": search_results
-            }
-            
-        except wikipedia.exceptions.DisambiguationError as e:
-            # Handle disambiguation by taking the first option
-            page = wikipedia.page(e.options[0])
-            summary = wikipedia.summary(e.options[0], sentences=3)
+        language = (language or "en").strip().lower()
+        cache_key = f"{language}:{normalize_key(query)}"
+        cached = _wikipedia_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "query": query, "cached": True}
+
+        runtime = get_tool_runtime()
+
+        async def fetch_pages():
+            # 검색 결과, 문서 도입부 요약, URL, 동음이의어 여부를 한 번의 요청으로 조회
+            client = await runtime.get_client()
+            response = await call_upstream("wikipedia", lambda: client.get(
+                WIKIPEDIA_API_URL.format(lang=language),
+                params={
+                    "action": "query",
+                    "format": "json",
+                    "formatversion": "2",
+                    "generator": "search",
+                    "gsrsearch": query,
+                    "gsrlimit": WIKIPEDIA_SEARCH_RESULTS,
+                    "prop": "extracts|info|pageprops",
+                    "exintro": "1",
+                    "explaintext": "1",
+                    "exsentences": WIKIPEDIA_SUMMARY_SENTENCES,
+                    "exlimit": WIKIPEDIA_SEARCH_RESULTS,
+                    "inprop": "url",
+                    "ppprop": "disambiguation",
+                    "redirects": "1"
+                },
+                headers=WIKIPEDIA_HEADERS
+            ))
             
-            return {
-                "success": True,
-                "query": query,
-                "title": page.title,
-                "summary": summary,
-                "url": page.url,
-                "search_results": search_results,
-                "note": "Disambiguation resolved automatically"
-            }
-        except UnicodeDecodeError:
-            return {
+            if response.status_code != 200:
+                raise RuntimeError(f"Wikipedia request failed with status {response.status_code}")
+            return response.json().get("query", {}).get("pages", [])
+
+        pages = await runtime.run_async(fetch_pages())
+        if not pages:
+            result = {
                 "success": False,
-                "error": f"Text encoding issue with Wikipedia page for '{query}'",
+                "error": f"No Wikipedia results found for '{query}'",
                 "query": query
             }
+            _wikipedia_cache.set(cache_key, result, ttl=WIKIPEDIA_NEGATIVE_TTL)
+            return result
+
+        page, disambiguated = _select_wikipedia_page(pages)
+        result = {
+            "success": True,
+            "query": query,
+            "title": page.get("title", ""),
+            "summary": page.get("extract", ""),
+            "url": page.get("fullurl", ""),
+            "search_results": [item.get("title", "") for item in sorted(pages, key=lambda item: item.get("index", 0))],
+            "language": language
+        }
+        if disambiguated:
+            result["note"] = "Disambiguation resolved automatically"
+        _wikipedia_cache.set(cache_key, result)
+        return result
             
     except Exception as e:
         return {
             "success": False,
             "error": f"Error searching Wikipedia for '{query}': {str(e)}",
-            "query": query
+            "query": query,
+            **error_details(e)
         }
 
 
-@tool
-def duckduckgo_search(query: str) -> Dict[str, Any]:
+wikipedia_search = sync_tool(wikipedia_search_async)
+
+
+@tool(name="duckduckgo_search")
+@traced("tool", "duckduckgo_search")
+async def duckduckgo_search_async(query: str) -> Dict[str, Any]:
     """Search DuckDuckGo for real-time web information and instant answers
     
     BEST FOR:
@@ -194,104 +444,196 @@ def duckduckgo_search(query: str) -> Dict[str, Any]:
         Dictionary containing instant answers, definitions, and web information
     """
     try:
+        runtime = get_tool_runtime()
+
         async def fetch_search_results():
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://api.duckduckgo.com/",
-                    params={
-                        "q": query,
-                        "format": "json",
-                        "no_html": "1",
-                        "skip_disambig": "1"
-                    },
-                    headers={
-                        "User-Agent": "StrandsAgents/1.0",
-                        "Accept": "application/json",
-                        "Accept-Charset": "utf-8"
-                    },
-                    timeout=10.0
-                )
+            client = await runtime.get_client()
+            response = await call_upstream("duckduckgo", lambda: client.get(
+                DUCKDUCKGO_API_URL,
+                params={
+                    "q": query,
+                    "format": "json",
+                    "no_html": "1",
+                    "skip_disambig": "1"
+                }
+            ))
+            
+            if response.status_code == 200:
+                # UTF-8 디코딩 안전 처리
+                try:
+                    data = response.json()
+                except UnicodeDecodeError:
+                    content = response.content.decode('utf-8', errors='ignore')
+                    data = json.loads(content)
+                except json.JSONDecodeError:
+                    return {
+                        "success": False,
+                        "error": f"Invalid JSON response from DuckDuckGo for '{query}'",
+                        "query": query
+                    }
                 
-                if response.status_code == 200:
-                    # UTF-8 디코딩 안전 처리
-                    try:
-                        data = response.json()
-                    except UnicodeDecodeError:
-                        content = response.content.decode('utf-8', errors='ignore')
-                        data = json.loads(content)
-                    except json.JSONDecodeError:
-                        return {
-                            "success": False,
-                            "error": f"Invalid JSON response from DuckDuckGo for '{query}'",
-                            "query": query
-                        }
-                    
-                    # Abstract (요약 정보)
-                    abstract = data.get("Abstract", "")
-                    abstract_source = data.get("AbstractSource", "")
-                    abstract_url = data.get("AbstractURL", "")
-                    
-                    # Related Topics
-                    related_topics = data.get("RelatedTopics", [])
-                    
-                    # Answer (즉석 답변)
-                    answer = data.get("Answer", "")
-                    answer_type = data.get("AnswerType", "")
-                    
-                    # Definition
-                    definition = data.get("Definition", "")
-                    definition_source = data.get("DefinitionSource", "")
-                    
-                    # 유용한 정보가 있는지 확인
-                    has_content = any([abstract, answer, definition, related_topics])
-                    
-                    if has_content:
-                        return {
-                            "success": True,
-                            "query": query,
-                            "abstract": abstract,
-                            "abstract_source": abstract_source,
-                            "abstract_url": abstract_url,
-                            "answer": answer,
-                            "answer_type": answer_type,
-                            "definition": definition,
-                            "definition_source": definition_source,
-                            "related_topics": [
-                                {
-                                    "text": topic.get("Text", ""),
-                                    "url": topic.get("FirstURL", "")
-                                }
-                                for topic in related_topics[:3]  # 상위 3개만
-                                if topic.get("Text")
-                            ],
-                            "source": "DuckDuckGo"
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"No useful information found for '{query}' on DuckDuckGo",
-                            "query": query
-                        }
+                # Abstract (요약 정보)
+                abstract = data.get("Abstract", "")
+                abstract_source = data.get("AbstractSource", "")
+                abstract_url = data.get("AbstractURL", "")
                 
-                return {
-                    "success": False,
-                    "error": f"DuckDuckGo API request failed with status {response.status_code}",
-                    "query": query
-                }
-        
-        # 비동기 실행
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+                # Related Topics
+                related_topics = data.get("RelatedTopics", [])
+                
+                # Answer (즉석 답변)
+                answer = data.get("Answer", "")
+                answer_type = data.get("AnswerType", "")
+                
+                # Definition
+                definition = data.get("Definition", "")
+                definition_source = data.get("DefinitionSource", "")
+                
+                # 유용한 정보가 있는지 확인
+                has_content = any([abstract, answer, definition, related_topics])
+                
+                if has_content:
+                    return {
+                        "success": True,
+                        "query": query,
+                        "abstract": abstract,
+                        "abstract_source": abstract_source,
+                        "abstract_url": abstract_url,
+                        "answer": answer,
+                        "answer_type": answer_type,
+                        "definition": definition,
+                        "definition_source": definition_source,
+                        "related_topics": [
+                            {
+                                "text": topic.get("Text", ""),
+                                "url": topic.get("FirstURL", "")
+                            }
+                            for topic in related_topics[:3]  # 상위 3개만
+                            if topic.get("Text")
+                        ],
+                        "source": "DuckDuckGo"
+                    }
+                else:
+                    return {
+                        "success": False,
+                        "error": f"No useful information found for '{query}' on DuckDuckGo",
+                        "query": query
+                    }
+            
+            return {
+                "success": False,
+                "error": f"DuckDuckGo API request failed with status {response.status_code}",
+                "query": query
+            }
         
-        return loop.run_until_complete(fetch_search_results())
+        # 공유 I/O 루프에서 실행
+        return await runtime.run_async(fetch_search_results())
         
     except Exception as e:
         return {
             "success": False,
             "error": f"Error searching DuckDuckGo for '{query}': {str(e)}",
-            "query": query
+            "query": query,
+            **error_details(e)
         }
 
+
+# 동기 도구 - 공유 I/O 루프에서 비동기 구현 실행
+duckduckgo_search = sync_tool(duckduckgo_search_async)
+
+
+# 통합 검색 - Wikipedia와 DuckDuckGo를 동시에 조회하고, 기한 안에 충분한 결과가 오면 바로 반환
+SEARCH_HEDGE_DEADLINE = float(os.getenv("SEARCH_HEDGE_DEADLINE", "1.5"))
+SEARCH_MIN_SUMMARY_CHARS = int(os.getenv("SEARCH_MIN_SUMMARY_CHARS", "200"))
+SEARCH_SOURCES = ("wikipedia", "duckduckgo")
+
+_search_answers: Dict[str, int] = {}
+_search_answers_lock = threading.Lock()
+
+
+def get_combined_search_stats() -> Dict[str, int]:
+    """통합 검색의 응답 출처별 횟수 (wikipedia / duckduckgo / both / none)"""
+    with _search_answers_lock:
+        return dict(_search_answers)
+
+
+def _good_enough(source: str, result: Dict[str, Any]) -> bool:
+    """단독으로 답변할 수 있는 결과인지 (Wikipedia: 충분한 길이의 요약, DuckDuckGo: 요약/즉석 답변/정의)"""
+    if not result.get("success"):
+        return False
+    if source == "wikipedia":
+        return len(result.get("summary", "")) >= SEARCH_MIN_SUMMARY_CHARS
+    return any(result.get(key) for key in ("abstract", "answer", "definition"))
+
+
+@tool(name="combined_search")
+@traced("tool", "combined_search")
+async def combined_search_async(query: str, language: str = "en") -> Dict[str, Any]:
+    """Search Wikipedia and DuckDuckGo at the same time in a single call
+    
+    Both sources are queried concurrently. If one source returns a sufficient
+    answer within the deadline it is returned right away; otherwise the results
+    of both sources are merged. Use this once per search request instead of
+    calling wikipedia_search and duckduckgo_search one after another.
+    
+    Args:
+        query: The search query (use specific, well-known terms)
+        language: Wikipedia language code (default "en")
+        
+    Returns:
+        Dictionary with the answering source ("answered_by") and the result of each source that answered
+    """
+    tasks = {
+        asyncio.create_task(wikipedia_search_async(query, language=language)): "wikipedia",
+        asyncio.create_task(duckduckgo_search_async(query)): "duckduckgo"
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SEARCH_HEDGE_DEADLINE
+    answered_by = None
+    try:
+        pending = set(tasks)
+        # 기한 안에 충분한 결과가 먼저 오면 나머지는 기다리지 않음
+        while pending and answered_by is None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = tasks[task]
+                results[source] = task.result()
+                if answered_by is None and _good_enough(source, results[source]):
+                    answered_by = source
+
+        # 기한이 지났거나 충분한 결과가 없으면 두 결과를 모두 받아 병합
+        if answered_by is None and pending:
+            done, _ = await asyncio.wait(pending)
+            for task in done:
+                results[tasks[task]] = task.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if answered_by is None:
+        succeeded = [source for source in SEARCH_SOURCES if results.get(source, {}).get("success")]
+        answered_by = "both" if len(succeeded) == 2 else (succeeded[0] if succeeded else "none")
+
+    with _search_answers_lock:
+        _search_answers[answered_by] = _search_answers.get(answered_by, 0) + 1
+    item = current_span()
+    if item is not None:
+        item.set(answered_by=answered_by)
+
+    sources = SEARCH_SOURCES if answered_by in ("both", "none") else (answered_by,)
+    result = {
+        "success": answered_by != "none",
+        "query": query,
+        "answered_by": answered_by,
+        **{source: results[source] for source in sources if source in results}
+    }
+    if answered_by == "none":
+        result["error"] = f"No useful information found for '{query}' on Wikipedia or DuckDuckGo"
+    return result
+
+
+combined_search = sync_tool(combined_search_async)
@@ -1,34 +1,149 @@
 """워크샵용 모델 설정 """
+import json
 import os
-from strands.models import BedrockModel
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from strands.hooks import AfterModelCallEvent, HookProvider, HookRegistry
+from strands.models import BedrockModel, Model
+from strands.models.model import CacheConfig
 
 
-def get_configured_model(model_id: str = None) -> BedrockModel:
+DEFAULT_MODEL_ID = "us.amazon.nova-pro-v1:0"
+DEFAULT_MAX_TOKENS = 4096
+DEFAULT_TEMPERATURE = 0.7
+
+
+def resolve_model_id(model_id: str = None) -> str:
+    """모델 ID 결정 (우선순위: 파라미터 > MODEL_ID 환경변수 > 기본값, SUPPORTED_MODELS 별칭 지원)"""
+    final_model_id = model_id or os.getenv("MODEL_ID") or DEFAULT_MODEL_ID
+    return SUPPORTED_MODELS.get(final_model_id, final_model_id)
+
+
+def _streaming_enabled(streaming: bool = None) -> bool:
+    """스트리밍 여부 결정 (우선순위: 파라미터 > 환경변수 > 비활성화)"""
+    if streaming is not None:
+        return streaming
+    return os.getenv("MODEL_STREAMING", "false").lower() == "true"
+
+
+# 프롬프트 캐시를 지원하는 모델 계열 → 도구 스펙 캐시 지원 여부
+# (시스템 프롬프트와 대화 앞부분은 두 계열 모두 캐시, Nova는 도구 스펙 캐시 미지원)
+PROMPT_CACHE_MODEL_FAMILIES = {
+    "anthropic": True,
+    "claude": True,
+    "amazon.nova": False
+}
+
+
+def get_prompt_cache_config(model_id: str) -> Optional[CacheConfig]:
+    """모델이 프롬프트 캐시를 지원하면 캐시 설정, 아니면 None
+    
+    정적인 시스템 프롬프트, 도구 스펙, 이전 대화 뒤에 캐시 지점을 두어
+    매 호출마다 같은 앞부분을 다시 처리하지 않도록 합니다.
+    
+    Args:
+        model_id: Bedrock 모델 ID
+        
+    Returns:
+        CacheConfig 또는 None (비활성화 또는 미지원 모델)
+    """
+    if os.getenv("PROMPT_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    for family, cache_tools in PROMPT_CACHE_MODEL_FAMILIES.items():
+        if family in model_id.lower():
+            return CacheConfig(
+                strategy="anthropic",
+                ttl=os.getenv("PROMPT_CACHE_TTL") or None,
+                tools_ttl=cache_tools
+            )
+    return None
+
+
+# 캐시 지점을 거부할 때 Bedrock이 반환하는 오류 코드와 메시지 문구 (소문자)
+PROMPT_CACHE_ERROR_CODE = "ValidationException"
+PROMPT_CACHE_ERROR_MARKERS = ("prompt caching", "cachepoint", "cache point", "cache_control")
+
+
+def is_prompt_cache_error(error: BaseException) -> bool:
+    """Bedrock이 프롬프트 캐시 지점을 거부한 오류인지 여부 (감싸진 원인 예외까지 확인)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        response = getattr(error, "response", None)
+        if isinstance(response, dict) and response.get("Error", {}).get("Code") == PROMPT_CACHE_ERROR_CODE:
+            message = str(response["Error"].get("Message", "")).lower()
+            if any(marker in message for marker in PROMPT_CACHE_ERROR_MARKERS):
+                return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class PromptCacheFallback(HookProvider):
+    """
+    캐시 지점을 거부하는 모델/리전이면 실패한 단계 모델만 프롬프트 캐시를 끈 모델로 바꾸고 같은 호출을 다시 시도
+    공유 모델의 설정은 바꾸지 않으므로 같은 모델을 쓰는 다른 단계의 캐시는 유지됩니다.
+    """
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(AfterModelCallEvent, self._disable_on_cache_error)
+
+    def _disable_on_cache_error(self, event: AfterModelCallEvent) -> None:
+        if event.exception is None or not is_prompt_cache_error(event.exception):
+            return
+        # 단계 모델 래퍼(호출 제한, 완성 캐시)를 따라가 실제 Bedrock 모델을 감싼 객체를 찾음
+        holder, model = event.agent, event.agent.model
+        while not isinstance(model, BedrockModel) and isinstance(getattr(model, "model", None), Model):
+            holder, model = model, model.model
+        if not isinstance(model, BedrockModel) or not model.get_config().get("cache_config"):
+            return
+        print(f"⚠️ 프롬프트 캐시를 사용할 수 없어 캐시 없이 다시 시도합니다: {str(event.exception)[:120]}")
+        holder.model = get_uncached_model(model)
+        event.retry = True
+
+
+# 모든 Agent에 등록하는 프롬프트 캐시 fallback
+PROMPT_CACHE_FALLBACK = PromptCacheFallback()
+
+
+def get_configured_model(
+    model_id: str = None,
+    streaming: bool = None,
+    max_tokens: int = None,
+    temperature: float = None,
+    stop_sequences: List[str] = None,
+    prompt_cache: bool = True
+) -> BedrockModel:
     """워크샵용 Bedrock 모델 설정
     
     Args:
         model_id: 사용할 모델 ID (선택사항)
+        streaming: 토큰 스트리밍 사용 여부 (선택사항, 기본값은 MODEL_STREAMING 환경변수)
+        max_tokens: 최대 출력 토큰 수 (선택사항, 기본값 4096)
+        temperature: 샘플링 온도 (선택사항, 기본값 0.7)
+        stop_sequences: 생성 중단 문자열 목록 (선택사항)
+        prompt_cache: False이면 지원 모델이어도 프롬프트 캐시를 사용하지 않음
         
     Returns:
         설정된 BedrockModel 인스턴스
     """
     # 모델 ID 결정 (우선순위: 파라미터 > 환경변수 > 기본값)
-    final_model_id = (
-        model_id or 
-        os.getenv("MODEL_ID") or 
-        "us.amazon.nova-pro-v1:0"
-    )
+    final_model_id = resolve_model_id(model_id)
     
     # AWS 리전 설정
     region = os.getenv("AWS_REGION", "us-west-2")
     
+    # 프롬프트 캐시 (지원하는 모델만)
+    cache_config = get_prompt_cache_config(final_model_id) if prompt_cache else None
+    
     # Bedrock 모델 생성
     model = BedrockModel(
         model_id=final_model_id,
-        region=region,
-        temperature=0.7,
-        max_tokens=4096,
-        streaming=False  # 워크샵에서는 스트리밍 비활성화
+        region_name=region,
+        temperature=temperature if temperature is not None else DEFAULT_TEMPERATURE,
+        max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
+        streaming=_streaming_enabled(streaming),  # 워크샵 기본값은 스트리밍 비활성화
+        **({"stop_sequences": list(stop_sequences)} if stop_sequences else {}),
+        **({"cache_config": cache_config} if cache_config else {})
     )
     
     # 모델 ID 속성 추가 (호환성)
@@ -38,9 +153,198 @@ def get_configured_model(model_id: str = None) -> BedrockModel:
     return model
 
 
+# 설정별로 공유되는 모델 인스턴스 (boto 클라이언트/커넥션 풀 재사용)
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+
+# 공유 모델 생성 함수 - None이면 BedrockModel (벤치마크의 스텁 모델 등으로 교체 가능)
+_model_factory: Optional[Callable[..., Model]] = None
+
+
+def set_model_factory(factory: Optional[Callable[..., Model]] = None):
+    """get_shared_model이 사용할 모델 생성 함수 설정 (이미 만들어진 공유 모델은 버림)
+    
+    Args:
+        factory: factory(model_id, streaming=..., prompt_cache=...) 형태로 호출되어 Model을 반환하는 함수 (None이면 Bedrock)
+    """
+    global _model_factory
+    with _shared_models_lock:
+        _model_factory = factory
+        _shared_models.clear()
+
+
+def get_shared_model(
+    model_id: str = None,
+    streaming: bool = None,
+    max_tokens: int = None,
+    temperature: float = None,
+    stop_sequences: List[str] = None,
+    prompt_cache: bool = True
+) -> BedrockModel:
+    """설정(모델 ID, 리전, 스트리밍, 샘플링 파라미터, 프롬프트 캐시)별로 하나의 BedrockModel을 공유하여 반환
+    
+    Args:
+        model_id: 사용할 모델 ID (선택사항)
+        streaming: 토큰 스트리밍 사용 여부 (선택사항)
+        max_tokens: 최대 출력 토큰 수 (선택사항)
+        temperature: 샘플링 온도 (선택사항)
+        stop_sequences: 생성 중단 문자열 목록 (선택사항)
+        prompt_cache: False이면 프롬프트 캐시를 사용하지 않는 모델 (선택사항)
+        
+    Returns:
+        공유 BedrockModel 인스턴스
+    """
+    params = {
+        "max_tokens": max_tokens or DEFAULT_MAX_TOKENS,
+        "temperature": temperature if temperature is not None else DEFAULT_TEMPERATURE,
+        "stop_sequences": tuple(stop_sequences or ()),
+        "prompt_cache": prompt_cache
+    }
+    key = (
+        resolve_model_id(model_id),
+        os.getenv("AWS_REGION", "us-west-2"),
+        _streaming_enabled(streaming),
+        *params.values()
+    )
+    with _shared_models_lock:
+        if key not in _shared_models:
+            factory = _model_factory or get_configured_model
+            _shared_models[key] = factory(
+                key[0],
+                streaming=key[2],
+                max_tokens=params["max_tokens"],
+                temperature=params["temperature"],
+                stop_sequences=list(params["stop_sequences"]),
+                prompt_cache=params["prompt_cache"]
+            )
+        return _shared_models[key]
+
+
+def get_streaming_model(model):
+    """같은 설정의 스트리밍 모델 반환 (Bedrock 외 모델이나 이미 스트리밍이면 그대로 반환)"""
+    if not isinstance(model, BedrockModel):
+        return model
+    config = model.get_config()
+    if config.get("streaming", True):
+        return model
+    return get_shared_model(
+        config.get("model_id"),
+        streaming=True,
+        max_tokens=config.get("max_tokens"),
+        temperature=config.get("temperature"),
+        stop_sequences=config.get("stop_sequences")
+    )
+
+
+def get_uncached_model(model: BedrockModel) -> BedrockModel:
+    """같은 설정에서 프롬프트 캐시만 끈 공유 모델 반환"""
+    config = model.get_config()
+    return get_shared_model(
+        config.get("model_id"),
+        streaming=config.get("streaming", True),
+        max_tokens=config.get("max_tokens"),
+        temperature=config.get("temperature"),
+        stop_sequences=config.get("stop_sequences"),
+        prompt_cache=False
+    )
+
+
+# 파이프라인 단계 - 단계마다 모델과 샘플링 파라미터를 따로 지정할 수 있음
+PIPELINE_STAGES = (
+    "clarity", "planning", "routing", "search_agent", "weather_agent", "conversation_agent", "final"
+)
+
+# 단계별 기본 프로필 (model_id가 없으면 기본 모델 사용)
+# 명확성 판단/라우팅은 짧고 결정적인 출력, 최종 답변은 기본 설정
+DEFAULT_STAGE_PROFILES = {
+    "clarity": {"max_tokens": 256, "temperature": 0.0},
+    "planning": {"max_tokens": 1024, "temperature": 0.2},
+    "routing": {"max_tokens": 2048, "temperature": 0.0},
+    "search_agent": {"max_tokens": 2048},
+    "weather_agent": {"max_tokens": 2048},
+    "conversation_agent": {"max_tokens": 1024},
+    "final": {}
+}
+
+_stage_profiles_file_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def _profiles_from_file(path: str) -> Dict[str, Dict[str, Any]]:
+    """MODEL_PROFILES_FILE의 단계별 프로필 ({"clarity": {"model_id": "claude_haiku", ...}, ...})"""
+    if path not in _stage_profiles_file_cache:
+        with open(path, encoding="utf-8") as f:
+            profiles = json.load(f)
+        unknown = set(profiles) - set(PIPELINE_STAGES)
+        if unknown:
+            raise ValueError(f"알 수 없는 단계입니다: {', '.join(sorted(unknown))} (지원: {', '.join(PIPELINE_STAGES)})")
+        _stage_profiles_file_cache[path] = profiles
+    return _stage_profiles_file_cache[path]
+
+
+def get_stage_profile(stage: str) -> Dict[str, Any]:
+    """단계별 모델 프로필 (우선순위: 환경변수 > MODEL_PROFILES_FILE > 기본값)
+    
+    환경변수는 단계 이름을 대문자로 쓴 접두사를 사용합니다
+    (예: CLARITY_MODEL_ID, CLARITY_MAX_TOKENS, CLARITY_TEMPERATURE, CLARITY_STOP_SEQUENCES).
+    
+    Args:
+        stage: 파이프라인 단계 (PIPELINE_STAGES 중 하나)
+        
+    Returns:
+        model_id, max_tokens, temperature, stop_sequences (지정되지 않은 값은 None)
+    """
+    if stage not in PIPELINE_STAGES:
+        raise ValueError(f"알 수 없는 단계입니다: {stage} (지원: {', '.join(PIPELINE_STAGES)})")
+
+    profile = {"model_id": None, "max_tokens": None, "temperature": None, "stop_sequences": None}
+    profile.update(DEFAULT_STAGE_PROFILES.get(stage, {}))
+    profiles_file = os.getenv("MODEL_PROFILES_FILE")
+    if profiles_file:
+        profile.update(_profiles_from_file(profiles_file).get(stage, {}))
+
+    prefix = stage.upper()
+    if os.getenv(f"{prefix}_MODEL_ID"):
+        profile["model_id"] = os.getenv(f"{prefix}_MODEL_ID")
+    if os.getenv(f"{prefix}_MAX_TOKENS"):
+        profile["max_tokens"] = int(os.getenv(f"{prefix}_MAX_TOKENS"))
+    if os.getenv(f"{prefix}_TEMPERATURE"):
+        profile["temperature"] = float(os.getenv(f"{prefix}_TEMPERATURE"))
+    if os.getenv(f"{prefix}_STOP_SEQUENCES"):
+        # 쉼표가 들어간 중단 문자열도 쓸 수 있도록 "|"로 구분
+        profile["stop_sequences"] = [item for item in os.getenv(f"{prefix}_STOP_SEQUENCES").split("|") if item]
+    return profile
+
+
+def get_stage_model(stage: str, model: Model = None, streaming: bool = None) -> Model:
+    """단계별 프로필이 적용된 공유 모델 반환
+    
+    Args:
+        stage: 파이프라인 단계 (PIPELINE_STAGES 중 하나)
+        model: 단계 프로필에 model_id가 없을 때 사용할 기본 모델 (선택사항)
+        streaming: 토큰 스트리밍 사용 여부 (선택사항, 기본값은 기본 모델 설정)
+        
+    Returns:
+        공유 BedrockModel (Bedrock 외 모델이 주어지면 그대로 반환)
+    """
+    profile = get_stage_profile(stage)
+    if model is not None and not isinstance(model, BedrockModel):
+        return model
+
+    base_config = model.get_config() if model is not None else {}
+    if streaming is None and model is not None:
+        streaming = base_config.get("streaming", True)
+    return get_shared_model(
+        profile["model_id"] or base_config.get("model_id"),
+        streaming=streaming,
+        max_tokens=profile["max_tokens"],
+        temperature=profile["temperature"],
+        stop_sequences=profile["stop_sequences"]
+    )
+
+
 # 환경 정보 (표시용)
 MODEL_PROVIDER = "bedrock"
-MODEL_ID = os.getenv("MODEL_ID", "us.amazon.nova-pro-v1:0")
+MODEL_ID = os.getenv("MODEL_ID", DEFAULT_MODEL_ID)
 
 # 지원되는 모델 목록 (워크샵 참고용)
 SUPPORTED_MODELS = {
@@ -1,8 +1,162 @@
 """Orchestrator Agent - Agents as Tools 패턴의 오케스트레이터"""
+import asyncio
+import os
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
 from strands import Agent
-from sub_agents import search_agent, weather_agent, conversation_agent
-from model_config import get_configured_model
-from typing import Dict, Any
+from sub_agents import search_agent_async, weather_agent_async, conversation_agent_async, SUB_AGENTS_ASYNC
+from model_config import get_shared_model, get_stage_model, PROMPT_CACHE_FALLBACK
+from router import RequestRouter, RouteStep
+from fanout import FanOutExecutor
+from semantic_cache import get_semantic_cache, semantic_cache_enabled
+from history_manager import TokenBudgetConversationManager, estimate_tokens
+from tracing import MODEL_CALL_TRACER, metrics, span, trace_request
+from completion_cache import stage_model
+from rate_limit import SlotQueue, get_rate_limit_stats, rate_limited
+from streaming import ThinkingFilter, iterate_async, run_sync
+from resilience import (
+    DeadlineExceeded, deadline_scope, get_circuit_breaker_stats, iterate_with_deadline, with_deadline
+)
+from typing import Dict, Any, AsyncIterator, Awaitable, Iterator, List, Optional, Tuple
+
+
+ORCHESTRATOR_MODES = ("classic", "router", "fanout")
+
+# planning_agent 계획의 단계 줄 ("1. [search_agent] - ...")에서 하위 에이전트 이름 추출
+PLAN_STEP_PATTERN = re.compile(
+    rf"^\s*\d+\.\s*[\[*`]*({'|'.join(SUB_AGENTS_ASYNC)})\b", re.MULTILINE
+)
+
+SYNTHESIS_PROMPT = """당신은 하위 에이전트들의 실행 결과를 종합하여 사용자에게 최종 답변을 작성하는 전문가입니다.
+도구를 사용하지 말고, 주어진 결과만을 근거로 사용자에게 도움이 되는 종합적인 답변을 작성하세요."""
+
+
+def strip_thinking(text: str) -> str:
+    """<thinking> 태그 제거"""
+    return re.sub(r'<thinking>.*?</thinking>', '', text, flags=re.DOTALL).strip()
+
+
+def plan_agents(plan_text: str) -> List[str]:
+    """자유 형식 실행 계획의 단계별 하위 에이전트 이름 (순서대로)"""
+    return PLAN_STEP_PATTERN.findall(plan_text)
+
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str):
+    """블록을 단계 span으로 기록하고 실행 시간(초)을 timings[stage]에 기록"""
+    with span(stage, "stage") as item:
+        try:
+            yield
+        finally:
+            timings[stage] = round(item.elapsed, 3)
+
+
+# 모델을 사용 불가로 표시하는 오류 (인증/설정 오류) - 스로틀링, 타임아웃 등 일시적 오류는 해당 요청만 실패
+MODEL_CONFIG_ERROR_CODES = (
+    "AccessDeniedException", "UnrecognizedClientException", "ExpiredTokenException",
+    "InvalidSignatureException", "ResourceNotFoundException"
+)
+MODEL_CONFIG_ERROR_TYPES = ("NoCredentialsError", "PartialCredentialsError", "NoRegionError", "ProfileNotFound")
+
+
+def is_model_config_error(error: BaseException) -> bool:
+    """인증/설정 오류 여부 (감싸진 원인 예외까지 확인)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if type(error).__name__ in MODEL_CONFIG_ERROR_TYPES:
+            return True
+        response = getattr(error, "response", None)
+        if isinstance(response, dict) and response.get("Error", {}).get("Code") in MODEL_CONFIG_ERROR_CODES:
+            return True
+        if "model identifier is invalid" in str(error).lower():
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class ModelAvailability:
+    """
+    모델 가용성 상태
+    요청 경로에서 별도의 LLM 호출 없이 캐시된 상태를 제공합니다.
+    실제 요청의 성공/실패로 상태를 갱신하고, 마지막 확인 후 refresh_interval이 지나면 현재 상태와 관계없이
+    백그라운드에서 재확인합니다 (요청이 계속 들어오는 동안에는 요청 결과로 갱신되므로 재확인하지 않음).
+    인증/설정 오류만 사용 불가로 표시하며, 일시적 오류(스로틀링, 타임아웃 등)는 상태를 바꾸지 않습니다.
+    """
+
+    UNKNOWN = "unknown"
+    AVAILABLE = "available"
+    UNAVAILABLE = "unavailable"
+
+    def __init__(self, model, refresh_interval: float = None):
+        self.model = model
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else float(os.getenv("MODEL_HEALTH_CHECK_INTERVAL", "300"))
+        )
+        self.status = self.UNKNOWN
+        self.last_checked = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._probe_thread = None
+
+    def is_available(self) -> bool:
+        """캐시된 가용성 반환 (알 수 없으면 사용 가능으로 간주, 상태가 오래되면 백그라운드 재확인)"""
+        self._refresh_if_stale()
+        return self.status != self.UNAVAILABLE
+
+    def record_success(self):
+        with self._lock:
+            self.status = self.AVAILABLE
+            self.last_checked = time.time()
+            self.last_error = None
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            if is_model_config_error(error):
+                self.status = self.UNAVAILABLE
+            self.last_checked = time.time()
+            self.last_error = str(error)
+
+    def check_now(self) -> bool:
+        """모델에 짧은 요청을 보내 가용성을 즉시 확인 (블로킹)"""
+        try:
+            probe_agent = Agent(
+                model=rate_limited(self.model),
+                system_prompt="Test",
+                tools=[],
+                callback_handler=None
+            )
+            probe_agent("Hello")
+            self.record_success()
+        except Exception as e:
+            self.record_failure(e)
+        return self.status != self.UNAVAILABLE
+
+    def check_in_background(self):
+        """백그라운드 스레드에서 가용성 확인 (이미 진행 중이면 무시)"""
+        with self._lock:
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(
+                target=self.check_now, name="model-health-check", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _refresh_if_stale(self):
+        # 한 번도 확인하지 않은 상태는 첫 요청 결과로 정해지므로 재확인하지 않음
+        if self.last_checked is not None and time.time() - self.last_checked >= self.refresh_interval:
+            self.check_in_background()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "refresh_interval": self.refresh_interval
+        }
 
 
 class OrchestratorAgent:
@@ -11,117 +165,556 @@ class OrchestratorAgent:
     사용자 요청을 분석하고 적절한 하위 에이전트에게 작업을 위임
     """
 
-    def __init__(self, model=None, user_id: str = "default_user"):
-        self.model = model or get_configured_model()
+    def __init__(self, model=None, user_id: str = "default_user", mode: str = None, streaming: bool = None):
+        self.model = model or get_shared_model()
         self.user_id = user_id
-        self.model_available = True
 
-        # 모델 가용성 테스트
-        try:
-            test_agent = Agent(
-                model=self.model,
-                system_prompt="Test",
-                tools=[]
+        # 스트리밍 모드 - 최종 답변은 스트리밍 모델로 생성하고, 출력은 호출자가 토큰 단위로 처리
+        self.streaming = (
+            streaming if streaming is not None
+            else os.getenv("MODEL_STREAMING", "false").lower() == "true"
+        )
+
+        # 단계별 모델 - 단계 프로필(모델 ID, max_tokens, temperature, 중단 문자열)을 적용하고,
+        # 완성 캐시가 켜진 단계는 캐시 래퍼로 감쌈. 최종 답변은 스트리밍 모드면 스트리밍 모델 사용
+        self.stage_models = {
+            stage: stage_model(
+                get_stage_model(stage, self.model, streaming=True if stage == "final" and self.streaming else None),
+                stage
             )
-            test_agent("Hello")
-        except Exception as e:
-            self.model_available = False
-            print(f"⚠️ 모델 접근 제한: 기본 기능으로 동작합니다.")
-
-        # 오케스트레이터 에이전트 생성
-        if self.model_available:
-            self.orchestrator = Agent(
-                model=self.model,
-                system_prompt=f"""당신은 사용자 요청을 분석하고 적절한 하위 에이전트에게 작업을 위임하는 오케스트레이터입니다.
+            for stage in ("clarity", "planning", "routing", "final")
+        }
+        self._callback_kwargs = {"callback_handler": None} if self.streaming else {}
+
+        # 처리 모드 - classic: 명확성 판단 → 계획 수립 → 실행, router: 라우팅(1회) → 실행,
+        #            fanout: 라우팅(1회) → 독립 하위 에이전트 동시 실행 → 결과 종합
+        self.mode = mode or os.getenv("ORCHESTRATOR_MODE", "classic")
+        if self.mode not in ORCHESTRATOR_MODES:
+            raise ValueError(f"지원하지 않는 오케스트레이터 모드입니다: {self.mode} (지원: {', '.join(ORCHESTRATOR_MODES)})")
+        self.router = RequestRouter(self.stage_models["routing"])
+        self.fanout_executor = FanOutExecutor() if self.mode == "fanout" else None
+
+        # 직접 호출 - 라우팅 결과가 하위 에이전트 하나뿐이면 오케스트레이터 LLM 없이 도구 함수를 바로 호출
+        # (ORCHESTRATOR_DIRECT_SYNTHESIS=true이면 하위 에이전트 결과를 한 번 더 종합, 기본값은 그대로 반환)
+        self.direct_dispatch = os.getenv("ORCHESTRATOR_DIRECT_DISPATCH", "true").lower() == "true"
+        self.direct_synthesis = os.getenv("ORCHESTRATOR_DIRECT_SYNTHESIS", "false").lower() == "true"
+
+        # 추측 실행 (classic 모드) - 명확성 판단을 기다리지 않고 계획 수립(선택적으로 첫 하위 에이전트 호출)을 동시에 시작,
+        # NEED_MORE이면 추측 작업을 취소하고 버림
+        self.speculative = os.getenv("ORCHESTRATOR_SPECULATIVE", "false").lower() == "true"
+        self.speculative_dispatch = os.getenv("ORCHESTRATOR_SPECULATIVE_DISPATCH", "false").lower() == "true"
+
+        # 모델 가용성은 실제 요청 결과로 판단 (초기화 시 LLM 호출 없음)
+        self.availability = ModelAvailability(self.model)
+        if os.getenv("MODEL_HEALTH_CHECK_ON_START", "false").lower() == "true":
+            self.availability.check_in_background()
+
+        # 의미 기반 응답 캐시 - 거의 같은 요청은 파이프라인 없이 캐시된 답변 반환
+        self.semantic_cache = get_semantic_cache() if semantic_cache_enabled() else None
+
+        # 오케스트레이터 에이전트 생성 (하위 에이전트는 비동기 도구로 등록)
+        # 대화 기록을 유지하는 하나의 Agent이므로 최종 호출은 인스턴스당 한 번에 하나씩 실행
+        # 대화 기록은 토큰 예산 안에서 관리 (최근 턴 유지, 오래된 도구 결과 요약/제거)
+        self._orchestrator_slot = SlotQueue(1)
+        self.history_manager = TokenBudgetConversationManager()
+        self.orchestrator = Agent(
+            model=self.stage_models["final"],
+            system_prompt=f"""당신은 사용자 요청을 분석하고 적절한 하위 에이전트에게 작업을 위임하는 오케스트레이터입니다.
 사용자 ID: {user_id}
 
 사용 가능한 하위 에이전트들을 적절히 사용하여 사용자 요청에 응답하세요.
 각 에이전트의 설명을 참고하여 언제, 어떻게 사용할지 스스로 판단하세요.""",
-                tools=[search_agent, weather_agent, conversation_agent]
-            )
-        else:
-            self.orchestrator = None
+            tools=[search_agent_async, weather_agent_async, conversation_agent_async],
+            conversation_manager=self.history_manager,
+            hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK],
+            **self._callback_kwargs
+        )
 
         print(f"Orchestrator Agent 초기화 완료 (사용자: {user_id})")
         print(f"사용 모델: {type(self.model).__name__}")
-        if not self.model_available:
-            print("📝 참고: 일부 고급 기능이 제한될 수 있습니다.")
+        print(f"처리 모드: {self.mode}")
+
+    @property
+    def model_available(self) -> bool:
+        """캐시된 모델 가용성"""
+        return self.availability.is_available()
 
-    def process_user_input(self, user_input: str) -> Dict[str, Any]:
+    def process_user_input(self, user_input: str, deadline: float = None) -> Dict[str, Any]:
         """
-        사용자 입력을 처리하고 적절한 하위 에이전트에게 위임
+        사용자 입력을 처리하고 적절한 하위 에이전트에게 위임 (process_user_input_async의 동기 래퍼)
 
         Args:
             user_input: 사용자 입력
+            deadline: 요청 전체 기한(초) - None이면 REQUEST_DEADLINE, 0이면 기한 없음
 
         Returns:
             처리 결과
         """
+        return run_sync(lambda: self.process_user_input_async(user_input, deadline))
+
+    async def process_user_input_async(self, user_input: str, deadline: float = None) -> Dict[str, Any]:
+        """
+        사용자 입력을 비동기로 처리 - 하나의 이벤트 루프에서 여러 요청을 동시에 처리할 수 있음
+
+        Args:
+            user_input: 사용자 입력
+            deadline: 요청 전체 기한(초) - 하위 에이전트와 도구까지 적용되며, 넘으면 진행 중인 작업을 취소
+
+        Returns:
+            처리 결과
+        """
+        timings: Dict[str, float] = {}
+        with trace_request(mode=self.mode, user_id=self.user_id) as root, deadline_scope(deadline):
+            result = await self._cached_result(user_input, timings)
+            if result is None:
+                try:
+                    result = await with_deadline(self._run_pipeline(user_input, timings))
+                except DeadlineExceeded as e:
+                    result = self._deadline_result(user_input, e)
+                await self._store_result(user_input, result)
+
+        timings["total"] = round(root.duration, 3)
+        return {**result, "timings": timings, "trace": root.summary()}
+
+    async def _run_pipeline(self, user_input: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """명확성 판단 → 계획 → 실행 파이프라인"""
         try:
-            # 모델이 사용 불가능한 경우 간단한 처리
-            if not self.model_available:
-                return {
-                    "success": True,
-                    "agent": "fallback",
-                    "user_input": user_input,
-                    "response": f"현재 AI 모델에 접근할 수 없습니다. '{user_input}' 요청을 처리하려면 모델 설정을 확인해주세요.",
-                    "needs_clarification": False,
-                    "user_id": self.user_id
-                }
-            
-            # 명확성 판단
-            clarity_agent = Agent(
-                model=self.model,
-                system_prompt="""당신은 사용자 요청의 명확성만 판단하는 전문가입니다.
+            prepared = await self._prepare(user_input, timings)
+            if "result" in prepared:
+                return prepared["result"]
+
+            agent, prompt = self._final_call(user_input, prepared)
+            with stage_timer(timings, "final"):
+                async with self._final_call_slot(agent):
+                    model_calls = self.history_manager.model_calls
+                    response = await agent.invoke_async(prompt)
+                    history_tokens = self._history_tokens(agent, model_calls)
+            return {**self._final_result(user_input, prepared, str(response)), **history_tokens}
+
+        except Exception as e:
+            return self._error_result(user_input, e)
+
+    def stream_user_input(self, user_input: str, deadline: float = None) -> Iterator[Dict[str, Any]]:
+        """
+        사용자 입력을 처리하며 최종 답변 토큰을 생성되는 대로 스트리밍 (stream_user_input_async의 동기 래퍼)
+
+        Args:
+            user_input: 사용자 입력
+            deadline: 요청 전체 기한(초) - None이면 REQUEST_DEADLINE, 0이면 기한 없음
+
+        Yields:
+            {"event": "plan", "execution_plan": ...} - 실행 계획 수립 완료
+            {"event": "token", "text": ...} - 최종 답변 토큰 (<thinking> 블록 제외)
+            {"event": "result", "result": ...} - process_user_input과 같은 형식의 최종 결과
+        """
+        yield from iterate_async(lambda: self.stream_user_input_async(user_input, deadline))
+
+    async def stream_user_input_async(self, user_input: str, deadline: float = None) -> AsyncIterator[Dict[str, Any]]:
+        """stream_user_input의 비동기 버전"""
+        timings: Dict[str, float] = {}
+        with trace_request(mode=self.mode, user_id=self.user_id) as root, deadline_scope(deadline):
+            result = await self._cached_result(user_input, timings)
+            if result is not None:
+                if result.get("response"):
+                    yield {"event": "token", "text": result["response"]}
+            else:
+                try:
+                    async for event in iterate_with_deadline(self._stream_pipeline(user_input, timings)):
+                        if event["event"] == "result":
+                            result = event["result"]
+                        else:
+                            yield event
+                except DeadlineExceeded as e:
+                    result = self._deadline_result(user_input, e)
+                await self._store_result(user_input, result)
+
+        timings["total"] = round(root.duration, 3)
+        yield {"event": "result", "result": {**result, "timings": timings, "trace": root.summary()}}
+
+    async def _stream_pipeline(self, user_input: str, timings: Dict[str, float]) -> AsyncIterator[Dict[str, Any]]:
+        """_run_pipeline의 스트리밍 버전 - 최종 답변 토큰을 내보내고 마지막에 결과 이벤트"""
+        try:
+            prepared = await self._prepare(user_input, timings)
+            if "result" in prepared:
+                result = prepared["result"]
+                if result.get("direct_dispatch"):
+                    # 직접 호출 결과는 한 번에 토큰 이벤트로 전달
+                    yield {"event": "plan", "execution_plan": result["execution_plan"]}
+                    yield {"event": "token", "text": result["response"]}
+                yield {"event": "result", "result": result}
+                return
+
+            yield {"event": "plan", "execution_plan": prepared["plan_text"]}
+
+            agent, prompt = self._final_call(user_input, prepared)
+            thinking_filter = ThinkingFilter()
+            response_text = None
+            with stage_timer(timings, "final"):
+                async with self._final_call_slot(agent):
+                    model_calls = self.history_manager.model_calls
+                    async for event in agent.stream_async(prompt):
+                        if "data" in event:
+                            text = thinking_filter.feed(event["data"])
+                            if text:
+                                yield {"event": "token", "text": text}
+                        elif "result" in event:
+                            response_text = str(event["result"])
+                    history_tokens = self._history_tokens(agent, model_calls)
+
+            tail = thinking_filter.flush()
+            if tail:
+                yield {"event": "token", "text": tail}
+
+            result = {**self._final_result(user_input, prepared, response_text or ""), **history_tokens}
+
+        except Exception as e:
+            result = self._error_result(user_input, e)
+
+        yield {"event": "result", "result": result}
+
+    @asynccontextmanager
+    async def _final_call_slot(self, agent: Agent):
+        """공유 오케스트레이터 Agent를 쓰는 동안 다른 요청이 끼어들지 않도록 도착 순서대로 대기 (이벤트 루프는 막지 않음)"""
+        if agent is not self.orchestrator:
+            yield
+            return
+        await self._orchestrator_slot.acquire()
+        message_count = len(self.orchestrator.messages)
+        try:
+            yield
+        except asyncio.CancelledError:
+            # 기한 초과로 취소된 턴은 대화 기록에서 제거 (결과 없는 도구 호출이 다음 요청에 남지 않도록)
+            del self.orchestrator.messages[message_count:]
+            raise
+        finally:
+            self._orchestrator_slot.release()
+
+    async def _prepare(self, user_input: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """
+        최종 답변 생성 전 단계 (명확성 판단, 계획 수립, fanout 실행)
+
+        Args:
+            user_input: 사용자 입력
+            timings: 단계별 소요 시간(초)을 기록할 dict
+
+        Returns:
+            바로 반환할 결과가 있으면 {"result": ...}, 아니면 최종 호출에 필요한 정보
+        """
+        # 모델이 사용 불가능한 경우 간단한 처리
+        if not self.model_available:
+            return {"result": self._fallback_result(user_input)}
+
+        if self.mode in ("router", "fanout"):
+            # 라우터 모드 - 명확성 판단과 계획을 한 번의 호출로 결정
+            with stage_timer(timings, "routing"):
+                route = await self._call_first_model(self.router.route_async(user_input))
+
+            if route.clarity == "NEED_MORE":
+                with stage_timer(timings, "clarification"):
+                    return {"result": await self._ask_clarification(user_input)}
+
+            plan_text = route.to_plan_text()
+            self._print_plan(plan_text)
+            prepared = {"plan_text": plan_text, "route": route}
+            if self.direct_dispatch and len(route.steps) == 1:
+                return await self._dispatch(user_input, prepared, route.steps[0], timings)
+            if self.mode == "fanout" and route.steps:
+                with stage_timer(timings, "fanout"):
+                    prepared["sub_agent_results"] = await self.fanout_executor.run_async(route.steps)
+            return prepared
+
+        if self.speculative:
+            return await self._prepare_speculative(user_input, timings)
+
+        # 명확성 판단
+        with stage_timer(timings, "clarity"):
+            needs_clarification = await self._call_first_model(self._needs_clarification(user_input))
+        if needs_clarification:
+            with stage_timer(timings, "clarification"):
+                return {"result": await self._ask_clarification(user_input)}
+
+        # 요청이 명확한 경우 - 실행 계획 수립
+        with stage_timer(timings, "planning"):
+            plan_text = await self._make_plan(user_input)
+        self._print_plan(plan_text)
+        prepared = {"plan_text": plan_text}
+        steps = plan_agents(plan_text)
+        if self.direct_dispatch and len(steps) == 1:
+            # 자유 형식 계획에는 인자가 없으므로 사용자 입력을 그대로 전달
+            return await self._dispatch(user_input, prepared, RouteStep(agent=steps[0], argument=user_input), timings)
+        return prepared
+
+    async def _prepare_speculative(self, user_input: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """
+        classic 모드의 추측 실행 - 명확성 판단과 계획 수립(+첫 하위 에이전트 호출)을 동시에 시작
+
+        Args:
+            user_input: 사용자 입력
+            timings: 단계별 소요 시간(초)을 기록할 dict
+
+        Returns:
+            _prepare()와 같은 형식 (결과에는 추측 실행 보고 speculation이 포함됨)
+        """
+        state: Dict[str, Any] = {}
+        speculation = asyncio.create_task(self._speculate(user_input, timings, state))
+        try:
+            with stage_timer(timings, "clarity"):
+                needs_clarification = await self._call_first_model(self._needs_clarification(user_input))
+        except BaseException:
+            await self._discard_speculation(speculation, state)
+            raise
+
+        if needs_clarification:
+            report = await self._discard_speculation(speculation, state)
+            with stage_timer(timings, "clarification"):
+                result = await self._ask_clarification(user_input)
+            return {"result": {**result, "speculation": report}}
+
+        prepared = await speculation
+        self._print_plan(prepared["plan_text"])
+        metrics.inc_speculation("used")
+        prepared["speculation"] = {
+            "outcome": "used",
+            "dispatched": state.get("dispatched"),
+            "wasted_seconds": 0.0,
+            "wasted_model_calls": 0,
+            "wasted_tokens": 0
+        }
+
+        steps = plan_agents(prepared["plan_text"])
+        completed = prepared.get("completed_steps")
+        if len(steps) == 1 and self.direct_dispatch:
+            if completed:
+                # 계획이 하위 에이전트 하나뿐이면 추측 호출 결과를 직접 호출 결과로 사용
+                prepared["sub_agent_results"] = prepared.pop("completed_steps")
+                return await self._direct_result(user_input, prepared)
+            return await self._dispatch(user_input, prepared, RouteStep(agent=steps[0], argument=user_input), timings)
+        return prepared
+
+    async def _speculate(self, user_input: str, timings: Dict[str, float], state: Dict[str, Any]) -> Dict[str, Any]:
+        """명확성 판단 결과를 기다리지 않고 실행하는 작업 (계획 수립 → 첫 단계 하위 에이전트 호출)"""
+        with span("speculation", "stage") as item:
+            state["span"] = item
+            with stage_timer(timings, "planning"):
+                plan_text = await self._make_plan(user_input)
+            prepared = {"plan_text": plan_text}
+
+            steps = plan_agents(plan_text)
+            if self.speculative_dispatch and steps:
+                # 자유 형식 계획에는 인자가 없으므로 사용자 입력을 그대로 전달
+                state["dispatched"] = steps[0]
+                result = await self._call_sub_agent(RouteStep(agent=steps[0], argument=user_input), timings)
+                if result is not None:
+                    prepared["completed_steps"] = [result]
+            return prepared
+
+    async def _discard_speculation(self, speculation: asyncio.Task, state: Dict[str, Any]) -> Dict[str, Any]:
+        """추측 작업을 취소하고 낭비된 작업량 보고 (소요 시간, 모델 호출 수, 토큰 수)"""
+        speculation.cancel()
+        try:
+            await speculation
+        except BaseException:
+            pass
+
+        item = state.get("span")
+        model_spans = [child for child in item.iter_spans() if child.kind == "model"] if item else []
+        report = {
+            "outcome": "discarded",
+            "dispatched": state.get("dispatched"),
+            "wasted_seconds": round(item.elapsed, 3) if item else 0.0,
+            "wasted_model_calls": len(model_spans),
+            "wasted_tokens": sum(
+                child.attributes.get("input_tokens", 0) + child.attributes.get("output_tokens", 0)
+                for child in model_spans
+            )
+        }
+        metrics.inc_speculation("discarded", report["wasted_seconds"], report["wasted_model_calls"])
+        print(f"🗑️ 추측 실행 취소: {report['wasted_seconds']}초, 모델 호출 {report['wasted_model_calls']}회 낭비")
+        return report
+
+    async def _dispatch(
+        self, user_input: str, prepared: Dict[str, Any], step: RouteStep, timings: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """
+        하위 에이전트 하나로 끝나는 요청의 빠른 경로 - 도구 함수를 직접 호출
+
+        Args:
+            user_input: 사용자 입력
+            prepared: 라우팅/계획 결과가 담긴 최종 호출 정보
+            step: 직접 호출할 단계
+            timings: 단계별 소요 시간(초)을 기록할 dict
+
+        Returns:
+            종합하지 않으면 {"result": ...}, 종합하면 sub_agent_results를 채운 최종 호출 정보
+        """
+        result = await self._call_sub_agent(step, timings)
+        if result is None:
+            return prepared
+        prepared["sub_agent_results"] = [result]
+        return await self._direct_result(user_input, prepared)
+
+    async def _call_sub_agent(self, step: RouteStep, timings: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """하위 에이전트 도구 함수 직접 호출 - 실패하면 None (오케스트레이터가 도구를 호출하는 기존 경로로 처리)"""
+        print(f"⚡ 직접 호출: {step.agent}(\"{step.argument}\")")
+        with stage_timer(timings, "dispatch"):
+            start = time.perf_counter()
+            try:
+                output = await SUB_AGENTS_ASYNC[step.agent](step.argument)
+            except Exception as e:
+                print(f"⚠️ 직접 호출 실패, 오케스트레이터로 처리합니다: {str(e)}")
+                return None
+            elapsed = time.perf_counter() - start
+
+        return {
+            "step": 1,
+            "agent": step.agent,
+            "argument": step.argument,
+            "output": str(output),
+            "elapsed": round(elapsed, 3)
+        }
+
+    async def _direct_result(self, user_input: str, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """직접 호출한 하위 에이전트 결과를 최종 결과로 반환 (ORCHESTRATOR_DIRECT_SYNTHESIS=true이면 종합 호출로 넘김)"""
+        if self.direct_synthesis:
+            return prepared
+        item = prepared["sub_agent_results"][0]
+        result = {**self._final_result(user_input, prepared, item["output"]), "agent": item["agent"], "direct_dispatch": True}
+        await self._record_turn(user_input, result["response"])
+        return {"result": result}
+
+    async def _record_turn(self, user_input: str, response_text: str):
+        """직접 호출로 처리한 턴을 오케스트레이터 대화 기록에 추가 (다음 요청이 맥락을 이어가도록)"""
+        async with self._final_call_slot(self.orchestrator):
+            self.orchestrator.messages.extend([
+                {"role": "user", "content": [{"text": user_input}]},
+                {"role": "assistant", "content": [{"text": response_text}]}
+            ])
+            self.history_manager.apply_management(self.orchestrator)
+
+    async def _cached_result(self, user_input: str, timings: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """의미가 거의 같은 이전 요청의 결과 (없으면 None, 임베딩 계산은 이벤트 루프 밖에서 실행)"""
+        if self.semantic_cache is None:
+            return None
+        with stage_timer(timings, "cache_lookup"):
+            hit = await asyncio.to_thread(self.semantic_cache.lookup, user_input, scope=self.user_id)
+        if hit is None:
+            return None
+
+        print(f"♻️ 캐시된 응답 사용 (유사도 {hit['similarity']}, 원래 요청: '{hit['matched_query']}')")
+        return {
+            **hit["result"],
+            "user_input": user_input,
+            "user_id": self.user_id,
+            "cache": {
+                "hit": True,
+                "similarity": hit["similarity"],
+                "matched_query": hit["matched_query"],
+                "category": hit["category"]
+            }
+        }
+
+    async def _store_result(self, user_input: str, result: Dict[str, Any]):
+        if self.semantic_cache is not None:
+            await asyncio.to_thread(self.semantic_cache.store, user_input, result, scope=self.user_id)
+
+    def _error_result(self, user_input: str, error: Exception) -> Dict[str, Any]:
+        # 간단한 오류 처리
+        return {
+            "success": False,
+            "agent": "orchestrator_agent",
+            "error": f"요청 처리 중 오류가 발생했습니다: {str(error)}",
+            "user_input": user_input
+        }
+
+    def _deadline_result(self, user_input: str, error: DeadlineExceeded) -> Dict[str, Any]:
+        print(f"⏱️ {str(error)}")
+        return {
+            "success": False,
+            "agent": "orchestrator_agent",
+            "error": f"요청 처리 중 오류가 발생했습니다: {str(error)}",
+            "user_input": user_input,
+            "deadline_exceeded": True
+        }
+
+    def _fallback_result(self, user_input: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "agent": "fallback",
+            "user_input": user_input,
+            "error": f"모델 인증/설정 오류: {self.availability.last_error}",
+            "response": f"현재 AI 모델에 접근할 수 없습니다. '{user_input}' 요청을 처리하려면 모델 설정을 확인해주세요.",
+            "needs_clarification": False,
+            "user_id": self.user_id
+        }
+
+    async def _call_first_model(self, call: Awaitable[Any]) -> Any:
+        """요청의 첫 모델 호출 - 결과로 가용성 상태 갱신"""
+        try:
+            result = await call
+        except Exception as e:
+            # 인증/설정 오류이면 사용 불가로 표시 (이후 요청은 재확인 전까지 기본 응답), 일시적 오류는 이 요청만 실패
+            self.availability.record_failure(e)
+            raise
+        self.availability.record_success()
+        return result
+
+    async def _needs_clarification(self, user_input: str) -> bool:
+        """명확성 판단 - 매우 모호한 요청이면 True"""
+        clarity_agent = Agent(
+            model=self.stage_models["clarity"],
+            system_prompt="""당신은 사용자 요청의 명확성만 판단하는 전문가입니다.
 
 판단 기준:
 - 매우 모호한 경우만 "NEED_MORE"로 응답 (예: "커피", "음식" 같은 단일 키워드)
 - 대부분의 경우는 "PROCEED"로 응답 (예: "ice coffee", "파리", "날씨 정보" 등)
 
 응답 형식: "NEED_MORE" 또는 "PROCEED"만 출력하세요.""",
-                tools=[]
-            )
-            
-            clarity_prompt = f"""
-            사용자 요청: "{user_input}"
-            
-            사용자 요청이 추가 정보 없이 처리 가능한지 판단하세요.
-            응답 형식: "NEED_MORE" 또는 "PROCEED"만 출력
-            """
-            
-            clarity_response = clarity_agent(clarity_prompt)
-            clarity_result = str(clarity_response).strip()
+            tools=[],
+            hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK]
+        )
+        
+        clarity_prompt = f"""
+        사용자 요청: "{user_input}"
+        
+        사용자 요청이 추가 정보 없이 처리 가능한지 판단하세요.
+        응답 형식: "NEED_MORE" 또는 "PROCEED"만 출력
+        """
+        
+        clarity_response = await clarity_agent.invoke_async(clarity_prompt)
+        clarity_result = str(clarity_response).strip()
 
-            
-            # 매우 모호한 경우만 질문
-            if "NEED_MORE" in clarity_result:
-                # 사용자에게 명확화 질문
-                clarification_response = conversation_agent(f"""
-                사용자가 "{user_input}"라고 입력했습니다.
-                이 요청은 모호하여 추가 정보가 필요합니다.
-                
-                사용자에게 어떤 정보를 원하는지 구체적으로 물어보세요.
-                예를 들어:
-                - "ice coffee"라면 → 레시피를 원하는지, 브랜드 추천을 원하는지, 일반 정보를 원하는지
-                - "날씨"라면 → 어느 지역의 날씨인지
-                - "음식"이라면 → 어떤 음식에 대한 정보인지
-                
-                간단한 질문으로 응답하세요.
-                """)
-                
-                return {
-                    "success": True,
-                    "agent": "orchestrator_agent",
-                    "user_input": user_input,
-                    "response": str(clarification_response),
-                    "needs_clarification": True,
-                    "user_id": self.user_id
-                }
+        # 매우 모호한 경우만 질문
+        return "NEED_MORE" in clarity_result
+
+    async def _ask_clarification(self, user_input: str) -> Dict[str, Any]:
+        """모호한 요청에 대해 사용자에게 명확화 질문"""
+        clarification_response = await conversation_agent_async(f"""
+        사용자가 "{user_input}"라고 입력했습니다.
+        이 요청은 모호하여 추가 정보가 필요합니다.
+        
+        사용자에게 어떤 정보를 원하는지 구체적으로 물어보세요.
+        예를 들어:
+        - "ice coffee"라면 → 레시피를 원하는지, 브랜드 추천을 원하는지, 일반 정보를 원하는지
+        - "날씨"라면 → 어느 지역의 날씨인지
+        - "음식"이라면 → 어떤 음식에 대한 정보인지
+        
+        간단한 질문으로 응답하세요.
+        """)
+        
+        return {
+            "success": True,
+            "agent": "orchestrator_agent",
+            "user_input": user_input,
+            "response": str(clarification_response),
+            "needs_clarification": True,
+            "user_id": self.user_id
+        }
 
-            # 요청이 명확한 경우 - 실행 계획 수립
-            planning_agent = Agent(
-                model=self.model,
-                system_prompt="""당신은 실행 계획만 수립하는 전문가입니다.
+    async def _make_plan(self, user_input: str) -> str:
+        """실행 계획 수립"""
+        planning_agent = Agent(
+            model=self.stage_models["planning"],
+            system_prompt="""당신은 실행 계획만 수립하는 전문가입니다.
 도구를 사용하지 말고, 오직 계획만 세우세요.
 
 사용 가능한 하위 에이전트들:
@@ -129,78 +722,154 @@ class OrchestratorAgent:
 - weather_agent: 날씨 정보 요청 (미국 지역만 지원)  
 - conversation_agent: 일반 대화, 인사, 간단한 질문
 """,
-                tools=[]
-            )
+            tools=[],
+            hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK]
+        )
+
+        planning_prompt = f"""
+        사용자 요청: "{user_input}"
+        
+        이 요청을 처리하기 위한 실행 계획을 다음 형식으로 작성하세요:
+        
+        **📋 실행 계획:**
+        1. [하위 에이전트명] - [사용 이유와 목적]
+        2. [하위 에이전트명] - [사용 이유와 목적]
+        ...
+        
+        **🎯 예상 결과:**
+        [어떤 최종 결과를 사용자에게 제공할 예정인지]
+        
+        **⚠️ 주의사항:**
+        [특별히 고려해야 할 사항이 있다면]
+        """
+
+        plan_response = await planning_agent.invoke_async(planning_prompt)
+        return str(plan_response)
+
+    def _print_plan(self, plan_text: str):
+        print("\n📋 ORCHESTRATOR AGENT 실행 계획")
+        print("="*60)
+        print(plan_text)
+        print("="*60)
 
-            planning_prompt = f"""
+    def _final_call(self, user_input: str, prepared: Dict[str, Any]) -> Tuple[Agent, str]:
+        """최종 답변을 생성할 에이전트와 프롬프트"""
+        if "sub_agent_results" in prepared:
+            # fanout - 이미 실행된 하위 에이전트 결과를 도구 없이 한 번에 종합
+            results_text = "\n\n".join(
+                f"### {item['step']}. {item['agent']}(\"{item['argument']}\")\n{item['output']}"
+                for item in prepared["sub_agent_results"]
+            )
+            synthesis_prompt = f"""
             사용자 요청: "{user_input}"
             
-            이 요청을 처리하기 위한 실행 계획을 다음 형식으로 작성하세요:
-            
-            **📋 실행 계획:**
-            1. [하위 에이전트명] - [사용 이유와 목적]
-            2. [하위 에이전트명] - [사용 이유와 목적]
-            ...
+            다음은 실행 계획에 따라 하위 에이전트들을 실행한 결과입니다:
             
-            **🎯 예상 결과:**
-            [어떤 최종 결과를 사용자에게 제공할 예정인지]
+            {results_text}
             
-            **⚠️ 주의사항:**
-            [특별히 고려해야 할 사항이 있다면]
+            위 결과를 종합하여 사용자에게 도움이 되는 최종 답변을 제공하세요.
             """
 
-            plan_response = planning_agent(planning_prompt)
-            plan_text = str(plan_response)
-            
-            print("\n📋 ORCHESTRATOR AGENT 실행 계획")
-            print("="*60)
-            print(plan_text)
-            print("="*60)
-
-            # 계획에 따라 실제 하위 에이전트들 실행
-            execution_prompt = f"""
-            다음은 앞서 수립한 실행 계획입니다:
-            
-            {plan_text}
-            
-            이제 이 계획에 따라 실제로 하위 에이전트들을 사용하여 사용자 요청을 처리하세요:
-            
-            사용자 요청: "{user_input}"
-            
-            계획에 따라 순차적으로 하위 에이전트들을 실행하고, 최종적으로 사용자에게 도움이 되는 종합적인 답변을 제공하세요.
-            """
+            synthesis_agent = Agent(
+                model=self.stage_models["final"],
+                system_prompt=SYNTHESIS_PROMPT,
+                tools=[],
+                hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK],
+                **self._callback_kwargs
+            )
+            return synthesis_agent, synthesis_prompt
 
-            response = self.orchestrator(execution_prompt)
-            
-            # <thinking> 태그 제거
-            import re
-            clean_response = re.sub(r'<thinking>.*?</thinking>', '', str(response), flags=re.DOTALL)
-            clean_response = clean_response.strip()
-
-            return {
-                "success": True,
-                "agent": "orchestrator_agent",
-                "user_input": user_input,
-                "execution_plan": plan_text,
-                "response": clean_response,
-                "needs_clarification": False,
-                "user_id": self.user_id
-            }
+        # 계획에 따라 실제 하위 에이전트들 실행
+        execution_prompt = f"""
+        다음은 앞서 수립한 실행 계획입니다:
+        
+        {prepared["plan_text"]}
+        """
+        for item in prepared.get("completed_steps", []):
+            # 추측 실행으로 이미 호출한 단계는 결과를 전달하여 다시 호출하지 않도록 함
+            execution_prompt += f"""
+        {item['step']}단계 {item['agent']}는 이미 실행되었습니다 (다시 호출하지 마세요). 결과:
+        {item['output']}
+        """
+        execution_prompt += f"""
+        이제 이 계획에 따라 실제로 하위 에이전트들을 사용하여 사용자 요청을 처리하세요:
+        
+        사용자 요청: "{user_input}"
+        
+        계획에 따라 순차적으로 하위 에이전트들을 실행하고, 최종적으로 사용자에게 도움이 되는 종합적인 답변을 제공하세요.
+        """
+        return self.orchestrator, execution_prompt
 
-        except Exception as e:
-            # 간단한 오류 처리
-            return {
-                "success": False,
-                "agent": "orchestrator_agent",
-                "error": f"요청 처리 중 오류가 발생했습니다: {str(e)}",
-                "user_input": user_input
+    def _history_tokens(self, agent: Agent, model_calls: int) -> Dict[str, Any]:
+        """오케스트레이터 Agent의 모델 호출별 대화 기록 토큰 수 (model_calls 시점 이후)"""
+        if agent is not self.orchestrator:
+            return {}
+        return {
+            "history_tokens": {
+                "per_call": self.history_manager.calls_since(model_calls),
+                "after_management": estimate_tokens(self.orchestrator.messages)
             }
+        }
+
+    def _final_result(self, user_input: str, prepared: Dict[str, Any], response_text: str) -> Dict[str, Any]:
+        result = {
+            "success": True,
+            "agent": "orchestrator_agent",
+            "user_input": user_input,
+            "execution_plan": prepared["plan_text"],
+            "response": strip_thinking(response_text),
+            "needs_clarification": False,
+            "user_id": self.user_id
+        }
+        if "sub_agent_results" in prepared:
+            result["sub_agent_results"] = prepared["sub_agent_results"]
+        if "route" in prepared:
+            result["route"] = prepared["route"].model_dump()
+        if "speculation" in prepared:
+            result["speculation"] = prepared["speculation"]
+        return result
+
+    def _prompt_cache_status(self) -> Dict[str, Any]:
+        """프롬프트 캐시 설정과 누적 토큰 (캐시되지 않은 입력 / 캐시 읽기 / 캐시 쓰기)"""
+        config = self.model.get_config()
+        tokens = metrics.token_totals()
+        prompt_tokens = tokens["input"] + tokens["cache_read"] + tokens["cache_write"]
+        return {
+            "enabled": bool(isinstance(config, dict) and config.get("cache_config")),
+            "uncached_input_tokens": tokens["input"],
+            "cache_read_tokens": tokens["cache_read"],
+            "cache_write_tokens": tokens["cache_write"],
+            "cache_read_ratio": round(tokens["cache_read"] / prompt_tokens, 3) if prompt_tokens else 0.0
+        }
 
     def get_agent_status(self) -> Dict[str, Any]:
         """에이전트 상태 정보 반환"""
         return {
             "orchestrator_agent": "활성",
             "model": type(self.model).__name__,
+            "model_status": self.availability.to_dict(),
+            "mode": self.mode,
+            "direct_dispatch": {"enabled": self.direct_dispatch, "synthesis": self.direct_synthesis},
+            "speculation": {
+                "enabled": self.speculative,
+                "dispatch": self.speculative_dispatch,
+                **metrics.speculation_totals()
+            },
+            "stage_models": {
+                stage: {
+                    **{
+                        key: model.get_config().get(key)
+                        for key in ("model_id", "max_tokens", "temperature", "stop_sequences")
+                    },
+                    # 캐시 지점을 거부해 해당 단계만 캐시를 끈 경우 false
+                    "prompt_cache": bool(model.get_config().get("cache_config"))
+                }
+                for stage, model in self.stage_models.items()
+            },
+            "history": self.history_manager.stats(),
+            "upstreams": get_circuit_breaker_stats(),
+            "rate_limits": get_rate_limit_stats(),
+            "prompt_cache": self._prompt_cache_status(),
             "user_id": self.user_id,
             "available_sub_agents": [
                 "search_agent (Wikipedia 및 DuckDuckGo 검색)",
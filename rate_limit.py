@@ -0,0 +1,341 @@
+"""Rate Limit - 외부 API/Bedrock별 토큰 버킷 호출 속도 제한과 동시 실행 수 제한 (대기열 포함)"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from strands.models import BedrockModel, Model
+from tracing import metrics
+
+
+# 외부 API별 기본 제한 (초당 요청 수, 버스트, 최대 동시 실행 수) - 0이면 제한 없음
+DEFAULT_UPSTREAM_LIMITS = {
+    "nominatim": {"rate": 1.0, "burst": 1, "max_in_flight": 1},
+    "nws": {"rate": 5.0, "burst": 5, "max_in_flight": 4},
+    "duckduckgo": {"rate": 2.0, "burst": 4, "max_in_flight": 4},
+    "wikipedia": {"rate": 10.0, "burst": 10, "max_in_flight": 8},
+    "bedrock": {"rate": 10.0, "burst": 10, "max_in_flight": 16}
+}
+
+
+def rate_limits_enabled() -> bool:
+    return os.getenv("UPSTREAM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+
+class SlotQueue:
+    """
+    여러 이벤트 루프/스레드에서 함께 쓰는 FIFO 세마포어
+    슬롯이 없으면 자신의 이벤트 루프 future로 도착 순서대로 기다리며, 반환된 슬롯은 다음 대기자에게 바로 넘어갑니다.
+    """
+
+    def __init__(self, slots: int, lock: threading.Lock = None, on_change: Callable[[], None] = None):
+        self.slots = slots
+        self.in_use = 0
+        # 대기자 (이벤트 루프, future) - 도착 순서
+        self._waiters: deque = deque()
+        self._lock = lock or threading.Lock()
+        # 대기열/사용 수가 바뀔 때 잠금 안에서 호출
+        self._on_change = on_change or (lambda: None)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        """슬롯을 얻을 때까지 대기 (취소되면 대기열에서 빠지고, 이미 넘겨받은 슬롯은 다음 대기자에게 넘김)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_use < self.slots and not self._waiters:
+                self.in_use += 1
+                self._on_change()
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._on_change()
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                owned = waiter not in self._waiters and waiter[1].done() and not waiter[1].cancelled()
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._on_change()
+            if owned:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            # 슬롯을 반환하지 않고 다음 대기자에게 넘김 (대기자의 이벤트 루프에서 깨움)
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if future.cancelled():
+                    continue
+                self._on_change()
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:
+                    # 대기자의 이벤트 루프가 이미 닫힘
+                    continue
+            self.in_use -= 1
+            self._on_change()
+
+    def _hand_over(self, future: asyncio.Future):
+        if future.cancelled():
+            # 깨우기 전에 대기자가 취소됨 - 슬롯을 다음 대기자에게 넘김
+            self.release()
+        else:
+            future.set_result(True)
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        """블록 실행 동안 슬롯 유지"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class UpstreamLimiter:
+    """
+    외부 API 하나의 호출 제한 (토큰 버킷 + 최대 동시 실행 수)
+    동시 실행 슬롯이 없으면 도착 순서대로 대기열에서 기다리고, 슬롯을 얻은 뒤 토큰이 없으면
+    다음 토큰이 채워질 때까지 기다립니다. 여러 이벤트 루프/스레드에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_in_flight: int):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max_in_flight
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        # 동시 실행 슬롯 (0 이하이면 제한 없음)
+        self._slots = SlotQueue(max_in_flight, lock=self._lock, on_change=self._publish) if max_in_flight > 0 else None
+        # 슬롯은 얻었지만 토큰을 기다리는 요청 수
+        self._pending_tokens = 0
+
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+        self.max_queue_depth = 0
+
+    def _queue_depth(self) -> int:
+        return (self._slots.waiting if self._slots else 0) + self._pending_tokens
+
+    def _in_flight(self) -> int:
+        return self._slots.in_use if self._slots else 0
+
+    def _publish(self):
+        """대기열 길이/실행 중 수 게이지 갱신 (잠금 안에서 호출)"""
+        depth = self._queue_depth()
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        metrics.set_upstream_queue(self.name, depth, self._in_flight())
+
+    async def _acquire_slot(self):
+        if self._slots is not None:
+            await self._slots.acquire()
+
+    def _release_slot(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    def _reserve_token(self) -> float:
+        """토큰 하나를 예약하고 사용 가능해질 때까지 기다릴 시간(초) 반환"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if delay > 0:
+                self._pending_tokens += 1
+                self._publish()
+            return delay
+
+    async def acquire(self):
+        """호출 허가를 얻을 때까지 대기 (취소되면 대기열/토큰 예약을 되돌림)"""
+        started = time.monotonic()
+        await self._acquire_slot()
+        try:
+            delay = self._reserve_token()
+            if delay > 0:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    with self._lock:
+                        self._tokens += 1
+                    raise
+                finally:
+                    with self._lock:
+                        self._pending_tokens -= 1
+                        self._publish()
+        except BaseException:
+            self._release_slot()
+            raise
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self.acquired += 1
+            if waited > 0.001:
+                self.waited += 1
+            self.wait_seconds += waited
+            self.max_wait = max(self.max_wait, waited)
+        metrics.observe_upstream_wait(self.name, waited)
+
+    def release(self):
+        self._release_slot()
+
+    @asynccontextmanager
+    async def limit(self) -> AsyncIterator[None]:
+        """블록 실행 동안 호출 허가 유지"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight(),
+                "queue_depth": self._queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "avg_wait": round(self.wait_seconds / self.acquired, 4) if self.acquired else 0.0,
+                "max_wait": round(self.max_wait, 4)
+            }
+
+
+_limiters: Dict[str, UpstreamLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_upstream_limiter(upstream: str) -> Optional[UpstreamLimiter]:
+    """
+    외부 API 이름별 호출 제한 (프로세스 전역, UPSTREAM_RATE_LIMIT_ENABLED=false이면 None)
+
+    <UPSTREAM>_RATE_LIMIT(초당 요청 수), <UPSTREAM>_BURST, <UPSTREAM>_MAX_IN_FLIGHT 환경변수로 기본값을 바꿀 수 있습니다.
+    """
+    if not rate_limits_enabled():
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(upstream)
+        if limiter is None:
+            defaults = DEFAULT_UPSTREAM_LIMITS.get(upstream, {"rate": 0.0, "burst": 1, "max_in_flight": 0})
+            prefix = upstream.upper()
+            limiter = _limiters[upstream] = UpstreamLimiter(
+                upstream,
+                rate=float(os.getenv(f"{prefix}_RATE_LIMIT", str(defaults["rate"]))),
+                burst=int(os.getenv(f"{prefix}_BURST", str(defaults["burst"]))),
+                max_in_flight=int(os.getenv(f"{prefix}_MAX_IN_FLIGHT", str(defaults["max_in_flight"])))
+            )
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """외부 API별 호출 제한 현황 (대기열 길이, 대기 시간)"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in sorted(limiters.items())}
+
+
+@asynccontextmanager
+async def upstream_slot(upstream: str) -> AsyncIterator[None]:
+    """외부 API 호출 한 번의 허가 (제한이 꺼져 있으면 바로 통과)"""
+    limiter = get_upstream_limiter(upstream)
+    if limiter is None:
+        yield
+        return
+    async with limiter.limit():
+        yield
+
+
+class RateLimitedModel(Model):
+    """
+    모델 래퍼 - 모델 호출마다 "bedrock" 호출 제한을 통과한 뒤 요청 (응답 스트림이 끝날 때까지 슬롯 유지)
+    설정, 토큰 수 계산 등 그 외 속성은 감싼 모델에 그대로 위임하여 에이전트에는 원래 모델과 같게 보입니다.
+    """
+
+    def __init__(self, model: Model, upstream: str = "bedrock"):
+        self.model = model
+        self.upstream = upstream
+
+    def __getattr__(self, name: str) -> Any:
+        # 래퍼에 없는 속성(config, client 등)은 감싼 모델에서 조회
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    @property
+    def stateful(self) -> bool:
+        return self.model.stateful
+
+    @property
+    def context_window_limit(self) -> Optional[int]:
+        return self.model.context_window_limit
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    async def count_tokens(self, messages: List[Dict[str, Any]], *args: Any, **kwargs: Any) -> int:
+        config = self.get_config()
+        if isinstance(config, dict) and config.get("use_native_token_count") is True:
+            # Bedrock CountTokens API를 호출하는 경우에만 호출 제한 적용
+            async with upstream_slot(self.upstream):
+                return await self.model.count_tokens(messages, *args, **kwargs)
+        return await self.model.count_tokens(messages, *args, **kwargs)
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: List[Dict[str, Any]] = None,
+        system_prompt: str = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async with upstream_slot(self.upstream):
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+
+    async def structured_output(
+        self, output_model, prompt: List[Dict[str, Any]], system_prompt: str = None, **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async with upstream_slot(self.upstream):
+            async for event in self.model.structured_output(output_model, prompt, system_prompt, **kwargs):
+                yield event
+
+
+# (모델 id, 단계) → (감싼 모델, 래퍼) - 프롬프트 캐시 fallback이 래퍼의 모델을 바꿔도 원래 모델로 찾을 수 있도록
+_limited_models: Dict[Tuple[int, Optional[str]], Tuple[Model, RateLimitedModel]] = {}
+
+
+def rate_limited(model: Model, stage: str = None) -> Model:
+    """
+    Bedrock 모델이면 호출 제한 래퍼, 아니면 원래 모델
+    래퍼는 모델과 단계별로 하나를 공유하며, 호출 제한(upstream)은 모든 래퍼가 함께 사용합니다.
+    """
+    if not isinstance(model, BedrockModel):
+        return model
+    key = (id(model), stage)
+    with _limiters_lock:
+        entry = _limited_models.get(key)
+        if entry is None or entry[0] is not model:
+            entry = _limited_models[key] = (model, RateLimitedModel(model))
+        return entry[1]
@@ -0,0 +1,352 @@
+"""Resilience - 요청 단위 기한(deadline), 지터 백오프 재시도, 외부 API별 서킷 브레이커"""
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+import httpx
+from rate_limit import get_upstream_limiter
+from tracing import current_span, metrics
+
+
+# 요청 전체 기한(초) 기본값 (0이면 기한 없음)
+DEFAULT_REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "60"))
+
+# 외부 API 재시도 - 시도 횟수(첫 시도 포함)와 지터 지수 백오프
+UPSTREAM_RETRY_ATTEMPTS = int(os.getenv("UPSTREAM_RETRY_ATTEMPTS", "3"))
+UPSTREAM_RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", "0.2"))
+UPSTREAM_RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", "2.0"))
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class DeadlineExceeded(Exception):
+    """요청 기한 초과"""
+
+
+class UpstreamError(Exception):
+    """재시도 후에도 외부 API 호출 실패"""
+
+
+class CircuitOpenError(UpstreamError):
+    """서킷이 열려 있어 외부 API를 호출하지 않고 바로 실패"""
+
+
+class Deadline:
+    """요청 하나의 종료 시각"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float = None) -> Iterator[Optional[Deadline]]:
+    """
+    블록 안의 모든 작업(하위 에이전트, 도구, 스레드/태스크 포함)에 적용되는 기한 설정
+
+    Args:
+        seconds: 기한(초) - None이면 REQUEST_DEADLINE, 0 이하이면 기한 없음.
+                 바깥 기한이 더 이르면 바깥 기한을 유지
+
+    Yields:
+        적용된 기한 (없으면 None)
+    """
+    seconds = DEFAULT_REQUEST_DEADLINE if seconds is None else seconds
+    outer = _current_deadline.get()
+    deadline = Deadline(seconds) if seconds > 0 else None
+    if outer is not None and (deadline is None or outer.expires_at <= deadline.expires_at):
+        deadline = outer
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def bounded_timeout(timeout: float) -> float:
+    """남은 기한을 넘지 않는 타임아웃 (기한이 이미 지났으면 DeadlineExceeded)"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"요청 기한({deadline.seconds:g}초)을 초과했습니다.")
+    return min(timeout, remaining)
+
+
+async def with_deadline(call: Awaitable[Any]) -> Any:
+    """남은 기한 안에 끝나지 않으면 작업을 취소하고 DeadlineExceeded"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return await call
+    try:
+        return await asyncio.wait_for(call, deadline.remaining())
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"요청 기한({deadline.seconds:g}초)을 초과했습니다.") from None
+
+
+_END = object()
+
+
+async def iterate_with_deadline(iterator: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    비동기 이터레이터를 별도 태스크에서 실행하며 남은 기한 안에서만 이벤트 전달
+    (기한이 지나면 태스크를 취소하고 DeadlineExceeded)
+    """
+    if _current_deadline.get() is None:
+        async for item in iterator:
+            yield item
+        return
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def _produce():
+        try:
+            async for item in iterator:
+                events.put_nowait((item, None))
+            events.put_nowait((_END, None))
+        except Exception as e:
+            events.put_nowait((_END, e))
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item, error = await with_deadline(events.get())
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        producer.cancel()
+
+
+class CircuitBreaker:
+    """
+    외부 API별 서킷 브레이커
+    연속 실패가 failure_threshold에 도달하면 reset_timeout 동안 호출을 막고(open) 바로 실패하며,
+    그 뒤 한 번의 시험 호출(half_open)이 성공하면 다시 닫습니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.reset_timeout = reset_timeout or float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        """서킷이 다시 시험 호출을 허용할 때까지 남은 시간(초)"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """호출 허용 여부 (열린 서킷은 reset_timeout이 지나면 한 번의 시험 호출만 허용)"""
+        with self._lock:
+            if self.state == self.OPEN and self.retry_after() <= 0:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def cancel_probe(self):
+        """시험 호출이 결과 없이 끝남 (기한 초과 등) - 다음 호출이 다시 시험할 수 있도록"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"⚠️ 서킷 열림: {self.name} (연속 실패 {self.failures}회, {self.reset_timeout:g}초 동안 호출 차단)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_after": round(self.retry_after(), 1) if self.state == self.OPEN else 0.0,
+                "rejected": self.rejected
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(upstream: str) -> CircuitBreaker:
+    """외부 API 이름별 서킷 브레이커 (프로세스 전역)"""
+    with _breakers_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = _breakers[upstream] = CircuitBreaker(upstream)
+        return breaker
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """외부 API별 서킷 상태"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.to_dict() for name, breaker in sorted(breakers.items())}
+
+
+def backoff_delay(attempt: int) -> float:
+    """attempt번째 재시도 전 대기 시간 (full jitter: 0 ~ min(최대, 기본 × 2^attempt))"""
+    return random.uniform(0, min(UPSTREAM_RETRY_MAX_DELAY, UPSTREAM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+async def _send_limited(upstream: str, send: Callable[[], Awaitable[httpx.Response]], timeout: float) -> httpx.Response:
+    """
+    호출 제한 슬롯을 얻은 뒤 시도 한 번 (슬롯 대기는 남은 기한까지, 타임아웃은 슬롯을 얻은 시점부터)
+    남은 기한으로 줄어든 타임아웃이 지나면 DeadlineExceeded
+    """
+    limiter = get_upstream_limiter(upstream)
+    if limiter is not None:
+        await with_deadline(limiter.acquire())
+    try:
+        attempt_timeout = bounded_timeout(timeout)
+        try:
+            return await asyncio.wait_for(send(), attempt_timeout)
+        except asyncio.TimeoutError:
+            deadline = _current_deadline.get()
+            if deadline is not None and attempt_timeout < timeout:
+                # 외부 API가 아니라 요청 기한 때문에 끝난 시도 - 서킷 실패로 세지 않음
+                raise DeadlineExceeded(f"요청 기한({deadline.seconds:g}초)을 초과했습니다.") from None
+            raise
+    finally:
+        if limiter is not None:
+            limiter.release()
+
+
+async def call_upstream(
+    upstream: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    timeout: float = None,
+    attempts: int = None
+) -> httpx.Response:
+    """
+    외부 API 호출 - 서킷 확인, 호출 제한 대기(남은 기한 이내), 시도별 타임아웃(남은 기한 이내), 지터 백오프 재시도
+    서킷 브레이커에는 재시도를 모두 마친 호출 결과가 한 번만 기록됩니다.
+
+    Args:
+        upstream: 외부 API 이름 (서킷 브레이커/메트릭 단위)
+        send: 요청을 보내는 코루틴 함수 (시도마다 새로 호출)
+        timeout: 시도별 최대 시간(초) - 기본값은 TOOL_HTTP_TIMEOUT
+        attempts: 최대 시도 횟수 (첫 시도 포함)
+
+    Returns:
+        응답 (재시도 가능한 상태 코드가 계속되면 마지막 응답)
+
+    Raises:
+        CircuitOpenError: 서킷이 열려 있는 경우
+        DeadlineExceeded: 요청 기한을 넘긴 경우
+        UpstreamError: 모든 시도가 연결 오류/타임아웃으로 실패한 경우
+    """
+    breaker = get_circuit_breaker(upstream)
+    timeout = timeout or float(os.getenv("TOOL_HTTP_TIMEOUT", "10"))
+    attempts = max(1, attempts or UPSTREAM_RETRY_ATTEMPTS)
+    last_response: Optional[httpx.Response] = None
+    last_error: Optional[BaseException] = None
+
+    # 서킷은 논리적 호출 한 번에 한 번만 확인/기록 (재시도 시도마다 실패를 세지 않음)
+    if not breaker.allow():
+        metrics.inc_upstream(upstream, "rejected")
+        raise CircuitOpenError(
+            f"{upstream} 서비스가 일시적으로 응답하지 않습니다 "
+            f"(서킷 열림, {breaker.retry_after():.0f}초 후 재시도)"
+        )
+
+    try:
+        for attempt in range(attempts):
+            try:
+                response = await _send_limited(upstream, send, timeout)
+            except (httpx.TransportError, asyncio.TimeoutError) as e:
+                last_error, last_response = e, None
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    breaker.record_success()
+                    metrics.inc_upstream(upstream, "success" if attempt == 0 else "retried_success")
+                    return response
+                last_error, last_response = None, response
+
+            if attempt + 1 >= attempts or breaker.state == CircuitBreaker.OPEN:
+                # 시도 횟수를 다 썼거나 다른 호출들로 서킷이 열림
+                break
+            delay = backoff_delay(attempt)
+            deadline = _current_deadline.get()
+            if deadline is not None and delay >= deadline.remaining():
+                # 다음 시도를 할 시간이 남지 않음
+                break
+            metrics.inc_upstream(upstream, "retry")
+            item = current_span()
+            if item is not None:
+                item.set(retries=item.attributes.get("retries", 0) + 1)
+            await asyncio.sleep(delay)
+    except BaseException:
+        # 기한 초과/취소 - 외부 API 실패가 아니므로 기록하지 않고 시험 호출 권한만 반환
+        breaker.cancel_probe()
+        raise
+
+    breaker.record_failure()
+    metrics.inc_upstream(upstream, "failure")
+    if last_response is not None:
+        return last_response
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"요청 기한({deadline.seconds:g}초)을 초과했습니다.")
+    reason = f"{type(last_error).__name__}: {last_error}" if str(last_error) else type(last_error).__name__
+    raise UpstreamError(f"{upstream} 요청 실패 ({reason})")
+
+
+def error_details(error: BaseException) -> Dict[str, Any]:
+    """도구 오류 결과에 추가할 상태 (서킷 열림/기한 초과이면 성능 저하 응답임을 표시)"""
+    if isinstance(error, CircuitOpenError):
+        return {"degraded": True, "upstream_unavailable": True}
+    if isinstance(error, DeadlineExceeded):
+        return {"degraded": True, "deadline_exceeded": True}
+    return {}
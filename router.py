@@ -0,0 +1,113 @@
+"""Request Router - 명확성 판단과 실행 계획을 한 번의 구조화 출력 호출로 결정"""
+from typing import List, Literal
+from pydantic import BaseModel, Field, model_validator
+from strands import Agent
+from tracing import MODEL_CALL_TRACER
+from model_config import PROMPT_CACHE_FALLBACK
+
+
+SUB_AGENT_ARGUMENTS = {
+    "search_agent": "query",
+    "weather_agent": "location_query",
+    "conversation_agent": "message"
+}
+
+
+class RouteStep(BaseModel):
+    """실행할 하위 에이전트 한 단계"""
+
+    agent: Literal["search_agent", "weather_agent", "conversation_agent"] = Field(
+        description="호출할 하위 에이전트 이름"
+    )
+    argument: str = Field(
+        description="하위 에이전트에 전달할 입력 (search_agent: 검색어, weather_agent: 지역명, conversation_agent: 메시지)"
+    )
+    reason: str = Field(default="", description="이 에이전트를 사용하는 이유와 목적")
+    depends_on: List[int] = Field(
+        default_factory=list,
+        description="이 단계 실행 전에 결과가 필요한 앞선 단계 번호(1부터 시작). 독립적인 단계는 빈 목록"
+    )
+
+
+class RoutePlan(BaseModel):
+    """라우터 결과 - 명확성 판단과 실행 계획"""
+
+    clarity: Literal["PROCEED", "NEED_MORE"] = Field(
+        description="매우 모호한 요청이면 NEED_MORE, 그 외에는 PROCEED"
+    )
+    steps: List[RouteStep] = Field(
+        default_factory=list,
+        description="PROCEED인 경우 실행할 하위 에이전트 목록 (실행 순서대로)"
+    )
+    expected_result: str = Field(default="", description="사용자에게 제공할 최종 결과")
+    notes: str = Field(default="", description="특별히 고려해야 할 사항")
+
+    @model_validator(mode="after")
+    def _drop_steps_when_unclear(self) -> "RoutePlan":
+        if self.clarity == "NEED_MORE":
+            self.steps = []
+        return self
+
+    def to_plan_text(self) -> str:
+        """planning_agent와 같은 형식의 실행 계획 텍스트로 변환"""
+        lines = ["**📋 실행 계획:**"]
+        for index, step in enumerate(self.steps, 1):
+            argument_name = SUB_AGENT_ARGUMENTS[step.agent]
+            dependency = f" (선행: {', '.join(map(str, step.depends_on))}단계)" if step.depends_on else ""
+            lines.append(f'{index}. {step.agent}({argument_name}="{step.argument}") - {step.reason}{dependency}')
+        lines.append("")
+        lines.append("**🎯 예상 결과:**")
+        lines.append(self.expected_result or "-")
+        if self.notes:
+            lines.append("")
+            lines.append("**⚠️ 주의사항:**")
+            lines.append(self.notes)
+        return "\n".join(lines)
+
+
+ROUTER_PROMPT = """당신은 사용자 요청을 분석하여 명확성 판단과 실행 계획을 한 번에 결정하는 라우터입니다.
+도구를 사용하지 말고, 오직 판단과 계획만 구조화된 형식으로 반환하세요.
+
+명확성 판단 기준:
+- 매우 모호한 경우만 "NEED_MORE" (예: "커피", "음식" 같은 단일 키워드)
+- 대부분의 경우는 "PROCEED" (예: "ice coffee", "파리", "날씨 정보" 등)
+
+사용 가능한 하위 에이전트들:
+- search_agent: Wikipedia 및 DuckDuckGo 검색이 필요한 정보 요청 (argument: 영문 검색어 권장)
+- weather_agent: 날씨 정보 요청 (미국 지역만 지원, argument: 지역명)
+- conversation_agent: 일반 대화, 인사, 간단한 질문 (argument: 사용자 메시지)
+
+PROCEED인 경우 필요한 하위 에이전트만 최소한으로 선택하세요.
+서로 독립적인 단계는 depends_on을 비워 두세요. 앞선 단계의 결과가 꼭 필요한 경우에만 depends_on에 그 단계 번호를 넣으세요.
+"""
+
+
+class RequestRouter:
+    """구조화 출력 한 번으로 clarity + planning을 대체하는 라우터"""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def route_async(self, user_input: str) -> RoutePlan:
+        """
+        사용자 요청을 라우팅
+
+        Args:
+            user_input: 사용자 입력
+
+        Returns:
+            검증된 RoutePlan
+        """
+        result = await self._new_agent().invoke_async(
+            f'사용자 요청: "{user_input}"', structured_output_model=RoutePlan
+        )
+        return result.structured_output
+
+    def _new_agent(self) -> Agent:
+        return Agent(
+            model=self.model,
+            system_prompt=ROUTER_PROMPT,
+            tools=[],
+            callback_handler=None,
+            hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK]
+        )
@@ -0,0 +1,507 @@
+"""Semantic Cache - 의미가 거의 같은 요청에 캐시된 응답 반환 (로컬 다국어 임베딩 + faiss 벡터 검색)"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from cache_utils import normalize_key
+from tracing import record_cache
+
+try:
+    import faiss
+except ImportError:  # faiss가 없으면 numpy 전수 비교로 동작
+    faiss = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # sentence-transformers가 없으면 해시 임베딩으로 동작
+    SentenceTransformer = None
+
+
+DEFAULT_SEMANTIC_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "semantic_cache")
+
+# 로컬 다국어 문장 임베딩 모델 (한국어/영어 표현과 언어가 다른 같은 의미의 요청을 가깝게 배치)
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+# 임베딩 종류별 기본 임계값 - 해시 임베딩은 표기 차이만 흡수하므로 높게
+DEFAULT_THRESHOLDS = {"model": 0.85, "hash": 0.95}
+
+# 임계값 조정용 예시 (요청, 비교 요청, 같은 의미 여부)
+CALIBRATION_PAIRS = (
+    ("뉴욕 날씨", "newyork 날씨 어때?", True),
+    ("뉴욕 날씨", "weather in NYC", True),
+    ("what is the weather in seattle", "seattle weather", True),
+    ("뉴욕 날씨", "서울 날씨", False),
+    ("뉴욕 날씨", "뉴욕 인구", False),
+    ("seattle weather", "seattle population", False)
+)
+
+# 요청 표현에만 쓰이고 의미 구분에는 도움이 되지 않는 단어
+FILLER_WORDS = {
+    "알려줘", "알려주세요", "알려", "줘", "주세요", "어때", "어때요", "뭐야", "뭐예요", "좀", "대해", "대해서",
+    "관해", "관해서", "please", "tell", "me", "about", "what", "is", "are", "the", "in", "how", "s", "a", "an"
+}
+# 한글 단어 끝의 조사 (긴 것부터 비교)
+KOREAN_PARTICLES = ("에서", "에게", "으로", "에", "의", "은", "는", "이", "가", "을", "를", "로", "도")
+HANGUL_WORD = re.compile(r"^[가-힣]+$")
+# 값이 다르면 다른 질문인 토큰 - 숫자(연도, 버전 등)와 대문자로 시작하는 고유명사
+NUMBER_TOKEN = re.compile(r"\d+(?:[.,]\d+)*")
+ENTITY_TOKEN = re.compile(r"\b[A-Z][\w.-]*")
+
+# 하위 에이전트 분류별 기본 TTL(초) - 날씨는 짧게, 백과사전식 검색은 길게
+CATEGORY_TTLS = {
+    "weather": float(os.getenv("SEMANTIC_CACHE_TTL_WEATHER", "1800")),
+    "search": float(os.getenv("SEMANTIC_CACHE_TTL_SEARCH", str(7 * 24 * 3600))),
+    "conversation": float(os.getenv("SEMANTIC_CACHE_TTL_CONVERSATION", str(24 * 3600)))
+}
+AGENT_CATEGORIES = {
+    "weather_agent": "weather",
+    "search_agent": "search",
+    "conversation_agent": "conversation"
+}
+
+
+def _features(text: str) -> List[tuple]:
+    """단어와 문자 n-gram 특징 (가중치 포함)"""
+    words = re.sub(r"[^\w\s]", " ", normalize_key(text)).split()
+    content_words = [word for word in words if word not in FILLER_WORDS] or words
+
+    features = []
+    for word in content_words:
+        if HANGUL_WORD.match(word) and len(word) > 2:
+            for particle in KOREAN_PARTICLES:
+                if word.endswith(particle):
+                    word = word[:-len(particle)]
+                    break
+        features.append(("w:" + word, 1.0))
+        padded = f" {word} "
+        for n in (2, 3):
+            for i in range(len(padded) - n + 1):
+                features.append((f"{n}:" + padded[i:i + n], 0.5))
+    return features
+
+
+def key_tokens(text: str) -> tuple:
+    """숫자 토큰 집합과 고유명사(소문자) 집합"""
+    text = unicodedata.normalize("NFKC", str(text))
+    numbers = frozenset(number.replace(",", "") for number in NUMBER_TOKEN.findall(text))
+    entities = frozenset(
+        entity for entity in (match.lower().rstrip(".-") for match in ENTITY_TOKEN.findall(text))
+        if entity and entity not in FILLER_WORDS
+    )
+    return numbers, entities
+
+
+def same_key_tokens(query: str, other: str) -> bool:
+    """
+    임베딩이 비슷해도 숫자나 고유명사가 다르면 다른 질문으로 판단
+    ("2020년 도쿄 인구"와 "2010년 도쿄 인구", "Python 3.11"과 "Python 3.12" 구분).
+    고유명사는 대소문자만 다른 경우("Seattle" / "seattle")를 같은 것으로 보며, 한쪽에만 대문자 고유명사가 있으면
+    ("뉴욕 날씨" / "weather in NYC") 글자로 비교할 수 없으므로 임베딩 유사도로 판단합니다.
+    """
+    numbers, entities = key_tokens(query)
+    other_numbers, other_entities = key_tokens(other)
+    if numbers != other_numbers:
+        return False
+    if not entities or not other_entities:
+        return True
+    words = set(re.sub(r"[^\w\s.-]", " ", normalize_key(query)).split())
+    other_words = set(re.sub(r"[^\w\s.-]", " ", normalize_key(other)).split())
+    return entities <= other_words and other_entities <= words
+
+
+def embed_text(text: str, dim: int = 1024) -> np.ndarray:
+    """
+    로컬 해시 임베딩 - 단어/문자 n-gram을 부호 있는 해시 버킷에 더한 L2 정규화 벡터
+    외부 모델 호출 없이 띄어쓰기, 대소문자, 구두점, 어순, 조사, 요청 표현 차이를 흡수합니다.
+
+    Args:
+        text: 임베딩할 텍스트
+        dim: 벡터 차원
+
+    Returns:
+        float32 단위 벡터
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in _features(text):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[digest % dim] += weight if (digest >> 63) & 1 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class Embedder:
+    """
+    요청 임베딩 - 로컬 다국어 문장 임베딩 모델(sentence-transformers)의 단위 벡터
+    패키지가 없거나 모델을 불러오지 못하면 해시 임베딩(embed_text)으로 대체합니다.
+    """
+
+    def __init__(self, model_name: str = None, dim: int = None):
+        self.model_name = model_name if model_name is not None else os.getenv("SEMANTIC_CACHE_MODEL", DEFAULT_EMBEDDING_MODEL)
+        self.model = self._load_model()
+        if self.model is not None:
+            self.kind = "model"
+            self.dim = self.model.get_sentence_embedding_dimension()
+            self.name = self.model_name
+        else:
+            self.kind = "hash"
+            self.dim = dim or int(os.getenv("SEMANTIC_CACHE_DIM", "1024"))
+            self.name = f"hash-{self.dim}"
+
+    def _load_model(self):
+        if SentenceTransformer is None or not self.model_name:
+            return None
+        try:
+            return SentenceTransformer(self.model_name, device="cpu")
+        except Exception as e:
+            print(f"⚠️ 임베딩 모델을 불러오지 못해 해시 임베딩을 사용합니다: {e}")
+            return None
+
+    def __call__(self, text: str) -> np.ndarray:
+        if self.model is None:
+            return embed_text(text, self.dim)
+        text = " ".join(unicodedata.normalize("NFKC", str(text)).split())
+        return np.asarray(self.model.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+
+_embedder: Optional[Embedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """프로세스 전역 Embedder (모델은 처음 사용할 때 한 번만 불러옴)"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = Embedder()
+        return _embedder
+
+
+def calibrate(embed_fn: Callable[[str], np.ndarray] = None, pairs=CALIBRATION_PAIRS) -> Dict[str, Any]:
+    """
+    예시 요청 쌍의 코사인 유사도와 권장 임계값 계산
+
+    Args:
+        embed_fn: 측정할 임베딩 함수 (기본값은 get_embedder())
+        pairs: (요청, 비교 요청, 같은 의미 여부) 목록
+
+    Returns:
+        {"embedder", "pairs": [...], "threshold"} - 같은 의미 쌍의 최솟값과 다른 의미 쌍의 최댓값 사이 중간값,
+        두 그룹이 겹치면 threshold는 None
+    """
+    embed_fn = embed_fn or get_embedder()
+    results = []
+    for query, other, same in pairs:
+        similarity = float(embed_fn(query).astype(np.float32) @ embed_fn(other).astype(np.float32))
+        results.append({"query": query, "other": other, "same": same, "similarity": round(similarity, 4)})
+    positive = min((item["similarity"] for item in results if item["same"]), default=1.0)
+    negative = max((item["similarity"] for item in results if not item["same"]), default=0.0)
+    return {
+        "embedder": getattr(embed_fn, "name", "custom"),
+        "pairs": results,
+        "threshold": round((positive + negative) / 2, 4) if positive > negative else None
+    }
+
+
+def categorize_result(result: Dict[str, Any]) -> Optional[str]:
+    """
+    결과에 사용된 하위 에이전트로 캐시 분류 결정 (여러 개면 TTL이 가장 짧은 분류)
+
+    Returns:
+        "weather" / "search" / "conversation", 판단할 수 없으면 None
+    """
+    agents = set()
+    for step in (result.get("route") or {}).get("steps", []):
+        agents.add(step.get("agent"))
+    for item in result.get("sub_agent_results", []):
+        agents.add(item.get("agent"))
+    if not agents:
+        # classic 모드 - 실행 계획 텍스트에서 하위 에이전트 이름 확인
+        plan_text = result.get("execution_plan", "")
+        agents = {agent for agent in AGENT_CATEGORIES if agent in plan_text}
+
+    categories = [AGENT_CATEGORIES[agent] for agent in agents if agent in AGENT_CATEGORIES]
+    if not categories:
+        return None
+    return min(categories, key=lambda category: CATEGORY_TTLS[category])
+
+
+class SemanticCache:
+    """
+    의미 기반 응답 캐시
+    요청을 로컬 임베딩 모델(없으면 해시 임베딩)로 변환하여 faiss 내적 인덱스(단위 벡터이므로 코사인 유사도)에서 가장 가까운 항목을 찾고,
+    유사도가 임계값 이상이고 같은 범위(scope, 사용자/세션)이며 숫자/고유명사 토큰이 같고
+    만료되지 않았으면 캐시된 결과를 반환합니다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = None,
+        max_entries: int = None,
+        dim: int = None,
+        path: str = None,
+        embed_fn: Callable[[str], np.ndarray] = None
+    ):
+        # 임베딩 함수를 지정하지 않으면 프로세스 전역 Embedder (차원과 기본 임계값은 임베딩 종류를 따름)
+        self.embed_fn = embed_fn or get_embedder()
+        self.dim = getattr(self.embed_fn, "dim", None) or dim or int(os.getenv("SEMANTIC_CACHE_DIM", "1024"))
+        self.embedder = getattr(self.embed_fn, "name", "custom")
+        default_threshold = DEFAULT_THRESHOLDS.get(getattr(self.embed_fn, "kind", "hash"), DEFAULT_THRESHOLDS["hash"])
+        self.threshold = threshold or float(os.getenv("SEMANTIC_CACHE_THRESHOLD", str(default_threshold)))
+        self.max_entries = max_entries or int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._next_id = 0
+        self._index = self._new_index()
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.path:
+            self.load()
+
+    def _new_index(self):
+        if faiss is None:
+            return None
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+
+    def _search(self, vector: np.ndarray, k: int) -> List[tuple]:
+        """가장 가까운 k개 (유사도, id)"""
+        if not self._entries:
+            return []
+        k = min(k, len(self._entries))
+        if self._index is not None:
+            scores, ids = self._index.search(vector.reshape(1, -1), k)
+            return [(float(score), int(entry_id)) for score, entry_id in zip(scores[0], ids[0]) if entry_id != -1]
+
+        ids = list(self._vectors)
+        scores = np.stack([self._vectors[entry_id] for entry_id in ids]) @ vector
+        order = np.argsort(-scores)[:k]
+        return [(float(scores[i]), ids[i]) for i in order]
+
+    def _remove(self, entry_ids: List[int]):
+        if not entry_ids:
+            return
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+            self._vectors.pop(entry_id, None)
+        if self._index is not None:
+            self._index.remove_ids(np.array(entry_ids, dtype=np.int64))
+        self._dirty = True
+
+    def lookup(self, query: str, scope: str = None) -> Optional[Dict[str, Any]]:
+        """
+        의미가 가장 가까운 캐시 항목 조회
+
+        Args:
+            query: 사용자 입력
+            scope: 캐시 범위 (사용자/세션 ID) - 같은 범위에 저장된 항목만 반환
+
+        Returns:
+            {"result", "similarity", "matched_query", "category"} 또는 None
+        """
+        vector = self.embed_fn(query).astype(np.float32)
+        now = time.time()
+        with self._lock:
+            expired = []
+            found = None
+            for similarity, entry_id in self._search(vector, 16):
+                if similarity < self.threshold:
+                    break
+                entry = self._entries[entry_id]
+                if entry["expires_at"] <= now:
+                    expired.append(entry_id)
+                    continue
+                if entry.get("scope") != scope or not same_key_tokens(query, entry["query"]):
+                    continue
+                entry["last_access"] = now
+                entry["hits"] += 1
+                found = {
+                    "result": entry["result"],
+                    "similarity": round(similarity, 4),
+                    "matched_query": entry["query"],
+                    "category": entry["category"]
+                }
+                break
+
+            self._remove(expired)
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        record_cache("semantic", found is not None)
+        return found
+
+    def store(self, query: str, result: Dict[str, Any], category: str = None, scope: str = None) -> bool:
+        """
+        결과 저장 (성공한 최종 답변만, 분류별 TTL 적용)
+
+        Args:
+            query: 사용자 입력
+            result: 최종 결과
+            category: 캐시 분류 (없으면 결과에 사용된 하위 에이전트로 결정)
+            scope: 캐시 범위 (사용자/세션 ID)
+
+        Returns:
+            저장 여부
+        """
+        if not result.get("success") or result.get("needs_clarification") or result.get("agent") == "fallback":
+            return False
+        category = category or categorize_result(result)
+        if category is None:
+            return False
+
+        vector = self.embed_fn(query).astype(np.float32)
+        now = time.time()
+        cached_result = {key: value for key, value in result.items() if key not in ("timings", "cache")}
+        with self._lock:
+            # 같은 범위에 거의 같은 요청이 이미 있으면 교체
+            self._remove([
+                entry_id for similarity, entry_id in self._search(vector, 4)
+                if similarity >= 0.999 and self._entries[entry_id].get("scope") == scope
+                and same_key_tokens(query, self._entries[entry_id]["query"])
+            ])
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "query": query,
+                "scope": scope,
+                "result": cached_result,
+                "category": category,
+                "created_at": now,
+                "expires_at": now + CATEGORY_TTLS[category],
+                "last_access": now,
+                "hits": 0
+            }
+            self._vectors[entry_id] = vector
+            if self._index is not None:
+                self._index.add_with_ids(vector.reshape(1, -1), np.array([entry_id], dtype=np.int64))
+            self._dirty = True
+            self._evict(now)
+        return True
+
+    def _evict(self, now: float):
+        """만료 항목 제거 후, 최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거"""
+        if len(self._entries) <= self.max_entries:
+            return
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry["expires_at"] <= now]
+        self._remove(expired)
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda entry_id: self._entries[entry_id]["last_access"])[:overflow]
+            self._remove(oldest)
+            self.evictions += len(oldest)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._index = self._new_index()
+            self._dirty = True
+
+    def save(self, path: str = None):
+        """인덱스 저장 - 벡터(.npy)와 항목 정보(.json), 만료 항목은 제외"""
+        path = path or self.path
+        if not path:
+            return
+        now = time.time()
+        with self._lock:
+            if not self._dirty and path == self.path:
+                return
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry["expires_at"] > now]
+            entries = [self._entries[entry_id] for entry_id in ids]
+            vectors = (
+                np.stack([self._vectors[entry_id] for entry_id in ids])
+                if ids else np.zeros((0, self.dim), dtype=np.float32)
+            )
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(path + ".npy", vectors)
+        with open(path + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "embedder": self.embedder, "entries": entries}, f, ensure_ascii=False, default=str)
+        os.replace(path + ".json.tmp", path + ".json")
+
+    def load(self, path: str = None):
+        """저장된 인덱스 불러오기 (임베딩 종류나 차원이 다르거나 파일이 손상되면 무시)"""
+        path = path or self.path
+        try:
+            with open(path + ".json", encoding="utf-8") as f:
+                data = json.load(f)
+            vectors = np.load(path + ".npy")
+        except (OSError, ValueError):
+            return
+        if (
+            data.get("dim") != self.dim or data.get("embedder") != self.embedder
+            or len(vectors) != len(data.get("entries", []))
+        ):
+            return
+
+        now = time.time()
+        with self._lock:
+            for entry, vector in zip(data["entries"], vectors):
+                if entry["expires_at"] <= now:
+                    continue
+                entry_id = self._next_id
+                self._next_id += 1
+                self._entries[entry_id] = entry
+                self._vectors[entry_id] = vector.astype(np.float32)
+                if self._index is not None:
+                    self._index.add_with_ids(vector.reshape(1, -1).astype(np.float32), np.array([entry_id], dtype=np.int64))
+            self._evict(now)
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "faiss" if self._index is not None else "numpy",
+                "embedder": self.embedder,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+def semantic_cache_enabled() -> bool:
+    """SEMANTIC_CACHE_ENABLED=true/false, 기본값 auto는 로컬 임베딩 모델을 불러올 수 있을 때만 사용"""
+    value = os.getenv("SEMANTIC_CACHE_ENABLED", "auto").lower()
+    if value == "auto":
+        return get_embedder().kind == "model"
+    return value == "true"
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """프로세스 전역 SemanticCache 반환 (종료 시 SEMANTIC_CACHE_PATH에 저장)"""
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            path = os.getenv("SEMANTIC_CACHE_PATH", DEFAULT_SEMANTIC_CACHE_PATH) or None
+            _semantic_cache = SemanticCache(path=path)
+            atexit.register(_semantic_cache.save)
+        return _semantic_cache
+
+
+if __name__ == "__main__":
+    # 현재 임베딩으로 예시 요청 쌍의 유사도와 권장 임계값 출력
+    print(json.dumps(calibrate(), ensure_ascii=False, indent=2))
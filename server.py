@@ -0,0 +1,287 @@
+"""HTTP Server - 오케스트레이터를 HTTP API로 제공 (동시 요청 처리)"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from orchestrator_agent import OrchestratorAgent
+from model_config import get_shared_model
+from tracing import metrics
+
+
+class ServerBusy(Exception):
+    """대기열이 가득 차 요청을 받을 수 없음"""
+
+
+class Session:
+    """세션별 오케스트레이터와 명확화 대기 중인 요청"""
+
+    def __init__(self, session_id: str, orchestrator: OrchestratorAgent):
+        self.session_id = session_id
+        self.orchestrator = orchestrator
+        self.pending_input = None
+        self.last_used = time.time()
+
+
+class AgentService:
+    """
+    세션별 오케스트레이터를 유지하며 요청을 동시에 처리하는 서비스
+    모든 요청은 하나의 전용 이벤트 루프에서 비동기로 실행되며, 동시 실행 수와 대기열 길이가 제한됩니다.
+    """
+
+    def __init__(
+        self,
+        model_id: str = None,
+        concurrency: int = None,
+        max_queue: int = None,
+        max_sessions: int = None
+    ):
+        self.model = get_shared_model(model_id)
+        self.concurrency = concurrency or int(os.getenv("SERVER_CONCURRENCY", "8"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("SERVER_MAX_QUEUE", "64"))
+        self.max_sessions = max_sessions or int(os.getenv("SERVER_MAX_SESSIONS", "1000"))
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="agent-service-loop", daemon=True)
+        self._thread.start()
+
+    def _get_session(self, session_id: str = None, user_id: str = None) -> Session:
+        """세션 조회 또는 생성 (최대 세션 수를 넘으면 가장 오래 사용하지 않은 세션부터 제거)"""
+        with self._lock:
+            if session_id and session_id in self._sessions:
+                session = self._sessions[session_id]
+                self._sessions.move_to_end(session_id)
+                session.last_used = time.time()
+                return session
+
+        # 오케스트레이터 생성은 잠금 밖에서 수행
+        session_id = session_id or uuid.uuid4().hex
+        created = Session(session_id, OrchestratorAgent(self.model, user_id or session_id))
+        with self._lock:
+            # 같은 세션 ID로 동시에 들어온 요청이 먼저 등록했으면 그 세션을 사용 (대화 기록이 갈라지지 않도록)
+            session = self._sessions.setdefault(session_id, created)
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.time()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def handle_query(
+        self, user_input: str, session_id: str = None, user_id: str = None, deadline: float = None
+    ) -> Dict[str, Any]:
+        """
+        요청 처리 (호출 스레드는 결과가 나올 때까지 대기)
+
+        Args:
+            user_input: 사용자 입력
+            session_id: 세션 ID (없으면 새 세션 생성)
+            user_id: 사용자 ID (새 세션 생성 시 사용)
+            deadline: 요청 처리 기한(초) - 없으면 REQUEST_DEADLINE
+
+        Returns:
+            process_input과 같은 결과 dict + session_id
+        """
+        with self._lock:
+            # 실행 중 + 대기 중 요청이 동시 처리 수 + 대기열 길이를 넘으면 거절
+            if self.queued + self.in_flight >= self.concurrency + self.max_queue:
+                self.rejected += 1
+                raise ServerBusy(f"대기 중인 요청이 너무 많습니다 (최대 {self.max_queue}개)")
+            self.queued += 1
+
+        try:
+            session = self._get_session(session_id, user_id)
+        except Exception:
+            with self._lock:
+                self.queued -= 1
+            raise
+
+        future = asyncio.run_coroutine_threadsafe(self._process(session, user_input, deadline), self._loop)
+        return future.result()
+
+    def handle_clarify(self, session_id: str, follow_up: str) -> Dict[str, Any]:
+        """명확화 질문에 대한 추가 입력을 원래 요청과 결합하여 다시 처리"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"세션을 찾을 수 없습니다: {session_id}")
+        if session.pending_input is None:
+            raise ValueError("명확화를 기다리는 요청이 없습니다.")
+
+        combined_input = f"{session.pending_input} - {follow_up}"
+        return self.handle_query(combined_input, session_id)
+
+    async def _process(self, session: Session, user_input: str, deadline: float = None) -> Dict[str, Any]:
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+        try:
+            result = await session.orchestrator.process_user_input_async(user_input, deadline)
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": f"처리 중 오류가 발생했습니다: {str(e)}",
+                "user_input": user_input
+            }
+        finally:
+            self._semaphore.release()
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+        session.pending_input = user_input if result.get("needs_clarification") else None
+        return {**result, "session_id": session.session_id}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "sessions": len(self._sessions)
+            }
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /v1/query    {"input": "...", "session_id": "...", "user_id": "...", "deadline": 30}
+    POST /v1/clarify  {"session_id": "...", "follow_up": "..."}
+    GET  /healthz
+    GET  /metrics     (Prometheus 텍스트 형식)
+    """
+
+    server_version = "StrandsAgents/1.0"
+
+    @property
+    def service(self) -> AgentService:
+        return self.server.service
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None):
+        payload = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_text(self, status: int, text: str, content_type: str):
+        payload = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", "0"))
+        body = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        if not isinstance(body, dict):
+            raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+        return body
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send_json(200, {"status": "ok", **self.service.stats()})
+        elif self.path == "/metrics":
+            self._send_text(200, metrics.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {"error": f"잘못된 요청입니다: {str(e)}"})
+            return
+
+        try:
+            if self.path == "/v1/query":
+                user_input = str(body.get("input", "")).strip()
+                if not user_input:
+                    self._send_json(400, {"error": "input 필드가 필요합니다."})
+                    return
+                try:
+                    deadline = float(body["deadline"]) if body.get("deadline") is not None else None
+                except (TypeError, ValueError):
+                    self._send_json(400, {"error": "deadline 필드는 초 단위 숫자여야 합니다."})
+                    return
+                result = self.service.handle_query(
+                    user_input, body.get("session_id"), body.get("user_id"), deadline
+                )
+            elif self.path == "/v1/clarify":
+                session_id = body.get("session_id")
+                follow_up = str(body.get("follow_up", "")).strip()
+                if not session_id or not follow_up:
+                    self._send_json(400, {"error": "session_id와 follow_up 필드가 필요합니다."})
+                    return
+                result = self.service.handle_clarify(session_id, follow_up)
+            else:
+                self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+                return
+        except ServerBusy as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+            return
+        except KeyError as e:
+            self._send_json(404, {"error": str(e.args[0])})
+            return
+        except ValueError as e:
+            self._send_json(409, {"error": str(e)})
+            return
+
+        self._send_json(200, result)
+
+
+def run_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    model_id: str = None,
+    concurrency: int = None,
+    max_queue: int = None
+):
+    """HTTP 서버 실행 (Ctrl+C로 종료)"""
+    service = AgentService(model_id, concurrency, max_queue)
+    httpd = ThreadingHTTPServer((host, port), AgentRequestHandler)
+    httpd.daemon_threads = True
+    httpd.service = service
+
+    print("=" * 60)
+    print(f"🌐 Agents as Tools HTTP 서버: http://{host}:{port}")
+    print(f"동시 처리: {service.concurrency}, 대기열: {service.max_queue}")
+    print("POST /v1/query, POST /v1/clarify, GET /healthz, GET /metrics")
+    print("=" * 60)
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 서버를 종료합니다.")
+    finally:
+        httpd.server_close()
+        service.close()
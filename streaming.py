@@ -0,0 +1,142 @@
+"""Streaming Utils - 토큰 스트리밍, <thinking> 블록 증분 필터, 동기/비동기 브리지"""
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class ThinkingFilter:
+    """
+    스트리밍 텍스트에서 <thinking>...</thinking> 블록을 증분 방식으로 제거
+    태그가 청크 경계에 걸쳐 나뉘어 도착해도 처리할 수 있도록 태그의 일부일 수 있는 꼬리는 보류합니다.
+    """
+
+    OPEN_TAG = "<thinking>"
+    CLOSE_TAG = "</thinking>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        """text 끝부분이 tag의 앞부분과 겹치는 길이"""
+        for length in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:length]):
+                return length
+        return 0
+
+    def feed(self, chunk: str) -> str:
+        """청크를 입력받아 지금 내보낼 수 있는 텍스트 반환"""
+        self._buffer += chunk
+        output = []
+
+        while self._buffer:
+            if self._inside:
+                end = self._buffer.find(self.CLOSE_TAG)
+                if end == -1:
+                    # 닫는 태그의 일부일 수 있는 꼬리만 남기고 버림
+                    keep = self._partial_tag_length(self._buffer, self.CLOSE_TAG)
+                    self._buffer = self._buffer[len(self._buffer) - keep:] if keep else ""
+                    break
+                self._buffer = self._buffer[end + len(self.CLOSE_TAG):]
+                self._inside = False
+            else:
+                start = self._buffer.find(self.OPEN_TAG)
+                if start == -1:
+                    keep = self._partial_tag_length(self._buffer, self.OPEN_TAG)
+                    split = len(self._buffer) - keep
+                    output.append(self._buffer[:split])
+                    self._buffer = self._buffer[split:]
+                    break
+                output.append(self._buffer[:start])
+                self._buffer = self._buffer[start + len(self.OPEN_TAG):]
+                self._inside = True
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        """스트림 종료 시 보류 중인 텍스트 반환 (닫히지 않은 thinking 블록은 버림)"""
+        remaining = "" if self._inside else self._buffer
+        self._buffer = ""
+        self._inside = False
+        return remaining
+
+
+_DONE = object()
+
+
+class _StreamError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def iterate_async(factory: Callable[[], AsyncIterator[Any]]) -> Iterator[Any]:
+    """
+    비동기 이터레이터를 전용 스레드의 이벤트 루프에서 실행하고 동기 이터레이터로 변환
+
+    Args:
+        factory: 비동기 이터레이터를 만드는 함수 (예: lambda: agent.stream_async(prompt))
+
+    Yields:
+        비동기 이터레이터가 내보내는 항목
+    """
+    items: "queue.Queue[Any]" = queue.Queue()
+    stop = threading.Event()
+
+    async def _consume():
+        iterator = factory()
+        try:
+            async for item in iterator:
+                if stop.is_set():
+                    break
+                items.put(item)
+        finally:
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+    def _run():
+        try:
+            asyncio.run(_consume())
+            items.put(_DONE)
+        except BaseException as e:
+            items.put(_StreamError(e))
+
+    thread = threading.Thread(target=_run, name="stream-consumer", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StreamError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+def run_sync(factory: Callable[[], Awaitable[T]]) -> T:
+    """
+    코루틴을 동기적으로 실행
+    호출 스레드에 실행 중인 이벤트 루프가 있으면 별도 스레드의 새 루프에서 실행합니다.
+
+    Args:
+        factory: 코루틴을 만드는 함수
+
+    Returns:
+        코루틴의 반환값
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(factory())
+
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, lambda: asyncio.run(factory())).result()
@@ -1,8 +1,13 @@
 """Sub Agents - Agents as Tools 패턴을 위한 하위 에이전트들"""
+import os
 from strands import Agent, tool
-from strands_tools import http_request
-from mcp_tools import get_position, wikipedia_search, duckduckgo_search
-from model_config import get_configured_model
+from mcp_tools import (
+    get_weather_forecast_async, wikipedia_search_async, duckduckgo_search_async, combined_search_async
+)
+from model_config import get_stage_model, PROMPT_CACHE_FALLBACK
+from completion_cache import stage_model
+from agent_pool import AgentPool
+from tracing import MODEL_CALL_TRACER, traced
 from typing import Dict, Any
 
 
@@ -38,25 +43,9 @@ SEARCH_AGENT_PROMPT = """
 검색 후 결과를 분석하여 사용자가 이해하기 쉽게 요약하고, 어떤 검색 도구를 사용했는지 명시하세요.
 """
 
-@tool
-def search_agent(query: str) -> str:
-    """
-    지능적 검색 도구 선택을 통한 최적화된 정보 검색 에이전트
-    
-    Args:
-        query: 검색할 내용
-        
-    Returns:
-        선택된 검색 도구를 통한 최적화된 답변
-    """
-    try:
-        agent = Agent(
-            model=get_configured_model(),
-            system_prompt=SEARCH_AGENT_PROMPT,
-            tools=[wikipedia_search, duckduckgo_search]
-        )
-        
-        search_prompt = f"""
+def build_search_prompt(query: str) -> str:
+    """search_agent 작업 프롬프트"""
+    return f"""
         사용자 검색 요청: "{query}"
         
         다음 단계를 따라 검색을 수행하세요:
@@ -83,8 +72,72 @@ def search_agent(query: str) -> str:
         
         중요: 처음부터 두 도구를 모두 사용하지 마세요. 하나씩 순차적으로 사용하세요.
         """
+
+
+# 통합 검색 모드 - 두 출처를 동시에 조회하는 combined_search 한 번으로 검색 (도구 호출 1회)
+SEARCH_AGENT_COMBINED = os.getenv("SEARCH_AGENT_COMBINED", "true").lower() == "true"
+
+COMBINED_SEARCH_AGENT_PROMPT = """
+당신은 검색 전문 에이전트입니다.
+combined_search 도구는 Wikipedia와 DuckDuckGo를 동시에 조회하여, 충분한 결과를 먼저 돌려준 출처의 결과
+또는 두 출처의 결과를 병합하여 반환합니다 (answered_by 필드에 응답 출처가 표시됩니다).
+
+검색 원칙:
+- combined_search를 한 번만 호출하세요 (다른 검색 도구를 추가로 호출하지 마세요)
+- 검색어는 영문의 구체적이고 잘 알려진 용어로 작성하세요
+- 결과를 사용자가 이해하기 쉽게 요약하고, 어떤 출처의 정보인지 명시하세요
+"""
+
+
+def build_combined_search_prompt(query: str) -> str:
+    """통합 검색 모드의 search_agent 작업 프롬프트"""
+    return f"""
+        사용자 검색 요청: "{query}"
+        
+        1. combined_search를 한 번 호출하여 검색하세요
+        2. 결과를 사용자 친화적으로 요약하세요
+           - answered_by에 따라 출처 명시 (예: "Wikipedia에 따르면...", "DuckDuckGo 검색 결과...")
+           - 두 출처의 결과가 모두 있으면 종합
+        3. 검색 결과가 없으면 그 사실을 안내하세요
+        """
+
+
+def _search_agent_setup(combined_tool, wikipedia_tool, duckduckgo_tool) -> Dict[str, Any]:
+    """검색 모드에 따른 search_agent 시스템 프롬프트와 도구"""
+    if SEARCH_AGENT_COMBINED:
+        return {"system_prompt": COMBINED_SEARCH_AGENT_PROMPT, "tools": [combined_tool]}
+    return {"system_prompt": SEARCH_AGENT_PROMPT, "tools": [wikipedia_tool, duckduckgo_tool]}
+
+
+def _search_prompt(query: str) -> str:
+    return build_combined_search_prompt(query) if SEARCH_AGENT_COMBINED else build_search_prompt(query)
+
+
+# 하위 에이전트 풀 - 비동기 도구를 사용하여 이벤트 루프를 막지 않음
+search_agent_pool = AgentPool(
+    "search_agent",
+    lambda: Agent(
+        model=stage_model(get_stage_model("search_agent"), "search_agent"),
+        **_search_agent_setup(combined_search_async, wikipedia_search_async, duckduckgo_search_async),
+        hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK]
+    )
+)
+
+@tool(name="search_agent")
+@traced("sub_agent", "search_agent")
+async def search_agent_async(query: str) -> str:
+    """
+    지능적 검색 도구 선택을 통한 최적화된 정보 검색 에이전트
+    
+    Args:
+        query: 검색할 내용
         
-        response = agent(search_prompt)
+    Returns:
+        선택된 검색 도구를 통한 최적화된 답변
+    """
+    try:
+        async with search_agent_pool.acquire_async() as agent:
+            response = await agent.invoke_async(_search_prompt(query))
         return str(response)
         
     except Exception as e:
@@ -94,13 +147,39 @@ def search_agent(query: str) -> str:
 # Weather Agent - 날씨 정보 전문
 WEATHER_AGENT_PROMPT = """
 당신은 날씨 정보 전문 에이전트입니다.
-사용자가 특정 지역의 날씨를 요청하면, 먼저 해당 지역의 좌표를 찾고
-National Weather Service API를 사용하여 날씨 정보를 제공합니다.
+사용자가 특정 지역의 날씨를 요청하면, get_weather_forecast 도구를 한 번 호출하여
+National Weather Service 예보를 받아 날씨 정보를 제공합니다.
 미국 지역만 지원됩니다.
 """
 
-@tool
-def weather_agent(location_query: str) -> str:
+def build_weather_prompt(location_query: str) -> str:
+    """weather_agent 작업 프롬프트"""
+    return f"""
+        "{location_query}" 지역의 날씨 정보를 제공해주세요.
+        
+        단계:
+        1. get_weather_forecast 도구를 지역명으로 한 번 호출하세요
+           (좌표 변환, NWS 격자 조회, 예보 조회를 도구가 모두 처리합니다)
+        2. 미국 외 지역이거나 실패한 경우 도구의 오류 메시지에 따라 안내하세요
+           (미국 외 지역이면 "미국 지역만 지원합니다")
+        
+        사용자 친화적인 날씨 보고서를 제공해주세요.
+        """
+
+
+weather_agent_pool = AgentPool(
+    "weather_agent",
+    lambda: Agent(
+        model=stage_model(get_stage_model("weather_agent"), "weather_agent"),
+        system_prompt=WEATHER_AGENT_PROMPT,
+        tools=[get_weather_forecast_async],
+        hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK]
+    )
+)
+
+@tool(name="weather_agent")
+@traced("sub_agent", "weather_agent")
+async def weather_agent_async(location_query: str) -> str:
     """
     특정 지역의 날씨 정보를 제공하는 전문 에이전트
     
@@ -111,28 +190,8 @@ def weather_agent(location_query: str) -> str:
         해당 지역의 날씨 정보
     """
     try:
-        agent = Agent(
-            model=get_configured_model(),
-            system_prompt=WEATHER_AGENT_PROMPT,
-            tools=[get_position, http_request]
-        )
-        
-        weather_prompt = f"""
-        "{location_query}" 지역의 날씨 정보를 제공해주세요.
-        
-        단계:
-        1. 먼저 지역의 정확한 좌표(위도, 경도)를 찾으세요
-        2. 좌표가 미국 지역인지 확인하세요 (위도: 24-49, 경도: -125 ~ -66)
-        3. 미국 지역이면 National Weather Service API를 사용하여 날씨 정보를 가져오세요
-           - https://api.weather.gov/points/위도,경도 호출
-           - 응답에서 forecast URL 추출
-           - forecast URL 호출하여 날씨 예보 가져오기
-        4. 미국 외 지역이면 "미국 지역만 지원합니다"라고 안내하세요
-        
-        사용자 친화적인 날씨 보고서를 제공해주세요.
-        """
-        
-        response = agent(weather_prompt)
+        async with weather_agent_pool.acquire_async() as agent:
+            response = await agent.invoke_async(build_weather_prompt(location_query))
         return str(response)
         
     except Exception as e:
@@ -146,8 +205,26 @@ CONVERSATION_AGENT_PROMPT = """
 사용자와 친근한 대화를 나누며 필요시 조언이나 정보를 제공하세요.
 """
 
-@tool
-def conversation_agent(message: str) -> str:
+def build_conversation_prompt(message: str) -> str:
+    """conversation_agent 작업 프롬프트"""
+    return f"""
+        사용자가 다음과 같이 입력하였습니다: "{message}" 
+        """
+
+
+conversation_agent_pool = AgentPool(
+    "conversation_agent",
+    lambda: Agent(
+        model=stage_model(get_stage_model("conversation_agent"), "conversation_agent"),
+        system_prompt=CONVERSATION_AGENT_PROMPT,
+        tools=[],
+        hooks=[MODEL_CALL_TRACER, PROMPT_CACHE_FALLBACK]
+    )
+)
+
+@tool(name="conversation_agent")
+@traced("sub_agent", "conversation_agent")
+async def conversation_agent_async(message: str) -> str:
     """
     일반적인 대화와 질문에 응답하는 전문 에이전트
     
@@ -158,18 +235,24 @@ def conversation_agent(message: str) -> str:
         요청에 응답의 양식이 있다면 요청응답에 따르며, 없다면 도움이 되는 답변.
     """
     try:
-        agent = Agent(
-            model=get_configured_model(),
-            system_prompt=CONVERSATION_AGENT_PROMPT,
-            tools=[]
-        )
-        
-        conversation_prompt = f"""
-        사용자가 다음과 같이 입력하였습니다: "{message}" 
-        """
-        
-        response = agent(conversation_prompt)
+        async with conversation_agent_pool.acquire_async() as agent:
+            response = await agent.invoke_async(build_conversation_prompt(message))
         return str(response)
         
     except Exception as e:
         return f"대화 처리 중 오류가 발생했습니다: {str(e)}"
+
+
+SUB_AGENT_POOLS = [search_agent_pool, weather_agent_pool, conversation_agent_pool]
+
+# 이름으로 하위 에이전트 도구를 직접 호출하기 위한 매핑
+SUB_AGENTS_ASYNC = {
+    "search_agent": search_agent_async,
+    "weather_agent": weather_agent_async,
+    "conversation_agent": conversation_agent_async
+}
+
+
+def get_sub_agent_pool_stats() -> Dict[str, Any]:
+    """하위 에이전트 풀 사용 현황"""
+    return {pool.name: pool.stats() for pool in SUB_AGENT_POOLS}
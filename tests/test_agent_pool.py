@@ -0,0 +1,129 @@
+"""AgentPool - 대기/반환/폐기 시 대기자 깨우기"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agent_pool import AgentPool
+
+
+def make_agent():
+    return SimpleNamespace(messages=[], conversation_manager=SimpleNamespace())
+
+
+def test_reuses_idle_agent():
+    pool = AgentPool("test", make_agent, max_size=2)
+    with pool.acquire() as first:
+        first.messages.append("hello")
+    with pool.acquire() as second:
+        assert second is first
+        assert second.messages == []
+    assert pool.stats()["created"] == 1
+
+
+def test_sync_waiter_gets_released_agent():
+    pool = AgentPool("test", make_agent, max_size=1)
+    acquired = []
+
+    def waiter():
+        with pool.acquire() as agent:
+            acquired.append(agent)
+
+    with pool.acquire() as agent:
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        assert acquired == []
+    thread.join(1)
+    assert acquired == [agent]
+    assert pool.stats()["waits"] == 1
+
+
+def test_sync_waiter_wakes_when_reset_fails():
+    pool = AgentPool("test", make_agent, max_size=1)
+    acquired = []
+
+    def waiter():
+        with pool.acquire() as agent:
+            acquired.append(agent)
+
+    with pool.acquire() as agent:
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        # 초기화에 실패하도록 만들어 인스턴스를 폐기시킴
+        agent.messages = None
+    thread.join(1)
+    assert not thread.is_alive()
+    assert len(acquired) == 1 and acquired[0] is not agent
+    assert pool.stats()["created"] == 1
+
+
+def test_async_waiters_are_served_in_order():
+    pool = AgentPool("test", make_agent, max_size=1)
+    order = []
+
+    async def worker(index):
+        async with pool.acquire_async():
+            order.append(index)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(worker(index) for index in range(5)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+    stats = pool.stats()
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_async_waiter_wakes_when_reset_fails():
+    pool = AgentPool("test", make_agent, max_size=1)
+
+    async def main():
+        async with pool.acquire_async() as agent:
+            waiter = asyncio.create_task(pool._take_async())
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+            agent.messages = None
+        return agent, await asyncio.wait_for(waiter, 1)
+
+    discarded, replacement = asyncio.run(main())
+    assert replacement is not discarded
+
+
+def test_cancelled_async_waiter_passes_wakeup_on():
+    pool = AgentPool("test", make_agent, max_size=1)
+
+    async def main():
+        async with pool.acquire_async():
+            cancelled = asyncio.create_task(pool._take_async())
+            waiting = asyncio.create_task(pool._take_async())
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await asyncio.wait_for(waiting, 1)
+
+    assert asyncio.run(main()) is not None
+    assert pool.stats()["in_use"] == 1
+
+
+def test_factory_failure_frees_capacity():
+    calls = []
+
+    def flaky_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return make_agent()
+
+    pool = AgentPool("test", flaky_factory, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.acquire():
+            pass
+    with pool.acquire() as agent:
+        assert agent is not None
+    assert pool.stats()["created"] == 1
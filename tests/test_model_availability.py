@@ -0,0 +1,50 @@
+"""Model Availability - 가용성 상태 갱신과 오래된 상태의 재확인"""
+import time
+
+import pytest
+
+from orchestrator_agent import ModelAvailability
+
+
+class AccessDenied(Exception):
+    response = {"Error": {"Code": "AccessDeniedException"}}
+
+
+@pytest.fixture
+def availability(monkeypatch):
+    item = ModelAvailability(model=None, refresh_interval=60)
+    item.probes = 0
+
+    def probe():
+        item.probes += 1
+
+    monkeypatch.setattr(item, "check_in_background", probe)
+    return item
+
+
+def test_unknown_status_is_available_without_probe(availability):
+    assert availability.is_available()
+    assert availability.probes == 0
+
+
+def test_only_config_errors_mark_unavailable(availability):
+    availability.record_failure(TimeoutError("read timed out"))
+    assert availability.status == ModelAvailability.UNKNOWN
+    availability.record_failure(AccessDenied("denied"))
+    assert not availability.is_available()
+    availability.record_success()
+    assert availability.is_available()
+
+
+@pytest.mark.parametrize("record", ["success", "failure"])
+def test_stale_status_is_refreshed_regardless_of_status(availability, record):
+    if record == "success":
+        availability.record_success()
+    else:
+        availability.record_failure(AccessDenied("denied"))
+    availability.is_available()
+    assert availability.probes == 0
+
+    availability.last_checked = time.time() - 61
+    availability.is_available()
+    assert availability.probes == 1
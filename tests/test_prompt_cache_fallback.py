@@ -0,0 +1,76 @@
+"""Prompt Cache Fallback - 캐시 지점 거부 오류 판별과 단계 모델별 캐시 끄기"""
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+import model_config
+import rate_limit
+from completion_cache import stage_model
+from model_config import PROMPT_CACHE_FALLBACK, get_shared_model, is_prompt_cache_error
+
+
+def validation_error(message: str) -> ClientError:
+    return ClientError({"Error": {"Code": "ValidationException", "Message": message}}, "ConverseStream")
+
+
+@pytest.fixture(autouse=True)
+def fresh_models(monkeypatch):
+    monkeypatch.setenv("AWS_REGION", "us-west-2")
+    monkeypatch.setenv("PROMPT_CACHE_ENABLED", "true")
+    monkeypatch.setenv("COMPLETION_CACHE_STAGES", "")
+    monkeypatch.setattr(rate_limit, "_limited_models", {})
+    model_config.set_model_factory(None)
+    yield
+    model_config.set_model_factory(None)
+
+
+def test_only_bedrock_cache_rejections_match():
+    assert is_prompt_cache_error(validation_error(
+        "You invoked an unsupported model or your request did not allow prompt caching."
+    ))
+    assert not is_prompt_cache_error(validation_error("Input is too long for requested model."))
+    assert not is_prompt_cache_error(Exception("prompt caching is not supported"))
+
+    try:
+        try:
+            raise validation_error("Malformed input request: extraneous key [cachePoint] is not permitted")
+        except ClientError as e:
+            raise RuntimeError("model call failed") from e
+    except RuntimeError as wrapped:
+        assert is_prompt_cache_error(wrapped)
+
+
+def test_fallback_disables_cache_only_for_failing_stage():
+    shared = get_shared_model("claude_haiku")
+    planning = stage_model(shared, "planning")
+    final = stage_model(shared, "final")
+    event = SimpleNamespace(
+        agent=SimpleNamespace(model=planning),
+        exception=validation_error("Your request did not allow prompt caching."),
+        retry=False
+    )
+
+    PROMPT_CACHE_FALLBACK._disable_on_cache_error(event)
+
+    assert event.retry
+    assert not planning.get_config().get("cache_config")
+    # 같은 공유 모델을 쓰는 다른 단계와 공유 모델 자체는 그대로
+    assert final.get_config().get("cache_config")
+    assert shared.get_config().get("cache_config")
+    # 이후 같은 단계 모델을 다시 요청해도 캐시를 끈 래퍼를 사용
+    assert stage_model(shared, "planning") is planning
+
+
+def test_other_errors_are_not_retried():
+    planning = stage_model(get_shared_model("claude_haiku"), "planning")
+    event = SimpleNamespace(
+        agent=SimpleNamespace(model=planning),
+        exception=validation_error("The provided request is not valid: cache size exceeded"),
+        retry=False
+    )
+
+    PROMPT_CACHE_FALLBACK._disable_on_cache_error(event)
+
+    assert not event.retry
+    assert planning.get_config().get("cache_config")
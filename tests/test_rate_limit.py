@@ -0,0 +1,129 @@
+"""Rate Limit - UpstreamLimiter 대기열 순서, 토큰 버킷, 취소 처리"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rate_limit import SlotQueue, UpstreamLimiter
+
+
+def test_in_flight_limit_serves_waiters_in_order():
+    limiter = UpstreamLimiter("test", rate=0, burst=1, max_in_flight=2)
+    running = []
+    peak = []
+    order = []
+
+    async def worker(index):
+        async with limiter.limit():
+            order.append(index)
+            running.append(index)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(index)
+
+    async def main():
+        await asyncio.gather(*(worker(index) for index in range(6)))
+
+    asyncio.run(main())
+    assert order == list(range(6))
+    assert max(peak) == 2
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert stats["acquired"] == 6 and stats["max_queue_depth"] == 4
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    limiter = UpstreamLimiter("test", rate=20, burst=2, max_in_flight=0)
+    started = []
+
+    async def main():
+        begin = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+            started.append(time.monotonic() - begin)
+            limiter.release()
+
+    asyncio.run(main())
+    # 버스트 2개는 바로, 이후는 1/20초 간격
+    assert started[1] < 0.02
+    assert started[2] == pytest.approx(0.05, abs=0.03)
+    assert started[3] == pytest.approx(0.10, abs=0.03)
+
+
+def test_cancelled_waiter_leaves_queue_and_slot_goes_to_next():
+    limiter = UpstreamLimiter("test", rate=0, burst=1, max_in_flight=1)
+
+    async def main():
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queue_depth"] == 2
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        limiter.release()
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+def test_cancelled_token_wait_refunds_token():
+    limiter = UpstreamLimiter("test", rate=5, burst=1, max_in_flight=0)
+
+    async def main():
+        await limiter.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(), 0.05)
+        begin = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - begin
+
+    # 취소된 예약이 토큰을 돌려주지 않으면 0.35초 이상 기다림
+    assert asyncio.run(main()) < 0.25
+
+
+def test_slot_is_handed_over_across_event_loops():
+    limiter = UpstreamLimiter("test", rate=0, burst=1, max_in_flight=1)
+    acquired = threading.Event()
+
+    def other_loop():
+        async def take():
+            await limiter.acquire()
+            acquired.set()
+            limiter.release()
+        asyncio.run(take())
+
+    async def main():
+        await limiter.acquire()
+        thread = threading.Thread(target=other_loop)
+        thread.start()
+        await asyncio.sleep(0.05)
+        assert not acquired.is_set()
+        limiter.release()
+        await asyncio.to_thread(thread.join, 1)
+
+    asyncio.run(main())
+    assert acquired.is_set()
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_slot_queue_is_fifo_lock():
+    slot = SlotQueue(1)
+    order = []
+
+    async def worker(index):
+        async with slot.hold():
+            order.append(index)
+            await asyncio.sleep(0.005)
+
+    async def main():
+        await asyncio.gather(*(worker(index) for index in range(5)))
+
+    asyncio.run(main())
+    assert order == list(range(5))
+    assert slot.in_use == 0 and slot.waiting == 0
@@ -0,0 +1,120 @@
+"""Resilience - 서킷 브레이커 상태 전이와 call_upstream 재시도/기한 처리"""
+import asyncio
+
+import httpx
+import pytest
+
+import resilience
+from resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, UpstreamError, call_upstream, deadline_scope
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_upstreams(monkeypatch):
+    # 테스트마다 새 서킷, 호출 제한 없음, 재시도 대기 없음
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "backoff_delay", lambda attempt: 0.0)
+    monkeypatch.setenv("UPSTREAM_RATE_LIMIT_ENABLED", "false")
+
+
+def mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.to_dict()["rejected"] == 1
+
+
+def test_breaker_half_open_allows_single_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_and_cancelled_probe_can_retry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.cancel_probe()
+    assert breaker.allow()
+
+
+def test_retries_then_succeeds():
+    statuses = iter([503, 503, 200])
+    client = mock_client(lambda request: httpx.Response(next(statuses)))
+
+    response = asyncio.run(call_upstream("test", lambda: client.get("http://upstream/"), attempts=3))
+    assert response.status_code == 200
+    assert resilience.get_circuit_breaker("test").failures == 0
+
+
+def test_breaker_counts_calls_not_attempts(monkeypatch):
+    monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "2")
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise httpx.ConnectError("down")
+
+    client = mock_client(handler)
+
+    async def call():
+        return await call_upstream("test", lambda: client.get("http://upstream/"), attempts=3)
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(call())
+    breaker = resilience.get_circuit_breaker("test")
+    assert len(attempts) == 3
+    assert breaker.failures == 1 and breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(call())
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call())
+    assert len(attempts) == 6
+
+
+def test_deadline_timeout_is_not_an_upstream_failure():
+    async def slow(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    client = mock_client(slow)
+
+    async def call():
+        with deadline_scope(0.05):
+            await call_upstream("test", lambda: client.get("http://upstream/"))
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(call())
+    assert resilience.get_circuit_breaker("test").failures == 0
@@ -0,0 +1,89 @@
+"""Semantic Cache - 임베딩 모델/해시 fallback 선택, 임계값, 키 토큰과 범위 확인"""
+import numpy as np
+import pytest
+
+import semantic_cache
+from semantic_cache import Embedder, SemanticCache, calibrate, semantic_cache_enabled
+
+# 같은 의미의 요청은 같은 방향, 다른 의미는 직교하는 벡터를 주는 가짜 문장 임베딩 모델
+TOPICS = {"뉴욕 날씨": 0, "newyork 날씨 어때?": 0, "weather in NYC": 0, "서울 날씨": 1, "2020년 도쿄 인구": 2, "2010년 도쿄 인구": 2}
+
+
+class FakeSentenceTransformer:
+    def __init__(self, name, device=None):
+        self.name = name
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, text, normalize_embeddings=False):
+        vector = np.full(8, 0.01, dtype=np.float32)
+        vector[TOPICS.get(text, 7)] = 1.0
+        return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture(autouse=True)
+def fresh_embedder(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "_embedder", None)
+    monkeypatch.delenv("SEMANTIC_CACHE_ENABLED", raising=False)
+    monkeypatch.delenv("SEMANTIC_CACHE_THRESHOLD", raising=False)
+
+
+@pytest.fixture
+def with_model(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "SentenceTransformer", FakeSentenceTransformer)
+
+
+@pytest.fixture
+def without_model(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "SentenceTransformer", None)
+
+
+def weather_result(response: str) -> dict:
+    return {"success": True, "response": response, "sub_agent_results": [{"agent": "weather_agent"}]}
+
+
+def test_hash_fallback_is_not_enabled_by_default(without_model):
+    embedder = Embedder()
+    assert embedder.kind == "hash" and embedder.dim == 1024
+    assert SemanticCache(embed_fn=embedder).threshold == semantic_cache.DEFAULT_THRESHOLDS["hash"]
+    assert not semantic_cache_enabled()
+
+
+def test_model_is_used_and_enabled_by_default(with_model):
+    embedder = Embedder()
+    assert embedder.kind == "model" and embedder.dim == 8
+    cache = SemanticCache(embed_fn=embedder)
+    assert cache.threshold == semantic_cache.DEFAULT_THRESHOLDS["model"]
+    assert cache.stats()["embedder"] == semantic_cache.DEFAULT_EMBEDDING_MODEL
+    assert semantic_cache_enabled()
+
+
+def test_paraphrases_hit_but_other_cities_and_numbers_miss(with_model):
+    cache = SemanticCache(embed_fn=Embedder())
+    cache.store("뉴욕 날씨", weather_result("맑음"), scope="user")
+    cache.store("2020년 도쿄 인구", weather_result("1400만"), scope="user")
+
+    assert cache.lookup("weather in NYC", scope="user")["matched_query"] == "뉴욕 날씨"
+    assert cache.lookup("newyork 날씨 어때?", scope="user") is not None
+    assert cache.lookup("서울 날씨", scope="user") is None
+    assert cache.lookup("weather in NYC", scope="other") is None
+    # 임베딩이 같아도 숫자가 다르면 다른 질문
+    assert cache.lookup("2010년 도쿄 인구", scope="user") is None
+
+
+def test_calibrate_separates_example_pairs(with_model):
+    pairs = (("뉴욕 날씨", "weather in NYC", True), ("뉴욕 날씨", "서울 날씨", False))
+    report = calibrate(Embedder(), pairs)
+    assert report["pairs"][0]["similarity"] > report["threshold"] > report["pairs"][1]["similarity"]
+
+
+def test_saved_index_from_other_embedder_is_ignored(tmp_path, with_model, monkeypatch):
+    path = str(tmp_path / "semantic")
+    cache = SemanticCache(embed_fn=Embedder(), path=path)
+    cache.store("뉴욕 날씨", weather_result("맑음"))
+    cache.save()
+    assert SemanticCache(embed_fn=Embedder(), path=path).stats()["size"] == 1
+
+    monkeypatch.setattr(semantic_cache, "SentenceTransformer", None)
+    assert SemanticCache(embed_fn=Embedder(dim=8), path=path).stats()["size"] == 0
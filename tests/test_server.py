@@ -0,0 +1,45 @@
+"""Agent Service - 세션 조회/생성의 동시성"""
+import threading
+import time
+
+import pytest
+
+import model_config
+import server
+
+
+class SlowOrchestrator:
+    def __init__(self, model, user_id):
+        # 생성이 느려 같은 세션 ID의 요청이 겹치도록
+        time.sleep(0.05)
+        self.user_id = user_id
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(server, "OrchestratorAgent", SlowOrchestrator)
+    model_config.set_model_factory(lambda model_id, **params: object())
+    item = server.AgentService(concurrency=2, max_sessions=2)
+    yield item
+    item.close()
+    model_config.set_model_factory(None)
+
+
+def test_concurrent_requests_share_one_session(service):
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(service._get_session("same"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 1
+    assert service._get_session("same") is sessions[0]
+
+
+def test_least_recently_used_session_is_evicted(service):
+    first = service._get_session("a")
+    service._get_session("b")
+    assert service._get_session("a") is first
+    service._get_session("c")
+    assert list(service._sessions) == ["a", "c"]
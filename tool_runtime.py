@@ -0,0 +1,202 @@
+"""Tool I/O Runtime - 모든 도구가 공유하는 HTTP 클라이언트와 백그라운드 이벤트 루프"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import importlib.util
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+import httpx
+from strands import tool
+from tracing import TracingTransport
+
+
+# 모든 외부 API 호출에 공통으로 사용하는 헤더
+DEFAULT_HEADERS = {
+    "User-Agent": "StrandsAgents/1.0",
+    "Accept": "application/json",
+    "Accept-Charset": "utf-8"
+}
+
+
+class ToolRuntime:
+    """
+    도구 I/O 런타임
+    전용 백그라운드 스레드에서 이벤트 루프를 돌리고, 그 루프 위에서 keep-alive/HTTP2를 지원하는
+    하나의 httpx.AsyncClient를 공유합니다. 어떤 스레드에서든 run()으로 코루틴을 실행할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        timeout: float = None,
+        http2: bool = None
+    ):
+        self.max_connections = max_connections or int(os.getenv("TOOL_HTTP_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = (
+            max_keepalive_connections or int(os.getenv("TOOL_HTTP_MAX_KEEPALIVE", "10"))
+        )
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("TOOL_HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.timeout = timeout or float(os.getenv("TOOL_HTTP_TIMEOUT", "10"))
+
+        # HTTP/2는 h2 패키지가 설치된 경우에만 활성화
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self.http2 = http2
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """백그라운드 이벤트 루프 (필요 시 시작)"""
+        self._ensure_started()
+        return self._loop
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run_loop():
+                asyncio.set_event_loop(loop)
+                ready.set()
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run_loop, name="tool-io-loop", daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+            self._client = None
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """공유 HTTP 클라이언트 반환 (백그라운드 루프 안에서만 호출)"""
+        if self._client is None or self._client.is_closed:
+            # HTTP 호출마다 span을 기록하는 전송 계층 사용
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+            self._client = httpx.AsyncClient(
+                transport=TracingTransport(transport),
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS
+            )
+        return self._client
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """
+        코루틴을 백그라운드 루프에 제출하고 concurrent.futures.Future 반환
+        호출자의 contextvars(현재 span 등)를 그대로 가진 채 실행됩니다.
+        """
+        context = contextvars.copy_context()
+
+        async def _run_in_caller_context():
+            return await context.run(asyncio.ensure_future, coro)
+
+        return asyncio.run_coroutine_threadsafe(_run_in_caller_context(), self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: float = None) -> Any:
+        """
+        코루틴을 백그라운드 루프에서 실행하고 결과를 기다림
+
+        Args:
+            coro: 실행할 코루틴
+            timeout: 최대 대기 시간(초)
+
+        Returns:
+            코루틴의 반환값
+        """
+        if threading.current_thread() is self._thread:
+            # 루프 스레드에서 블로킹 대기하면 교착 상태가 되므로 금지
+            coro.close()
+            raise RuntimeError("ToolRuntime.run()은 I/O 루프 스레드 안에서 호출할 수 없습니다.")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def run_async(self, coro: Awaitable[Any]) -> Any:
+        """
+        코루틴을 백그라운드 루프에서 실행하고 호출자의 이벤트 루프에서 비동기로 대기
+        (이미 백그라운드 루프 위라면 바로 await)
+
+        Args:
+            coro: 실행할 코루틴
+
+        Returns:
+            코루틴의 반환값
+        """
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self):
+        """클라이언트를 닫고 백그라운드 루프를 종료"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None or not loop.is_running():
+            return
+
+        client = self._client
+        self._client = None
+        if client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+            except Exception:
+                pass
+
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(5)
+
+
+_runtime: Optional[ToolRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_tool_runtime() -> ToolRuntime:
+    """프로세스 전역 ToolRuntime 반환"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = ToolRuntime()
+            atexit.register(_runtime.close)
+        return _runtime
+
+
+def sync_tool(async_tool) -> Any:
+    """
+    비동기 도구와 같은 이름/설명/입력 스키마를 가진 동기 도구 생성
+    동기 도구는 공유 I/O 루프에서 비동기 구현을 실행하고 결과를 기다립니다.
+    """
+    func = async_tool.__wrapped__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return get_tool_runtime().run(func(*args, **kwargs))
+
+    wrapper.__name__ = async_tool.tool_name
+    return tool(name=async_tool.tool_name)(wrapper)
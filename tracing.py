@@ -0,0 +1,405 @@
+"""Tracing - 단계/하위 에이전트/도구/모델/HTTP 호출의 중첩 span 기록과 Prometheus 메트릭"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent, HookProvider, HookRegistry
+
+
+class Span:
+    """하나의 작업 구간 (시작/종료 시간, 속성, 하위 span)"""
+
+    def __init__(self, name: str, kind: str, parent: "Span" = None, trace_id: str = None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = trace_id or (parent.trace_id if parent else uuid.uuid4().hex)
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.children: List["Span"] = []
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+        if parent is not None:
+            with _tree_lock:
+                parent.children.append(self)
+
+    @property
+    def elapsed(self) -> float:
+        """시작 후 경과 시간(초) - 종료된 span은 소요 시간"""
+        return self.duration if self.duration is not None else time.perf_counter() - self._started
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error: BaseException = None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        metrics.observe_span(self)
+
+    def iter_spans(self) -> Iterator["Span"]:
+        yield self
+        with _tree_lock:
+            children = list(self.children)
+        for child in children:
+            yield from child.iter_spans()
+
+    def summary(self) -> Dict[str, Any]:
+        """하위 span을 종류별로 집계한 소요 시간/토큰 요약"""
+        kinds: Dict[str, Dict[str, Any]] = {}
+        cache_hits = 0
+        for span in self.iter_spans():
+            cache_hits += span.attributes.get("cache_hits", 0)
+            if span is self or span.kind == "stage":
+                continue
+            item = kinds.setdefault(span.kind, {"count": 0, "seconds": 0.0})
+            item["count"] += 1
+            item["seconds"] = round(item["seconds"] + (span.duration or 0.0), 3)
+            for key in TOKEN_ATTRIBUTES:
+                if key in span.attributes:
+                    item[key] = item.get(key, 0) + span.attributes[key]
+            if "cache_hits" in span.attributes:
+                item["cache_hits"] = item.get("cache_hits", 0) + span.attributes["cache_hits"]
+        return {
+            "trace_id": self.trace_id,
+            "duration": round(self.duration or 0.0, 3),
+            "cache_hits": cache_hits,
+            "by_kind": kinds
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with _tree_lock:
+            children = list(self.children)
+        data = {
+            "name": self.name,
+            "kind": self.kind,
+            "span_id": self.span_id,
+            "start_time": self.start_time,
+            "duration": round(self.duration, 4) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in children]
+        }
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+# 모델 호출 span의 토큰 속성 (<direction>_tokens)
+TOKEN_DIRECTIONS = ("input", "output", "cache_read", "cache_write")
+TOKEN_ATTRIBUTES = tuple(f"{direction}_tokens" for direction in TOKEN_DIRECTIONS)
+
+_tree_lock = threading.Lock()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "stage", **attributes) -> Iterator[Span]:
+    """현재 span의 하위 span을 열고 블록이 끝나면 종료"""
+    item = Span(name, kind, parent=_current_span.get(), **attributes)
+    token = _current_span.set(item)
+    try:
+        yield item
+    except BaseException as e:
+        item.finish(e)
+        raise
+    finally:
+        item.finish()
+        _current_span.reset(token)
+
+
+@contextmanager
+def trace_request(name: str = "request", **attributes) -> Iterator[Span]:
+    """요청 하나의 루트 span - 종료 시 TRACE_DIR이 설정되어 있으면 JSON 파일로 내보냄"""
+    root = Span(name, "request", **attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.finish()
+        _current_span.reset(token)
+        export_trace(root)
+
+
+def export_trace(root: Span, trace_dir: str = None) -> Optional[str]:
+    """트레이스를 JSON 파일로 저장하고 경로 반환 (TRACE_DIR 미설정 시 저장하지 않음)"""
+    trace_dir = trace_dir or os.getenv("TRACE_DIR", "")
+    if not trace_dir:
+        return None
+    try:
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{root.trace_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"trace_id": root.trace_id, "root": root.to_dict()}, f, ensure_ascii=False, default=str)
+        return path
+    except OSError:
+        return None
+
+
+def traced(kind: str, name: str = None) -> Callable:
+    """함수 실행을 span으로 감싸는 데코레이터 (동기/비동기 함수 모두 지원)"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hit: bool):
+    """캐시 조회 결과를 메트릭과 현재 span에 기록"""
+    metrics.inc_cache(cache, hit)
+    item = _current_span.get()
+    if item is not None and hit:
+        with _tree_lock:
+            item.attributes["cache_hits"] = item.attributes.get("cache_hits", 0) + 1
+
+
+class ModelCallTracer(HookProvider):
+    """Agent의 모델 호출마다 span 기록 (토큰 사용량 포함)"""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        parent = _current_span.get()
+        # 모델 호출 span 이름은 호출한 단계/하위 에이전트 이름
+        event.invocation_state["_model_call_span"] = Span(
+            parent.name if parent else "model", "model", parent=parent,
+            model_id=str(event.agent.model.get_config().get("model_id", "unknown"))
+        )
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        item = event.invocation_state.pop("_model_call_span", None)
+        if item is None:
+            return
+        if event.stop_response is not None:
+            usage = (event.stop_response.message.get("metadata") or {}).get("usage") or {}
+            # input_tokens는 캐시되지 않은 입력 토큰 (캐시에서 읽은/캐시에 쓴 토큰은 따로 기록)
+            item.set(
+                input_tokens=usage.get("inputTokens", 0),
+                output_tokens=usage.get("outputTokens", 0),
+                stop_reason=event.stop_response.stop_reason
+            )
+            if usage.get("cacheReadInputTokens") or usage.get("cacheWriteInputTokens"):
+                item.set(
+                    cache_read_tokens=usage.get("cacheReadInputTokens", 0),
+                    cache_write_tokens=usage.get("cacheWriteInputTokens", 0)
+                )
+        item.finish(event.exception)
+
+
+# 모든 Agent에 등록하는 모델 호출 추적기
+MODEL_CALL_TRACER = ModelCallTracer()
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """HTTP 요청마다 span을 기록하는 httpx 전송 계층"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with span(request.url.host, "http", method=request.method, path=request.url.path) as item:
+            response = await self._transport.handle_async_request(request)
+            item.set(status=response.status_code)
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class MetricsRegistry:
+    """span 소요 시간 히스토그램, 토큰/캐시 카운터 - Prometheus 텍스트 형식으로 출력"""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations: Dict[tuple, Dict[str, Any]] = {}
+        self._tokens: Dict[tuple, int] = {}
+        self._errors: Dict[tuple, int] = {}
+        self._cache: Dict[tuple, int] = {}
+        self._speculation: Dict[str, int] = {}
+        self._upstream: Dict[tuple, int] = {}
+        self._upstream_waits: Dict[str, Dict[str, Any]] = {}
+        self._upstream_queues: Dict[str, tuple] = {}
+        self._speculation_waste = {"seconds": 0.0, "model_calls": 0}
+
+    def observe_span(self, item: Span):
+        key = (item.kind, item.name)
+        with self._lock:
+            histogram = self._durations.setdefault(
+                key, {"buckets": [0] * len(self.BUCKETS), "count": 0, "sum": 0.0}
+            )
+            histogram["count"] += 1
+            histogram["sum"] += item.duration
+            for index, bound in enumerate(self.BUCKETS):
+                if item.duration <= bound:
+                    histogram["buckets"][index] += 1
+            if item.error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            for direction in TOKEN_DIRECTIONS:
+                tokens = item.attributes.get(f"{direction}_tokens")
+                if tokens:
+                    token_key = (item.name, direction)
+                    self._tokens[token_key] = self._tokens.get(token_key, 0) + tokens
+
+    def token_totals(self) -> Dict[str, int]:
+        """방향별 누적 모델 토큰 수 (input은 캐시되지 않은 입력)"""
+        totals = {direction: 0 for direction in TOKEN_DIRECTIONS}
+        with self._lock:
+            for (_, direction), count in self._tokens.items():
+                totals[direction] += count
+        return totals
+
+    def inc_cache(self, cache: str, hit: bool):
+        key = (cache, "hit" if hit else "miss")
+        with self._lock:
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def inc_upstream(self, upstream: str, outcome: str):
+        """외부 API 호출 결과 (success / retried_success / retry / failure / rejected)"""
+        key = (upstream, outcome)
+        with self._lock:
+            self._upstream[key] = self._upstream.get(key, 0) + 1
+
+    def observe_upstream_wait(self, upstream: str, seconds: float):
+        """외부 API 호출 제한 대기 시간"""
+        with self._lock:
+            histogram = self._upstream_waits.setdefault(
+                upstream, {"buckets": [0] * len(self.BUCKETS), "count": 0, "sum": 0.0}
+            )
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            for index, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][index] += 1
+
+    def set_upstream_queue(self, upstream: str, queue_depth: int, in_flight: int):
+        """외부 API 호출 제한 대기열 길이와 실행 중인 호출 수"""
+        with self._lock:
+            self._upstream_queues[upstream] = (queue_depth, in_flight)
+
+    def inc_speculation(self, outcome: str, wasted_seconds: float = 0.0, wasted_model_calls: int = 0):
+        """추측 실행 결과 (used: 사용, discarded: 취소) 와 버려진 작업량"""
+        with self._lock:
+            self._speculation[outcome] = self._speculation.get(outcome, 0) + 1
+            self._speculation_waste["seconds"] += wasted_seconds
+            self._speculation_waste["model_calls"] += wasted_model_calls
+
+    def speculation_totals(self) -> Dict[str, Any]:
+        """누적 추측 실행 현황"""
+        with self._lock:
+            used = self._speculation.get("used", 0)
+            discarded = self._speculation.get("discarded", 0)
+            return {
+                "used": used,
+                "discarded": discarded,
+                "discard_ratio": round(discarded / (used + discarded), 3) if used + discarded else 0.0,
+                "wasted_seconds": round(self._speculation_waste["seconds"], 3),
+                "wasted_model_calls": self._speculation_waste["model_calls"]
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        lines = [
+            "# HELP agent_span_duration_seconds Duration of request stages, sub-agent, tool, model and HTTP calls",
+            "# TYPE agent_span_duration_seconds histogram"
+        ]
+        with self._lock:
+            for (kind, name), histogram in sorted(self._durations.items()):
+                labels = f'kind="{kind}",name="{_escape(name)}"'
+                for bound, count in zip(self.BUCKETS, histogram["buckets"]):
+                    lines.append(f'agent_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'agent_span_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+                lines.append(f"agent_span_duration_seconds_sum{{{labels}}} {histogram['sum']:.6f}")
+                lines.append(f"agent_span_duration_seconds_count{{{labels}}} {histogram['count']}")
+
+            lines.append("# HELP agent_span_errors_total Spans that ended with an error")
+            lines.append("# TYPE agent_span_errors_total counter")
+            for (kind, name), count in sorted(self._errors.items()):
+                lines.append(f'agent_span_errors_total{{kind="{kind}",name="{_escape(name)}"}} {count}')
+
+            lines.append(
+                "# HELP agent_model_tokens_total Model tokens by calling stage or sub-agent "
+                "(input is uncached input; cache_read/cache_write are prompt cache tokens)"
+            )
+            lines.append("# TYPE agent_model_tokens_total counter")
+            for (name, direction), count in sorted(self._tokens.items()):
+                lines.append(f'agent_model_tokens_total{{name="{_escape(name)}",direction="{direction}"}} {count}')
+
+            lines.append("# HELP agent_cache_requests_total Cache lookups by cache and result")
+            lines.append("# TYPE agent_cache_requests_total counter")
+            for (cache, result), count in sorted(self._cache.items()):
+                lines.append(f'agent_cache_requests_total{{cache="{_escape(cache)}",result="{result}"}} {count}')
+
+            lines.append("# HELP agent_upstream_requests_total External API calls by upstream and outcome")
+            lines.append("# TYPE agent_upstream_requests_total counter")
+            for (upstream, outcome), count in sorted(self._upstream.items()):
+                lines.append(f'agent_upstream_requests_total{{upstream="{_escape(upstream)}",outcome="{outcome}"}} {count}')
+
+            lines.append("# HELP agent_upstream_wait_seconds Time spent waiting for an upstream rate limit slot")
+            lines.append("# TYPE agent_upstream_wait_seconds histogram")
+            for upstream, histogram in sorted(self._upstream_waits.items()):
+                labels = f'upstream="{_escape(upstream)}"'
+                for bound, count in zip(self.BUCKETS, histogram["buckets"]):
+                    lines.append(f'agent_upstream_wait_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'agent_upstream_wait_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+                lines.append(f"agent_upstream_wait_seconds_sum{{{labels}}} {histogram['sum']:.6f}")
+                lines.append(f"agent_upstream_wait_seconds_count{{{labels}}} {histogram['count']}")
+            lines.append("# HELP agent_upstream_queue_depth Requests waiting for an upstream rate limit slot")
+            lines.append("# TYPE agent_upstream_queue_depth gauge")
+            for upstream, (queue_depth, _) in sorted(self._upstream_queues.items()):
+                lines.append(f'agent_upstream_queue_depth{{upstream="{_escape(upstream)}"}} {queue_depth}')
+            lines.append("# HELP agent_upstream_in_flight Upstream calls currently holding a concurrency slot")
+            lines.append("# TYPE agent_upstream_in_flight gauge")
+            for upstream, (_, in_flight) in sorted(self._upstream_queues.items()):
+                lines.append(f'agent_upstream_in_flight{{upstream="{_escape(upstream)}"}} {in_flight}')
+
+            lines.append("# HELP agent_speculation_total Speculative executions by outcome (used or discarded)")
+            lines.append("# TYPE agent_speculation_total counter")
+            for outcome, count in sorted(self._speculation.items()):
+                lines.append(f'agent_speculation_total{{outcome="{outcome}"}} {count}')
+            lines.append("# HELP agent_speculation_wasted_seconds_total Time spent on discarded speculative work")
+            lines.append("# TYPE agent_speculation_wasted_seconds_total counter")
+            lines.append(f"agent_speculation_wasted_seconds_total {self._speculation_waste['seconds']:.6f}")
+            lines.append("# HELP agent_speculation_wasted_model_calls_total Model calls made by discarded speculative work")
+            lines.append("# TYPE agent_speculation_wasted_model_calls_total counter")
+            lines.append(f"agent_speculation_wasted_model_calls_total {self._speculation_waste['model_calls']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
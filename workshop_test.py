@@ -9,6 +9,29 @@
 from main import MultiAgentApplication
 
 
+# 워크샵 테스트 쿼리 (benchmark.py도 같은 쿼리 구성을 사용)
+BASIC_TEST_CASES = [
+    ("안녕하세요", "일반 대화"),
+    ("파이썬이란?", "검색 기능"),
+    ("뉴욕 날씨", "날씨 조회")
+]
+PLANNING_QUERY = "파리에 대해 알려주고 날씨도 알려줘"
+SUB_AGENT_TESTS = [
+    ("Search Agent", "인공지능이란 무엇인가?"),
+    ("Weather Agent", "로스앤젤레스 날씨 어때?"),
+    ("Conversation Agent", "오늘 기분이 좋아요")
+]
+CLEAR_QUERY = "뉴욕 날씨 어때?"
+VAGUE_QUERY = "커피"
+
+WORKSHOP_QUERIES = (
+    [query for query, _ in BASIC_TEST_CASES]
+    + [PLANNING_QUERY]
+    + [query for _, query in SUB_AGENT_TESTS]
+    + [CLEAR_QUERY, VAGUE_QUERY]
+)
+
+
 class WorkshopTester:
     """워크샵용 간단한 테스트 실행기"""
     
@@ -23,13 +46,7 @@ class WorkshopTester:
         print("📋 1. 기본 기능 테스트")
         print("-" * 40)
         
-        test_cases = [
-            ("안녕하세요", "일반 대화"),
-            ("파이썬이란?", "검색 기능"),
-            ("뉴욕 날씨", "날씨 조회")
-        ]
-        
-        for query, description in test_cases:
+        for query, description in BASIC_TEST_CASES:
             print(f"\n🧪 테스트: {query} ({description})")
             result = self.app.run_single_query(query)
             
@@ -47,7 +64,7 @@ class WorkshopTester:
         print("-" * 40)
         
         print("🎯 복합 요청으로 계획 수립 과정 확인")
-        query = "파리에 대해 알려주고 날씨도 알려줘"
+        query = PLANNING_QUERY
         print(f"테스트 쿼리: {query}")
         print()
         
@@ -64,13 +81,7 @@ class WorkshopTester:
         print("\n📋 3. 하위 에이전트별 테스트")
         print("-" * 40)
         
-        agents_tests = [
-            ("Search Agent", "인공지능이란 무엇인가?"),
-            ("Weather Agent", "로스앤젤레스 날씨 어때?"),
-            ("Conversation Agent", "오늘 기분이 좋아요")
-        ]
-        
-        for agent_name, query in agents_tests:
+        for agent_name, query in SUB_AGENT_TESTS:
             print(f"\n🤖 {agent_name} 테스트")
             print(f"쿼리: {query}")
             
@@ -90,7 +101,7 @@ class WorkshopTester:
         
         # 명확한 요청
         print("\n✅ 명확한 요청 테스트:")
-        clear_query = "뉴욕 날씨 어때?"
+        clear_query = CLEAR_QUERY
         print(f"쿼리: {clear_query}")
         
         result = self.app.process_input(clear_query)
@@ -104,7 +115,7 @@ class WorkshopTester:
         
         # 모호한 요청 (LLM 판단에 따라 결과가 달라질 수 있음)
         print("\n❓ 모호한 요청 테스트:")
-        vague_query = "커피"
+        vague_query = VAGUE_QUERY
         print(f"쿼리: {vague_query}")
         
         result = self.app.process_input(vague_query)